@@ -4,24 +4,134 @@ Flask API backend for USD Index COT Analyzer
 Provides REST API endpoints for the React frontend
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import sys
 import os
+import threading
 import traceback
 
 # Add the parent directory to the path to import our analyzer
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-try:
-    from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
-except ImportError as e:
-    print(f"Error importing MultiAssetCOTAnalyzer: {e}")
-    print("Make sure multi_asset_cot_analyzer.py is in the parent directory")
+# The module-level snapshot, broadcaster and flights below need these, so a failed import is fatal
+from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
+from cot_archive import RawPageArchive
+from cot_snapshot import COTSnapshot
+from cot_broadcast import SnapshotBroadcaster
+from cot_singleflight import SingleFlight
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Shared, precomputed state built from the history store on first use
+# and rebuilt whenever a refresh ingests a new week. The NumPy-backed
+# modules are imported there too, so workers that only serve the snapshot
+# never load them.
+_history_store = None
+_screener = None
+_cross_asset = None
+_analog_index = None
+_history_lock = threading.Lock()
+
+# Per-asset results written after each ingestion; served without touching the network
+_snapshot = COTSnapshot()
+
+# Raw page archive every analyzer saves fetched pages to and replays from
+_archive = RawPageArchive()
+
+# Long-lived, stateless analyzers (one for live data, one per recent replay date);
+# requests share their calendar, and all of them the archive, HTTP connection pool
+# and stage thread pool
+_analyzers = {}
+_analyzers_lock = threading.Lock()
+MAX_REPLAY_ANALYZERS = 8
+
+# Identical concurrent live analyses and refreshes share one fetch/scrape/analysis
+_flights = SingleFlight()
+
+# Pushes each new weekly report from the snapshot to every /api/events client
+_broadcaster = SnapshotBroadcaster(_snapshot)
+
+def get_analyzer(replay_date=None):
+    """Return the shared analyzer for live data or for one replay date.
+
+    Its analyses take rolling metrics and analogs from the shared history
+    store, loaded (and ingested into if empty) first.
+    """
+    get_history_store()
+    return _get_analyzer(replay_date)
+
+def _get_analyzer(replay_date=None):
+    """The shared analyzer over whichever history store is loaded (None before the first load)."""
+    with _analyzers_lock:
+        analyzer = _analyzers.get(replay_date)
+        if analyzer is None:
+            analyzer = MultiAssetCOTAnalyzer(history_store=_history_store, archive=_archive, replay_date=replay_date)
+            _analyzers[replay_date] = analyzer
+            replays = [key for key in _analyzers if key is not None]
+            if len(replays) > MAX_REPLAY_ANALYZERS:
+                del _analyzers[replays[0]]
+        return analyzer
+
+def get_history_store(refresh: bool = False):
+    """Return the shared history store, ingesting the current week if needed."""
+    if refresh:
+        # Refreshes requested while one is running wait for it instead of ingesting again
+        return _flights.do(('ingest',), _load_history_store, True)
+    return _load_history_store(False)
+
+def _load_history_store(refresh: bool):
+    global _history_store, _screener, _cross_asset, _analog_index
+    with _history_lock:
+        if _history_store is None or refresh:
+            from cot_history import COTHistoryStore
+            store = COTHistoryStore()
+            if refresh or not len(store):
+                _get_analyzer().ingest_latest(store)
+                _broadcaster.check()
+            _history_store = store
+            with _analyzers_lock:
+                for analyzer in _analyzers.values():
+                    analyzer.history_store = store
+            _screener = None
+            _cross_asset = None
+            _analog_index = None
+        return _history_store
+
+def get_screener(refresh: bool = False):
+    """Return the shared screener over the history store."""
+    global _screener
+    store = get_history_store(refresh)
+    with _history_lock:
+        if _screener is None:
+            from cot_screener import COTScreener
+            analyzer = _get_analyzer()
+            sources = {name: info['source'] for name, info in analyzer.available_assets.items()}
+            _screener = COTScreener(store, sources=sources)
+        return _screener
+
+def get_cross_asset_engine(refresh: bool = False):
+    """Return the shared USD basket / correlation engine over the history store."""
+    global _cross_asset
+    store = get_history_store(refresh)
+    with _history_lock:
+        if _cross_asset is None:
+            from cot_correlation import CrossAssetEngine
+            _cross_asset = CrossAssetEngine(store)
+        return _cross_asset
+
+def get_analog_index(refresh: bool = False):
+    """Return the shared historical analog index over the history store."""
+    global _analog_index
+    store = get_history_store(refresh)
+    with _history_lock:
+        if _analog_index is None:
+            from cot_analogs import AnalogIndex
+            from cot_prices import PriceStore
+            _analog_index = AnalogIndex(store, prices=PriceStore())
+        return _analog_index
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -36,11 +146,13 @@ def get_available_assets():
     Get list of available assets for analysis
     """
     try:
-        analyzer = MultiAssetCOTAnalyzer()
-        assets = analyzer.get_available_assets()
+        assets = _snapshot.assets()
+        if not assets:
+            assets = _get_analyzer().get_available_assets()
         return jsonify({
             'assets': assets,
-            'total_count': len(assets)
+            'total_count': len(assets),
+            'snapshot_created_at': _snapshot.created_at
         })
     except Exception as e:
         return jsonify({
@@ -57,11 +169,17 @@ def analyze_cot():
         data = request.get_json() or {}
         asset_name = data.get('asset', 'USD INDEX')
 
-        # Create analyzer instance
-        analyzer = MultiAssetCOTAnalyzer()
+        # Serve the precomputed result unless a live or replayed run is requested
+        if not data.get('refresh') and not data.get('replay_date'):
+            results = _snapshot.get(asset_name)
+            if results is not None:
+                return jsonify(results)
 
-        # Run the analysis for specified asset
-        results = analyzer.run_analysis(asset_name)
+        # Run the analysis for specified asset (replay_date runs offline from archived pages);
+        # concurrent requests for the same asset and inputs share one run
+        replay_date = data.get('replay_date')
+        results = _flights.do(('analyze', asset_name, replay_date),
+                              get_analyzer(replay_date).run_analysis, asset_name)
 
         # Return the results as JSON
         return jsonify(results)
@@ -77,6 +195,184 @@ def analyze_cot():
             'details': 'Please check the server logs for more information'
         }), 500
 
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Precomputed analyses for several assets from the results snapshot
+    Body: {"assets": [...]} (all assets when omitted)
+    """
+    try:
+        data = request.get_json() or {}
+        asset_names = data.get('assets')
+        if not _snapshot.available():
+            return jsonify({
+                'error': 'No results snapshot yet',
+                'details': 'Run multi_asset_cot_analyzer.py --snapshot or GET /api/screener?refresh=1'
+            }), 503
+
+        results = _snapshot.get_many(asset_names)
+        return jsonify({
+            'results': results,
+            'missing': [name for name in (asset_names or []) if name not in results],
+            'snapshot_created_at': _snapshot.created_at
+        })
+    except Exception as e:
+        print(f"Error serving batch analysis: {str(e)}")
+        return jsonify({
+            'error': f'Batch analysis failed: {str(e)}'
+        }), 500
+
+@app.route('/api/events', methods=['GET'])
+def report_events():
+    """
+    Server-sent events stream; a 'report' event carries per-asset deltas
+    whenever an ingestion adds a new weekly report to the snapshot
+    """
+    _broadcaster.start()
+    stream = _broadcaster.stream(request.headers.get('Last-Event-ID'))
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/screener', methods=['GET'])
+def screen_assets():
+    """
+    Rank all assets by positioning extremity
+    Query params: sort, order (asc|desc), limit, source, extreme_only,
+    divergent_only, and min_<column> / max_<column> bounds
+    """
+    try:
+        args = request.args
+        screener = get_screener(refresh=args.get('refresh') == '1')
+
+        bounds = {}
+        for key, value in args.items():
+            if key.startswith(('min_', 'max_')):
+                bounds[key] = float(value)
+
+        rows = screener.screen(
+            sort_by=args.get('sort', 'extremity'),
+            descending=args.get('order', 'desc') != 'asc',
+            limit=int(args['limit']) if 'limit' in args else None,
+            source=args.get('source'),
+            extreme_only=args.get('extreme_only') == '1',
+            divergent_only=args.get('divergent_only') == '1',
+            **bounds
+        )
+        return jsonify({
+            'results': rows,
+            'total_count': len(rows)
+        })
+    except Exception as e:
+        print(f"Error during screening: {str(e)}")
+        return jsonify({
+            'error': f'Screening failed: {str(e)}'
+        }), 500
+
+@app.route('/api/history', methods=['GET'])
+def history():
+    """
+    Stored weekly history of one asset as columns
+    Query params: asset, from / to (YYYY-MM-DD), fields (comma-separated),
+    resample (weekly|monthly|quarterly), cursor, limit, format (json|arrow)
+    """
+    try:
+        from cot_query import ARROW_STREAM_MIME, history_to_arrow, history_to_json, query_history
+        args = request.args
+        fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+        result = query_history(
+            get_history_store(),
+            args.get('asset', 'USD INDEX'),
+            start=args.get('from'),
+            end=args.get('to'),
+            fields=fields or None,
+            resample=args.get('resample'),
+            cursor=args.get('cursor'),
+            limit=args.get('limit', type=int)
+        )
+        if args.get('format') == 'arrow' or ARROW_STREAM_MIME in request.headers.get('Accept', ''):
+            return Response(history_to_arrow(result), mimetype=ARROW_STREAM_MIME,
+                            headers={'X-Next-Cursor': result['next_cursor'] or ''})
+        return jsonify(history_to_json(result))
+    except Exception as e:
+        print(f"Error querying history: {str(e)}")
+        return jsonify({
+            'error': f'History query failed: {str(e)}'
+        }), 500
+
+@app.route('/api/export', methods=['GET'])
+def export_history():
+    """
+    Bulk export of every asset's weekly history, metrics and scores, streamed in chunks
+    Query params: format (arrow|parquet), chunk_rows
+    """
+    try:
+        from cot_export import DEFAULT_CHUNK_ROWS, EXPORT_EXTENSIONS, EXPORT_MIME_TYPES, export_stream
+        export_format = request.args.get('format', 'arrow')
+        store = get_history_store()
+        sources = {name: info['source'] for name, info in get_analyzer().available_assets.items()}
+        stream = export_stream(store, sources, export_format,
+                               request.args.get('chunk_rows', DEFAULT_CHUNK_ROWS, type=int))
+        filename = f"cot_history.{EXPORT_EXTENSIONS[export_format]}"
+        return Response(stream_with_context(stream), mimetype=EXPORT_MIME_TYPES[export_format],
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+    except Exception as e:
+        print(f"Error exporting history: {str(e)}")
+        return jsonify({
+            'error': f'Export failed: {str(e)}'
+        }), 500
+
+@app.route('/api/usd-basket', methods=['GET'])
+def usd_basket():
+    """
+    Synthetic USD speculative positioning from the DXY-weighted currency futures
+    Query params: limit (most recent N weeks), refresh
+    """
+    try:
+        engine = get_cross_asset_engine(refresh=request.args.get('refresh') == '1')
+        limit = request.args.get('limit', type=int)
+        return jsonify(engine.usd_basket(limit))
+    except Exception as e:
+        print(f"Error building USD basket: {str(e)}")
+        return jsonify({
+            'error': f'USD basket failed: {str(e)}'
+        }), 500
+
+@app.route('/api/correlations', methods=['GET'])
+def correlations():
+    """
+    Rolling correlation matrix of weekly net positioning changes across assets
+    Query params: date (YYYY-MM-DD, defaults to latest week), refresh
+    """
+    try:
+        engine = get_cross_asset_engine(refresh=request.args.get('refresh') == '1')
+        return jsonify(engine.correlation_matrix(request.args.get('date')))
+    except Exception as e:
+        print(f"Error computing correlations: {str(e)}")
+        return jsonify({
+            'error': f'Correlation failed: {str(e)}'
+        }), 500
+
+@app.route('/api/analogs', methods=['GET'])
+def analogs():
+    """
+    Historical weeks whose positioning most resembles an asset's current (or given) week
+    Query params: asset, k, date (YYYY-MM-DD), same_asset (1 to search only the asset's own history), refresh
+    """
+    try:
+        args = request.args
+        index = get_analog_index(refresh=args.get('refresh') == '1')
+        return jsonify(index.find_analogs(
+            args.get('asset', 'USD INDEX'),
+            k=args.get('k', 5, type=int),
+            date=args.get('date'),
+            same_asset=args.get('same_asset') == '1'
+        ))
+    except Exception as e:
+        print(f"Error finding analogs: {str(e)}")
+        return jsonify({
+            'error': f'Analog search failed: {str(e)}'
+        }), 500
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """
@@ -88,7 +384,10 @@ def get_status():
             'analyzer_available': True,
             'data_source': 'https://www.cftc.gov/dea/futures/deanybtlf.htm',
             'update_frequency': 'Weekly (typically Friday afternoons)',
-            'last_check': 'Available on demand'
+            'last_check': 'Available on demand',
+            'analyses_run': _flights.executions,
+            'requests_coalesced': _flights.coalesced,
+            'analyses_in_flight': _flights.in_flight()
         })
     except Exception as e:
         return jsonify({
@@ -118,6 +417,14 @@ if __name__ == '__main__':
     print("   GET  /api/status  - System status")
     print("   GET  /api/assets  - Get available assets")
     print("   POST /api/analyze - Run COT analysis for selected asset")
+    print("   POST /api/analyze/batch - Precomputed analyses for several assets")
+    print("   GET  /api/events  - Server-sent events for new weekly reports")
+    print("   GET  /api/screener - Rank all assets by positioning extremity")
+    print("   GET  /api/history - Stored weekly history (columnar JSON or Arrow)")
+    print("   GET  /api/export  - Bulk Arrow/Parquet export of the history and scores")
+    print("   GET  /api/usd-basket - Synthetic USD positioning from currency futures")
+    print("   GET  /api/analogs - Historical positioning analogs for an asset")
+    print("   GET  /api/correlations - Cross-asset positioning correlations")
     print("🌐 Server will be available at: http://localhost:5000")
     print("🔗 React app should be configured to proxy to this server")
     print("-" * 50)
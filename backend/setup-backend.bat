@@ -43,7 +43,7 @@ if exist "requirements.txt" (
     pip install -r requirements.txt
 ) else (
     echo 📥 Installing basic Python dependencies...
-    pip install flask flask-cors requests pandas numpy
+    pip install flask flask-cors requests numpy
 )
 
 echo.
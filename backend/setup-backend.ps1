@@ -45,7 +45,7 @@ if (Test-Path "requirements.txt") {
     pip install -r requirements.txt
 } else {
     Write-Host "📥 Installing basic Python dependencies..." -ForegroundColor Yellow
-    pip install flask flask-cors requests pandas numpy
+    pip install flask flask-cors requests numpy
 }
 
 Write-Host ""
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: history store size and load time, plain vs compressed vs delta/bit-packed
+
+Builds a synthetic multi-decade history (every asset, every week, full
+category breakdown as slowly varying random walks), saves it as JSON
+records, as the plain .npz arrays the store writes by default, as a
+zlib-compressed .npz and as the delta/bit-packed .npz (packed=True), then
+compares file sizes and load times and checks the packed store loads back
+identical.
+
+Usage: python benchmarks/bench_history_codec.py [--assets N] [--weeks N] [--runs N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cot_history import COTHistoryStore
+from cot_record_array import COTRecordArray, record_arrays_to_npz
+from cot_records import POSITION_FIELDS, REPORT_COLUMNS, REPORT_ROWS, REPORT_TYPES
+
+
+def synthetic_history(assets: int, weeks: int, seed: int = 7) -> COTHistoryStore:
+    """A store whose integer columns drift like real positioning (weekly steps of a few %)."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('1995-01-03')
+    dates = start + np.arange(weeks) * np.timedelta64(7, 'D')
+    n = assets * weeks
+
+    def walk(shape, level, step):
+        steps = rng.normal(0, step, (assets, weeks) + shape).round().astype(np.int64)
+        return np.abs(level + np.cumsum(steps, axis=1)).reshape((n,) + shape)
+
+    records = COTRecordArray.from_records(
+        {'asset_name': f"ASSET {a:02d}", 'report_date': str(d.astype(object).strftime('%d/%b/%Y'))}
+        for a in range(assets) for d in dates
+    )
+    for name in POSITION_FIELDS:
+        records.positions[name] = walk((), 200000, 4000)
+    records.changes[:, :4] = rng.normal(0, 3000, (n, 4)).round()
+    records.change_counts[:] = 4
+
+    report_type = REPORT_TYPES[0]
+    width = len(REPORT_COLUMNS[report_type])
+    detail = records.detail
+    detail['report_type'][:] = 0
+    detail['positions'][:, :, :width] = walk((len(REPORT_ROWS), width), 50000, 1500)
+    detail['positions_rows'][:] = True
+    detail['traders'][:, :, :width] = walk((len(REPORT_ROWS), width), 40, 2).astype(np.int32)
+    detail['traders_rows'][:] = True
+    detail['percent_of_oi'][:, :, :width] = rng.uniform(0, 60, (n, len(REPORT_ROWS), width)).round(1)
+    detail['percent_of_oi_rows'][:] = True
+    detail['changes'][:, :width] = rng.normal(0, 1500, (n, width)).round()
+    detail['has_changes'][:] = True
+    detail['total_traders'][:] = walk((), 250, 3).astype(np.int32)
+    detail['open_interest_change'][:] = rng.normal(0, 5000, n).round()
+
+    store = COTHistoryStore(os.path.join(tempfile.mkdtemp(), 'history.npz'))
+    store.records = records
+    store.dates = np.tile(dates, assets)
+    store._index()
+    return store
+
+
+def best_load(path: str, runs: int) -> float:
+    """Best wall time (ms) of loading the store from path."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        COTHistoryStore(path)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='History store size / load time, plain vs compressed vs packed')
+    parser.add_argument('--assets', type=int, default=40)
+    parser.add_argument('--weeks', type=int, default=30 * 52)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    store = synthetic_history(args.assets, args.weeks)
+    directory = os.path.dirname(store.path)
+    print(f"📊 {len(store):,} weekly records ({args.assets} assets x {args.weeks} weeks) with full breakdowns")
+
+    json_path = os.path.join(directory, 'history.json')
+    with open(json_path, 'w') as f:
+        json.dump(store.records.to_dicts(), f)
+    start = time.perf_counter()
+    with open(json_path) as f:
+        COTRecordArray.from_records(json.load(f))
+    json_ms = (time.perf_counter() - start) * 1000
+
+    plain_path = os.path.join(directory, 'plain.npz')
+    store.path, store.packed = plain_path, False
+    store.save()
+    compressed_path = os.path.join(directory, 'compressed.npz')
+    np.savez_compressed(compressed_path, dates=store.dates, **record_arrays_to_npz(store.records))
+    packed_path = os.path.join(directory, 'packed.npz')
+    store.path, store.packed = packed_path, True
+    start = time.perf_counter()
+    store.save()
+    save_ms = (time.perf_counter() - start) * 1000
+
+    loaded = COTHistoryStore(packed_path)
+    same = np.array_equal(loaded.dates, store.dates) and all(
+        np.array_equal(loaded.records.positions[name], store.records.positions[name]) for name in POSITION_FIELDS
+    ) and all(np.array_equal(loaded.records.detail[key], store.records.detail[key]) for key in store.records.detail)
+
+    print(f"{'format':<14}{'size (MB)':>12}{'load (ms)':>12}")
+    print(f"{'JSON records':<14}{os.path.getsize(json_path) / 1e6:>12.1f}{json_ms:>12.0f}")
+    print(f"{'plain .npz':<14}{os.path.getsize(plain_path) / 1e6:>12.1f}{best_load(plain_path, args.runs):>12.0f}")
+    print(f"{'zlib .npz':<14}{os.path.getsize(compressed_path) / 1e6:>12.1f}{best_load(compressed_path, args.runs):>12.0f}")
+    print(f"{'packed .npz':<14}{os.path.getsize(packed_path) / 1e6:>12.1f}{best_load(packed_path, args.runs):>12.0f}")
+    print(f"💾 Packed save: {save_ms:.0f} ms; round trip {'identical' if same else 'MISMATCH'}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
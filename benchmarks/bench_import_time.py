@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import time of the analyzer, the backend app and the CLI
+
+Imports each target in a fresh interpreter under `python -X importtime`
+(best of several runs, after a warm-up that compiles the bytecode) and
+checks it against a time budget and a list of heavy dependencies it must
+not load at import. Those (pandas, NumPy, requests, bs4) are imported
+where they are first used, so worker boot and the CLI stay fast.
+
+Usage: python benchmarks/bench_import_time.py [--runs N] [--check]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'bs4')
+
+# name, module imported, budget in ms, heavy modules it may load
+TARGETS = [
+    ('analyzer', 'multi_asset_cot_analyzer', 100, ()),
+    ('snapshot', 'cot_snapshot', 30, ()),
+    ('backend app', 'app', 400, ()),
+    ('history store', 'cot_history', 300, ('numpy',)),
+]
+
+
+def import_profile(module: str):
+    """Cumulative import time (ms) of module and every module it loaded with its own time (ms)."""
+    code = f"import sys; sys.path[:0] = [{ROOT!r}, {os.path.join(ROOT, 'backend')!r}]; import {module}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # Nested imports are reported (indented) before the module that triggered them,
+    # so the target's subtree is everything since the previous top-level entry
+    total = None
+    loaded, pending = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        pending[name.strip()] = int(self_us) / 1000
+        if not name.startswith('  '):
+            if name.strip() == module:
+                total, loaded = int(cumulative_us) / 1000, pending
+            pending = {}
+    return total, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time budget for the COT analyzer modules')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per target (best is kept)')
+    parser.add_argument('--check', action='store_true', help='Exit non-zero when a target is over budget')
+    args = parser.parse_args()
+
+    print(f"{'target':<16}{'import':>10}{'budget':>10}  {'heavy modules':<28}{'slowest modules'}")
+    failures = []
+    for name, module, budget, allowed in TARGETS:
+        import_profile(module)  # warm-up: writes the .pyc files
+        runs = [import_profile(module) for _ in range(args.runs)]
+        total, loaded = min(runs, key=lambda run: run[0])
+
+        heavy = [m for m in HEAVY_MODULES if m in loaded]
+        slowest = sorted(loaded.items(), key=lambda item: item[1], reverse=True)[:3]
+        print(f"{name:<16}{total:>8.1f}ms{budget:>8}ms  {', '.join(heavy) or '-':<28}"
+              f"{', '.join(f'{m} {ms:.1f}ms' for m, ms in slowest)}")
+
+        if total > budget:
+            failures.append(f"{name} imports in {total:.1f}ms (budget {budget}ms)")
+        unexpected = [m for m in heavy if m not in allowed]
+        if unexpected:
+            failures.append(f"{name} loads {', '.join(unexpected)} at import")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ All targets within budget")
+    if failures and args.check:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
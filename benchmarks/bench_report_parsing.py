@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark: number extraction and section parsing on full-size COT reports
+
+Compares the old per-line regex + int() extraction over whole pages and
+over the pages' data rows with fixed-width layout slicing of those rows
+and with cot_tokenizer.tokenize_numbers(), then times parsing every
+contract on the page.
+Uses the latest archived CFTC pages with --archived, otherwise builds
+synthetic full-size legacy and TFF reports from the fixture sections below.
+
+Usage: python benchmarks/bench_report_parsing.py [--archived] [--contracts N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cot_archive import RawPageArchive
+from cot_layout import learn_layout
+from cot_pages import ReportPage
+from cot_records import REPORT_COLUMNS
+from cot_tokenizer import tokenize_numbers
+from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
+
+LEGACY_SECTION = """\
+CONTRACT {n:03d} - ICE FUTURES U.S.                                              Code-{n:06d}
+           :          :         (CONTRACTS OF 10 METRIC TONS)                                                   :
+           :          :                                                                                          :
+All        :   150,002:    40,100     30,200     20,300     70,400     80,500    130,800    131,000:    19,202     19,002
+Old        :   140,002:    39,100     29,200     19,300     65,400     75,500    123,800    124,000:    16,202     16,002
+Other      :    10,000:     1,000      1,000      1,000      5,000      5,000      7,000      7,000:     3,000      3,000
+           :          :                                                                                          :
+           :          :          Changes in Commitments from:       August 19, 2025                               :
+           :    -2,000:      -100        200       -300        400       -500         0       -600:    -2,000     -1,400
+           :          :                                                                                          :
+           :          :   Percent of Open Interest Represented by Each Category of Trader                      :
+All        :     100.0:      26.7       20.1       13.5       46.9       53.7       87.2       87.3:      12.8       12.7
+Old        :     100.0:      27.9       20.9       13.8       46.7       53.9       88.4       88.6:      11.6       11.4
+Other      :     100.0:      10.0       10.0       10.0       50.0       50.0       70.0       70.0:      30.0       30.0
+           :          :                                                                                          :
+           :# Traders :                  Number of Traders in Each Category                                       :
+All        :       200:        60         50         40         45         50        130        120:
+Old        :       190:        58         48         38         44         49        125        116:
+Other      :        30:         5          5          4          6          7         15         14:
+           :          :
+"""
+
+TFF_SECTION = """\
+CONTRACT {n:03d} - CHICAGO MERCANTILE EXCHANGE   (CONTRACTS OF EUR 125,000)
+CFTC Code #{n:06d}                                                    Open Interest is   700,123
+Positions
+    50,000   200,000    10,000   300,000    80,000    5,000    90,000   150,000   20,000    40,000    30,000    6,000    79,123    99,123
+
+Changes from:       August 19, 2025                                  Total Change is:     5,000
+     1,000    -2,000       500     3,000    -1,000      100     2,000     4,000     -500      -100       200      300      200      400
+
+Percent of Open Interest Represented by Each Category of Trader
+       7.1      28.6       1.4      42.8      11.4      0.7      12.9      21.4      2.9       5.7       4.3      0.9     11.3     14.2
+
+Number of Traders in Each Category                                    Total Traders:   300
+        25        30        20        90        40       15        60        70       25        30        20       10
+--------------------------------------------------------------------------------------------------------------------------------------------------------------
+"""
+
+
+def synthetic_pages(contracts: int):
+    """Full-size legacy and TFF pages plus an asset catalog covering every contract."""
+    header = "<html><body><pre>\nCommitments of Traders - Futures Only, August 26, 2025\n"
+    footer = "Updated August 29, 2025\n</pre></body></html>\n"
+    pages = {
+        'legacy': header + ''.join(LEGACY_SECTION.format(n=n) for n in range(contracts)) + footer,
+        'financial': header + ''.join(TFF_SECTION.format(n=n) for n in range(contracts)) + footer,
+    }
+    catalog = {}
+    for n in range(contracts):
+        catalog[f"LEGACY {n:03d}"] = {
+            'source': 'legacy', 'description': '',
+            'pattern': rf'CONTRACT {n:03d} - ICE FUTURES U\.S\.(.*?)(?=\n[A-Z][A-Z]|\nUpdated|\Z)'
+        }
+        catalog[f"TFF {n:03d}"] = {
+            'source': 'financial', 'description': '',
+            'pattern': rf'CONTRACT {n:03d} - CHICAGO MERCANTILE EXCHANGE(.*?)(?=\n-{{20,}}|\nUpdated|\Z)'
+        }
+    return {source: ReportPage(text.encode()) for source, text in pages.items()}, catalog
+
+
+def archived_pages(analyzer: MultiAssetCOTAnalyzer):
+    archive = RawPageArchive()
+    pages = {}
+    for source in analyzer.urls:
+        entries = archive.entries(source)
+        if entries:
+            pages[source] = archive.open(entries[-1]['sha256'])
+    if not pages:
+        raise SystemExit("No archived CFTC pages found; run an analysis first or drop --archived")
+    return pages, analyzer.available_assets
+
+
+def regex_numbers(page: ReportPage):
+    """The previous approach: per line, strip commas, regex the tokens, int() each one."""
+    return [[int(x) for x in re.findall(rb'-?\d+', line.replace(b',', b''))]
+            for line in bytes(page.view).split(b'\n')]
+
+
+def regex_rows(lines):
+    """The previous per-row extraction: drop the label, regex the tokens, int() each one."""
+    return [[int(x.replace(b',', b'')) for x in re.findall(rb'-?\d[\d,]*', line.split(b':', 1)[-1])]
+            for line in lines]
+
+
+def best_of(fn, repeat: int = 5, number: int = 3) -> float:
+    return min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--archived', action='store_true', help='Use the latest archived CFTC pages')
+    parser.add_argument('--contracts', type=int, default=120, help='Contracts per synthetic page')
+    args = parser.parse_args()
+
+    analyzer = MultiAssetCOTAnalyzer()
+    pages, catalog = archived_pages(analyzer) if args.archived else synthetic_pages(args.contracts)
+    analyzer.available_assets = catalog
+
+    print(f"{'page':<12}{'KiB':>8}{'regex+int':>12}{'row regex':>12}{'row layout':>12}{'row tokens':>12}"
+          f"{'rows':>7}{'parse all':>12}{'contracts':>11}{'failed':>8}")
+    for source, page in pages.items():
+        report_type = 'tff' if source == 'financial' else 'legacy'
+        layout = learn_layout(page.buffer, report_type, len(REPORT_COLUMNS[report_type]))
+        lines = bytes(page.view).split(b'\n')
+        # Fully populated integer data rows (positions, changes): what the parsers slice most
+        rows = [line for line, numbers in zip(lines, regex_rows(lines)) if len(numbers) == len(layout) and b'.' not in line]
+
+        regex_time = best_of(lambda: regex_numbers(page))
+        row_regex_time = best_of(lambda: regex_rows(rows))
+        row_layout_time = best_of(lambda: [layout.row(line) for line in rows])
+        row_token_time = best_of(lambda: [tokenize_numbers(line) for line in rows])
+        names = [name for name, info in catalog.items() if info['source'] == source]
+
+        failures = {}
+
+        def parse_all():
+            fresh = ReportPage(page.buffer)  # no cached sections or date between runs
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name in names:
+                    try:
+                        analyzer.parse_asset_data(fresh, name)
+                    except Exception as e:
+                        failures[name] = str(e)
+
+        parse_time = best_of(parse_all, repeat=3, number=1)
+        print(f"{source:<12}{len(page) / 1024:>8.0f}{regex_time * 1000:>10.2f}ms"
+              f"{row_regex_time * 1000:>10.2f}ms{row_layout_time * 1000:>10.2f}ms{row_token_time * 1000:>10.2f}ms{len(rows):>7}"
+              f"{parse_time * 1000:>10.1f}ms{len(names):>11}{len(failures):>8}")
+        for name, error in failures.items():
+            print(f"   ⚠️ {name}: {error}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Historical COT Analogs
+Turns every stored week of every asset into a positioning vector and
+answers "when did this asset last look like this?" with a vectorized
+nearest-neighbor search over the whole history store, plus what
+positioning (and, with a price store, price) did in the weeks after
+each analog.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+
+from cot_history import COTHistoryStore, report_date_to_datetime64
+from cot_record_array import COTRecordArray
+from cot_screener import positioning_scores, trailing_window_bounds
+
+# Per-week features; net and change are % of open interest so contracts of any size compare.
+# The change is the difference from the previous stored week of speculative net
+ANALOG_FEATURES = (
+    'non_commercial_long_pct',
+    'non_commercial_short_pct',
+    'commercial_net_pct',
+    'cot_index',
+    'nc_net_change_pct',
+)
+
+# Weeks ahead reported for each analog
+FORWARD_WEEKS = (4, 13)
+
+
+class AnalogIndex:
+    """Standardized positioning vectors for all assets and weeks of a COTHistoryStore.
+
+    A search is one distance computation over the feature matrix; at the
+    store's scale (tens of thousands of weeks) that beats building a tree.
+    """
+
+    def __init__(self, store: COTHistoryStore, lookback_weeks: int = 156, prices=None):
+        """prices: optional cot_prices.PriceStore for forward returns from each analog's release."""
+        self.store = store
+        self.lookback_weeks = lookback_weeks
+        self.prices = prices
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the feature matrix from the store (run after each weekly ingest)."""
+        store = self.store
+        metrics = store.records.metrics()
+        oi = store.records.positions['total_open_interest'].astype(np.float64)
+        nc_net = metrics['non_commercial_net']
+        nc_net_change = store.weekly_change(nc_net, metrics['nc_net_change'])
+        low, high = trailing_window_bounds(nc_net, store.segments(), self.lookback_weeks)
+        cot_index = positioning_scores(nc_net, metrics['commercial_net'], metrics['non_commercial_long_pct'],
+                                       metrics['non_commercial_short_pct'], oi, low, high)['cot_index']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            oi = np.where(oi > 0, oi, np.nan)
+            features = {
+                'non_commercial_long_pct': metrics['non_commercial_long_pct'],
+                'non_commercial_short_pct': metrics['non_commercial_short_pct'],
+                'commercial_net_pct': metrics['commercial_net'] / oi * 100,
+                'cot_index': cot_index,
+                'nc_net_change_pct': nc_net_change / oi * 100,
+            }
+        self.features = np.column_stack([features[name] for name in ANALOG_FEATURES]).astype(np.float64)
+
+        # Standardize each feature over all rows; missing values sit at the mean (0)
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(self.features, axis=0) if len(self.features) else np.zeros(len(ANALOG_FEATURES))
+            std = np.nanstd(self.features, axis=0) if len(self.features) else np.ones(len(ANALOG_FEATURES))
+        self.mean, self.std = mean, np.where(std > 0, std, 1.0)
+        self.matrix = np.nan_to_num((self.features - self.mean) / self.std)
+
+        self.dates = store.dates
+        self.nc_net = nc_net
+        self.cot_index = cot_index
+        # Index one past each row's last week of the same asset, to bound forward lookups
+        self.segment_stop = np.empty(len(store), dtype=np.int64)
+        for segment in store.segments().values():
+            self.segment_stop[segment] = segment.stop
+
+        self.returns: Dict[int, np.ndarray] = {}
+        if self.prices is not None and len(self.prices):
+            from cot_prices import align_prices
+            aligned = align_prices(store, self.prices, FORWARD_WEEKS)
+            self.returns = {weeks: aligned[f"return_{weeks}w"] for weeks in FORWARD_WEEKS}
+
+    def _row(self, asset_name: str, date: Optional[str]) -> int:
+        segment = self.store.segments().get(asset_name)
+        if segment is None:
+            raise Exception(f"No history stored for '{asset_name}'")
+        if not date:
+            return segment.stop - 1
+        i = int(np.searchsorted(self.store.dates[segment], np.datetime64(date, 'D'), side='right')) - 1
+        if i < 0:
+            raise Exception(f"No {asset_name} history on or before {date}")
+        return segment.start + i
+
+    def record_features(self, record) -> np.ndarray:
+        """Feature vector of a week given as a record (COTRecord or API dict), e.g. one not stored yet.
+
+        The COT index window and the net change use the asset's stored weeks
+        before the record's date, as for a stored row.
+        """
+        row = COTRecordArray.from_records([record])
+        metrics = row.metrics()
+        nc_net = float(metrics['non_commercial_net'][0])
+        oi = float(row.positions['total_open_interest'][0])
+        date = report_date_to_datetime64(record['report_date'])
+
+        segment = self.store.segments().get(record['asset_name'], slice(0, 0))
+        before = segment.start + int(np.searchsorted(self.dates[segment], date))
+        window = np.append(self.nc_net[max(segment.start, before - self.lookback_weeks + 1):before], nc_net)
+        change = float(metrics['nc_net_change'][0])
+        if before > segment.start and date - self.dates[before - 1] == np.timedelta64(7, 'D'):
+            change = nc_net - float(self.nc_net[before - 1])
+        cot_index = positioning_scores(np.array([nc_net]), metrics['commercial_net'], metrics['non_commercial_long_pct'],
+                                       metrics['non_commercial_short_pct'], row.positions['total_open_interest'],
+                                       np.array([window.min()]), np.array([window.max()]))['cot_index'][0]
+        oi = oi if oi > 0 else np.nan
+        features = {
+            'non_commercial_long_pct': metrics['non_commercial_long_pct'][0],
+            'non_commercial_short_pct': metrics['non_commercial_short_pct'][0],
+            'commercial_net_pct': metrics['commercial_net'][0] / oi * 100,
+            'cot_index': cot_index,
+            'nc_net_change_pct': change / oi * 100,
+        }
+        return np.array([features[name] for name in ANALOG_FEATURES], dtype=np.float64)
+
+    def _describe(self, i: int) -> Dict:
+        return {
+            'asset_name': str(self.store.records.asset_names[i]),
+            'report_date': str(self.store.records.report_dates[i]),
+            'features': _feature_dict(self.features[i])
+        }
+
+    def find_analogs(self, asset_name: str, k: int = 5, date: Optional[str] = None,
+                     same_asset: bool = False, min_gap_weeks: int = 13, record=None) -> Dict:
+        """The k historical weeks whose positioning is closest to asset_name's week.
+
+        The week is the latest stored one, the last on or before date
+        ('YYYY-MM-DD'), or record (a COTRecord or API dict of asset_name,
+        stored or not). Candidates are weeks at least min_gap_weeks before
+        it (of any asset unless same_asset); each analog reports its
+        distance and the change in speculative net / COT index over the
+        following FORWARD_WEEKS.
+        """
+        if record is not None:
+            features = self.record_features(record)
+            vector = np.nan_to_num((features - self.mean) / self.std)
+            query_date = report_date_to_datetime64(record['report_date'])
+            result = {'asset_name': asset_name, 'report_date': str(record['report_date']),
+                      'features': _feature_dict(features)}
+        else:
+            query = self._row(asset_name, date)
+            vector = self.matrix[query]
+            query_date = self.dates[query]
+            result = self._describe(query)
+        cutoff = query_date - np.timedelta64(7 * min_gap_weeks, 'D')
+        candidates = np.flatnonzero(self.dates <= cutoff)
+        if same_asset:
+            segment = self.store.segments()[asset_name]
+            candidates = candidates[(candidates >= segment.start) & (candidates < segment.stop)]
+
+        diff = self.matrix[candidates] - vector
+        distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        k = min(max(1, k), len(candidates))
+        nearest = np.argpartition(distances, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+
+        analogs = []
+        for n in nearest:
+            i = int(candidates[n])
+            analog = self._describe(i)
+            analog['distance'] = float(distances[n])
+            analog['forward'] = self._forward(i)
+            analogs.append(analog)
+        result.update({'k': len(analogs), 'same_asset': same_asset, 'analogs': analogs})
+        return result
+
+    def _forward(self, i: int) -> Dict[str, Optional[float]]:
+        """Changes from row i to the same asset's week exactly FORWARD_WEEKS later (None if not stored)."""
+        forward = {}
+        stop = self.segment_stop[i]
+        for weeks in FORWARD_WEEKS:
+            target = self.dates[i] + np.timedelta64(7 * weeks, 'D')
+            j = i + int(np.searchsorted(self.dates[i:stop], target))
+            available = j < stop and self.dates[j] == target
+            forward[f"nc_net_change_{weeks}w"] = int(self.nc_net[j] - self.nc_net[i]) if available else None
+            forward[f"cot_index_{weeks}w"] = _to_float(self.cot_index[j]) if available else None
+            if weeks in self.returns:
+                forward[f"return_{weeks}w"] = _to_float(self.returns[weeks][i])
+        return forward
+
+
+def _to_float(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _feature_dict(features: np.ndarray) -> Dict[str, Optional[float]]:
+    return {name: _to_float(features[j]) for j, name in enumerate(ANALOG_FEATURES)}
+
+
+def summarize_analogs(result: Dict) -> List[str]:
+    """One line per analog, for the written analysis."""
+    lines = []
+    for analog in result['analogs']:
+        forward = analog['forward']
+        change = forward.get(f"nc_net_change_{FORWARD_WEEKS[-1]}w")
+        outcome = f"NC net {change:+,} over the next {FORWARD_WEEKS[-1]} weeks" if change is not None else "too recent for an outcome"
+        price_return = forward.get(f"return_{FORWARD_WEEKS[-1]}w")
+        if price_return is not None:
+            outcome += f", price {price_return:+.1f}%"
+        lines.append(f"{analog['asset_name']} {analog['report_date']} (distance {analog['distance']:.2f}): {outcome}")
+    return lines
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Raw Report Page Archive
+Stores every downloaded CFTC and Forex Factory page content-addressed
+(SHA-256) and gzip-compressed, with an append-only JSON-lines index of
+fetch timestamps, so analyses can be replayed offline by date. A fetch is
+indexed only when the content differs from the source's previous fetch.
+Uncompressed copies of recently used pages are kept in a bounded page cache
+so parsers can memory-map them.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+from cot_paths import DEFAULT_DATA_DIR
+from cot_pages import ReportPage
+
+
+def _as_of_timestamp(as_of: Union[str, datetime]) -> str:
+    """Normalize a replay date/time to an ISO UTC timestamp; bare dates mean end of day."""
+    if isinstance(as_of, datetime):
+        moment = as_of if as_of.tzinfo else as_of.replace(tzinfo=timezone.utc)
+    elif len(as_of) == 10:
+        moment = datetime.strptime(as_of, '%Y-%m-%d').replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+    else:
+        moment = datetime.fromisoformat(as_of)
+        moment = moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+class RawPageArchive:
+    """Content-addressed, compressed store of raw upstream pages."""
+
+    def __init__(self, root: Optional[str] = None, max_cached_pages: int = 32):
+        """max_cached_pages: uncompressed pages kept in pages/, least recently used evicted first."""
+        self.root = root or os.path.join(DEFAULT_DATA_DIR, 'archive')
+        self.index_path = os.path.join(self.root, 'index.jsonl')
+        self.max_cached_pages = max_cached_pages
+        self._entries: Optional[List[Dict]] = None
+        self._latest: Dict[Tuple[str, str], str] = {}  # (source, url) -> SHA-256 of its last indexed fetch
+        # Guards the index file and the in-memory entries when an analyzer is shared by threads
+        self._lock = threading.Lock()
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.gz")
+
+    def page_path(self, digest: str) -> str:
+        return os.path.join(self.root, 'pages', f"{digest}.htm")
+
+    def put(self, source: str, url: str, content: bytes, fetched_at: Optional[datetime] = None) -> str:
+        """Archive one fetched page and record the fetch; returns its SHA-256."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        self._cache_page(digest, content)
+
+        with self._lock:
+            self._load_entries()
+            if self._latest.get((source, url)) == digest:
+                # Unchanged since the last fetch: replay finds that entry for any later date
+                return digest
+
+        entry = {
+            'source': source,
+            'url': url,
+            'sha256': digest,
+            'size': len(content),
+            'fetched_at': (fetched_at or datetime.now(timezone.utc)).astimezone(timezone.utc).isoformat()
+        }
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._entries.append(entry)
+            self._latest[(source, url)] = digest
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            raise Exception(f"Archived page {digest} not found")
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    def _cache_page(self, digest: str, content: bytes):
+        path = self.page_path(digest)
+        if os.path.exists(path):
+            _touch(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        self._evict_pages()
+
+    def _evict_pages(self):
+        """Remove the least recently used cached pages beyond max_cached_pages (objects/ keeps them all)."""
+        pages = [entry for entry in os.scandir(os.path.dirname(self.page_path(''))) if entry.name.endswith('.htm')]
+        if len(pages) <= self.max_cached_pages:
+            return
+        pages.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in pages[:len(pages) - self.max_cached_pages]:
+            try:
+                # Pages already memory-mapped stay readable through their mapping
+                os.remove(entry.path)
+            except OSError:
+                pass  # in use (Windows) or already evicted by another process
+
+    def open(self, digest: str) -> ReportPage:
+        """Memory-map an archived page from the page cache, decompressing it there on first use."""
+        path = self.page_path(digest)
+        if os.path.exists(path):
+            _touch(path)
+        else:
+            self._cache_page(digest, self.get(digest))
+        return ReportPage.open(path, digest)
+
+    def _load_entries(self):
+        """Read the index once (call with the lock held)."""
+        if self._entries is None:
+            self._entries = []
+            if os.path.exists(self.index_path):
+                with open(self.index_path) as f:
+                    self._entries = [json.loads(line) for line in f if line.strip()]
+            self._latest = {(e['source'], e['url']): e['sha256'] for e in self._entries}
+
+    def entries(self, source: Optional[str] = None) -> List[Dict]:
+        """Index entries in fetch order, optionally for one source."""
+        with self._lock:
+            self._load_entries()
+            entries = list(self._entries)
+        if source is None:
+            return entries
+        return [e for e in entries if e['source'] == source]
+
+    def lookup(self, source: str, as_of: Union[str, datetime]) -> Dict:
+        """Latest fetch of source at or before as_of ('YYYY-MM-DD' or ISO timestamp)."""
+        cutoff = _as_of_timestamp(as_of)
+        candidates = [e for e in self.entries(source) if e['fetched_at'] <= cutoff]
+        if not candidates:
+            raise Exception(f"No archived '{source}' page fetched on or before {as_of}")
+        return max(candidates, key=lambda e: e['fetched_at'])
+
+    def read(self, source: str, as_of: Union[str, datetime]) -> bytes:
+        return self.get(self.lookup(source, as_of)['sha256'])
+
+    def open_as_of(self, source: str, as_of: Union[str, datetime]) -> ReportPage:
+        return self.open(self.lookup(source, as_of)['sha256'])
+
+
+def _touch(path: str):
+    """Mark a cached page as recently used."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
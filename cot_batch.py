@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+COT Batch Runner
+Command-line batch job for nightly consumers. Each CFTC report (and the
+calendar) is fetched once into the raw page archive, whose page cache
+every worker memory-maps; parsing and analysis of the requested assets run
+in a process pool, and all results are written in one JSON, CSV or
+Parquet file.
+
+Usage: python cot_batch.py --assets all --workers 4 --format csv --out results/
+"""
+
+import csv
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from cot_archive import RawPageArchive
+from cot_catalog import find_contracts
+from cot_paths import DEFAULT_DATA_DIR
+from cot_records import POSITION_FIELDS
+from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
+
+OUTPUT_FORMATS = ('json', 'csv', 'parquet')
+DEFAULT_OUTPUT_DIR = os.path.join(DEFAULT_DATA_DIR, 'results')
+
+# Per-process analyzer, created by _init_worker in each pool process
+_worker_analyzer: Optional[MultiAssetCOTAnalyzer] = None
+
+
+def _init_worker(archive_root: str, catalog: Dict[str, Dict]):
+    global _worker_analyzer
+    _worker_analyzer = MultiAssetCOTAnalyzer(archive=RawPageArchive(archive_root))
+    _worker_analyzer.available_assets = catalog
+
+
+def _analyze_chunk(asset_names: List[str], digests: Dict[str, str],
+                   upcoming_events: List[Dict]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Parse and analyze a group of assets from archived pages (runs in a pool process)."""
+    analyzer = _worker_analyzer
+    pages = {}
+    results, errors = {}, {}
+    for asset_name in asset_names:
+        source = analyzer.available_assets[asset_name]['source']
+        try:
+            if source not in pages:
+                pages[source] = analyzer.archive.open(digests[source])
+                # One header scan indexes every contract section of the page
+                find_contracts(pages[source], source)
+            record = analyzer.parse_asset_data(pages[source], asset_name)
+            metrics = analyzer.calculate_metrics(record)
+            results[asset_name] = {
+                'data': record.to_dict(),
+                'metrics': metrics,
+                'analysis': analyzer.analyze_directional_bias(record, metrics, upcoming_events)
+            }
+        except Exception as e:
+            errors[asset_name] = str(e)
+    return results, errors
+
+
+def _chunks(asset_names: List[str], catalog: Dict[str, Dict], count: int) -> List[List[str]]:
+    """Split assets into about count contiguous groups, keeping each report's assets together."""
+    ordered = sorted(asset_names, key=lambda name: catalog[name]['source'])
+    size = max(1, -(-len(ordered) // count))
+    return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+
+def run_batch(analyzer: MultiAssetCOTAnalyzer, asset_names: Optional[List[str]] = None,
+              workers: Optional[int] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """run_analysis()-shaped results for many assets, plus an error message per failed asset.
+
+    The analyzer fetches (or replays) the pages; asset_names defaults to
+    every available asset, including contracts discovered in the fetched
+    reports, and workers to the CPU count (1 runs everything in this process).
+    """
+    # Every report is needed to discover contracts, and for names not (yet) in the catalog
+    catalog = analyzer.available_assets
+    sources = None
+    if asset_names and all(name in catalog for name in asset_names):
+        sources = list(dict.fromkeys(catalog[name]['source'] for name in asset_names))
+
+    # Network I/O happens once, here (reports and calendar concurrently);
+    # workers only read the archive's page cache
+    calendar = analyzer.executor.submit(analyzer.calendar.get_upcoming_events, days_ahead=7)
+    pages = analyzer.fetch_all_sources(sources)
+    digests = {source: page.sha256 for source, page in pages.items()}
+    upcoming_events = calendar.result()
+
+    if sources is None:
+        analyzer.discover_contracts(pages)
+    catalog = analyzer.available_assets
+    asset_names = list(asset_names or catalog)
+    unknown = [name for name in asset_names if name not in catalog]
+    if unknown:
+        raise Exception(f"Assets not supported: {unknown}. Available assets: {list(catalog)}")
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    chunks = _chunks(asset_names, catalog, workers * 2)
+    print(f"⚙️ Analyzing {len(asset_names)} assets from {len(pages)} reports with {workers} worker(s)...")
+
+    results, errors = {}, {}
+    if workers == 1:
+        _init_worker(analyzer.archive.root, catalog)
+        outcomes = [_analyze_chunk(chunk, digests, upcoming_events) for chunk in chunks]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawned, not forked: this process already runs the stage thread pool and HTTP
+        # session, and a forked child can inherit their locks held
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(analyzer.archive.root, catalog),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            outcomes = list(pool.map(_analyze_chunk, chunks,
+                                     [digests] * len(chunks), [upcoming_events] * len(chunks)))
+    for chunk_results, chunk_errors in outcomes:
+        results.update(chunk_results)
+        errors.update(chunk_errors)
+
+    ordered = {name: results[name] for name in asset_names if name in results}
+    return ordered, {name: errors[name] for name in asset_names if name in errors}
+
+
+def result_rows(results: Dict[str, Dict], catalog: Dict[str, Dict]) -> List[Dict]:
+    """One flat row per asset (positions, metrics and the headline analysis) for tabular formats."""
+    metric_names = list(dict.fromkeys(key for result in results.values() for key in result['metrics']))
+    rows = []
+    for name, result in results.items():
+        data, metrics, analysis = result['data'], result['metrics'], result['analysis']
+        row = {
+            'asset_name': name,
+            'description': catalog.get(name, {}).get('description', ''),
+            'source': catalog.get(name, {}).get('source', ''),
+            'report_date': data.get('report_date')
+        }
+        row.update({field: data.get(field) for field in POSITION_FIELDS})
+        row.update({metric: metrics.get(metric) for metric in metric_names})
+        row['overall_bias'] = analysis.get('overall_bias')
+        row['confidence'] = analysis.get('confidence')
+        row['signal_count'] = len(analysis.get('signals', []))
+        row['signals'] = ' | '.join(analysis.get('signals', []))
+        rows.append(row)
+    return rows
+
+
+def write_results(results: Dict[str, Dict], catalog: Dict[str, Dict], output_format: str = 'json',
+                  out_dir: Optional[str] = None) -> str:
+    """Write every asset's results to one file in out_dir; returns its path.
+
+    json keeps the full run_analysis() output keyed by asset; csv and
+    parquet hold the flat result_rows() table.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise Exception(f"Unknown output format '{output_format}'. Use one of {OUTPUT_FORMATS}")
+    out_dir = out_dir or DEFAULT_OUTPUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"cot_results.{output_format}")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    if output_format == 'json':
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False)
+    elif output_format == 'csv':
+        rows = result_rows(results, catalog)
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['asset_name'])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        pq.write_table(pa.Table.from_pylist(result_rows(results, catalog)), tmp_path)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    """Batch command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze many COT assets and write the results in bulk')
+    parser.add_argument('--assets', default='all',
+                        help="'all' or a comma-separated list of asset names, e.g. 'USD INDEX,EURO FX'")
+    parser.add_argument('--workers', type=int, default=None, help='Parse/analyze processes (default: CPU count)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='json', help='Output file format')
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_DIR, help='Output directory')
+    parser.add_argument('--replay', metavar='YYYY-MM-DD', help='Run offline from pages archived on or before this date')
+    args = parser.parse_args()
+
+    asset_names = None if args.assets == 'all' else [a.strip() for a in args.assets.split(',') if a.strip()]
+    try:
+        analyzer = MultiAssetCOTAnalyzer(replay_date=args.replay)
+        results, errors = run_batch(analyzer, asset_names, args.workers)
+        for name, error in errors.items():
+            print(f"⚠️ Skipping {name}: {error}")
+        if not results:
+            raise Exception("No assets could be analyzed")
+
+        path = write_results(results, analyzer.available_assets, args.format, args.out)
+        print(f"✅ Wrote {args.format} results for {len(results)} assets to {path}")
+        return results
+
+    except Exception as e:
+        print(f"❌ Error during batch analysis: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+COT Report Broadcaster
+Watches the results snapshot and, when an ingestion lands a new weekly
+report, pushes one 'report' server-sent event with per-asset deltas to
+every connected client. The event is built and serialized once per new
+snapshot; clients only receive copies of the same message.
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from cot_snapshot import COTSnapshot
+
+# Fields compared between consecutive snapshots for each asset
+SUMMARY_METRICS = ('non_commercial_net', 'commercial_net', 'non_commercial_long_pct', 'non_commercial_short_pct')
+
+
+def _summary(result: Dict) -> Dict:
+    summary = {
+        'report_date': result['data'].get('report_date'),
+        'overall_bias': result['analysis'].get('overall_bias'),
+        'confidence': result['analysis'].get('confidence')
+    }
+    summary.update({name: result['metrics'].get(name) for name in SUMMARY_METRICS})
+    return summary
+
+
+def report_deltas(previous: Dict[str, Dict], current: Dict[str, Dict]) -> List[Dict]:
+    """Changes for assets whose report_date moved between two sets of summaries."""
+    deltas = []
+    for name, summary in current.items():
+        before = previous.get(name, {})
+        if before.get('report_date') == summary['report_date']:
+            continue
+        delta = {'asset_name': name, **summary,
+                 'previous_report_date': before.get('report_date'),
+                 'previous_bias': before.get('overall_bias'),
+                 'bias_changed': before.get('overall_bias') != summary['overall_bias']}
+        for metric in SUMMARY_METRICS:
+            if summary[metric] is not None and before.get(metric) is not None:
+                delta[f"{metric}_change"] = summary[metric] - before[metric]
+        deltas.append(delta)
+    return deltas
+
+
+class SnapshotBroadcaster:
+    """Single fan-out of new-report events from a COTSnapshot to SSE subscribers."""
+
+    def __init__(self, snapshot: COTSnapshot, interval: float = 30.0, keepalive: float = 15.0,
+                 max_pending: int = 8):
+        self.snapshot = snapshot
+        self.interval = interval          # seconds between snapshot checks
+        self.keepalive = keepalive        # seconds between comment lines on idle streams
+        self.max_pending = max_pending    # queued events before a stalled client is dropped
+        self._subscribers = set()
+        self._summaries: Dict[str, Dict] = {}
+        self._created_at: Optional[str] = None
+        self._latest: Optional[str] = None     # last 'report' message, replayed to reconnecting clients
+        self._latest_id: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Load the current snapshot and start the background watcher (once)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._watch, name='cot-broadcast', daemon=True)
+        self.check()
+        self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️ Snapshot watcher error: {e}")
+
+    def check(self) -> int:
+        """Publish a 'report' event if the snapshot holds new report dates; returns the assets changed."""
+        if not self.snapshot.available() or self.snapshot.created_at == self._created_at:
+            return 0
+        created_at = self.snapshot.created_at
+        summaries = {name: _summary(result) for name, result in self.snapshot.get_many().items()}
+
+        with self._lock:
+            if created_at == self._created_at:
+                return 0
+            first_load = self._created_at is None
+            deltas = report_deltas(self._summaries, summaries)
+            self._summaries, self._created_at = summaries, created_at
+            if first_load or not deltas:
+                return 0
+
+            payload = json.dumps({
+                'snapshot_created_at': created_at,
+                'report_dates': sorted({d['report_date'] for d in deltas if d['report_date']}),
+                'assets': deltas
+            }, separators=(',', ':'))
+            self._latest_id = created_at
+            self._latest = f"id: {created_at}\nevent: report\ndata: {payload}\n\n"
+            self._publish(self._latest)
+        print(f"📣 Pushed new report for {len(deltas)} assets to {len(self._subscribers)} clients")
+        return len(deltas)
+
+    def _publish(self, message: str):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # A client that stopped reading is dropped; its stream ends at the next keepalive
+                self._subscribers.discard(subscriber)
+
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, last_event_id: Optional[str] = None) -> Iterator[str]:
+        """text/event-stream body for one client.
+
+        A client reconnecting with an older Last-Event-ID first gets the
+        latest report it missed.
+        """
+        subscriber = self.subscribe()
+        try:
+            yield f"retry: {int(self.keepalive * 1000)}\n\n"
+            with self._lock:
+                missed = self._latest if last_event_id and last_event_id != self._latest_id else None
+            if missed:
+                yield missed
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.keepalive)
+                except queue.Empty:
+                    with self._lock:
+                        if subscriber not in self._subscribers:
+                            return
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
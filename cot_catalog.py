@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+COT Contract Discovery
+Finds every contract in a CFTC report page from its section headers (name,
+exchange and CFTC code) in one regex pass over the raw bytes, and turns
+each into an asset catalog entry shaped like
+MultiAssetCOTAnalyzer.available_assets, with the section pattern and
+report type (parser) of the page's format. Discovered contracts are kept
+in a JSON file so every process (batch workers, the backend) sees them.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from cot_pages import ReportPage
+from cot_paths import DEFAULT_DATA_DIR
+
+DEFAULT_CONTRACTS_PATH = os.path.join(DEFAULT_DATA_DIR, 'contracts.json')
+
+# Legacy: "USD INDEX - ICE FUTURES U.S.        Code-098662"
+# TFF:    "EURO FX - CHICAGO MERCANTILE EXCHANGE   (CONTRACTS OF EUR 125,000)\nCFTC Code #099741"
+# The name is greedy so contract names containing " - " keep it; exchanges never do.
+HEADER_PATTERN = re.compile(
+    rb'^(?P<name>[^\n]+) - (?P<exchange>[^\n(]*?[^\s(])[ \t]*(?:\((?P<units>[^)\n]*)\))?[ \t]*'
+    rb'(?:(?P<legacy>Code-)|\r?\n[ \t]*CFTC Code #)(?P<code>[0-9A-Z+]+)',
+    re.MULTILINE
+)
+
+# Section terminators of each report format, as in the hand-written catalog
+SECTION_ENDS = {
+    'legacy': r'(?=\n[A-Z][A-Z]|\nUpdated|\Z)',
+    'tff': r'(?=\n-{20,}|\nUpdated|\Z)',
+}
+
+
+def section_pattern(name: str, exchange: str, report_type: str) -> str:
+    """Section pattern of a contract, in the form the analyzer's catalog uses."""
+    return re.escape(f"{name} - {exchange}") + r'(.*?)' + SECTION_ENDS[report_type]
+
+
+def find_contracts(page: ReportPage, source: str) -> List[Dict]:
+    """Every contract section header of a page, in page order (cached on the page).
+
+    Each contract's section is located while scanning (a search from its
+    header), so the page's section index is complete after this one pass.
+    """
+    if page.contracts is None:
+        contracts = []
+        for match in HEADER_PATTERN.finditer(page.buffer):
+            name = match.group('name').decode('utf-8', errors='replace').strip()
+            exchange = match.group('exchange').decode('utf-8', errors='replace').strip()
+            report_type = 'legacy' if match.group('legacy') else 'tff'
+            pattern = section_pattern(name, exchange, report_type)
+            if page.section(pattern, match.start()) is None:
+                continue
+            units = match.group('units')
+            contracts.append({
+                'name': name,
+                'exchange': exchange,
+                'code': match.group('code').decode('ascii'),
+                'source': source,
+                'report_type': report_type,
+                'pattern': pattern,
+                'description': f"{name} futures, {exchange}" + (f" ({units.decode('utf-8', errors='replace')})" if units else ''),
+            })
+        page.contracts = contracts
+    return page.contracts
+
+
+def merge_contracts(catalog: Dict[str, Dict], contracts: List[Dict]) -> Tuple[Dict[str, Dict], int]:
+    """Catalog with the discovered contracts added; returns (new catalog, number added).
+
+    A contract already in the catalog is not added again: one with the same
+    CFTC code (e.g. listed on two reports), or a hand-written entry whose
+    section pattern matches its header, which gains the exchange and code.
+    A name clash with a different contract is resolved by appending the
+    exchange. The input catalog is not modified.
+    """
+    merged = {name: dict(info) for name, info in catalog.items()}
+    codes = {info['code'] for info in merged.values() if info.get('code')}
+    added = 0
+    for contract in contracts:
+        if contract['code'] in codes:
+            continue
+        header = f"{contract['name']} - {contract['exchange']}"
+        known = next((info for info in merged.values()
+                      if not info.get('code') and re.match(info['pattern'], header, re.DOTALL)), None)
+        if known is not None:
+            # Listed on another report too: matched once its own report is scanned
+            if known['source'] == contract['source']:
+                known.update(exchange=contract['exchange'], code=contract['code'])
+                codes.add(contract['code'])
+            continue
+        name = contract['name'] if contract['name'] not in merged else f"{contract['name']} ({contract['exchange']})"
+        if name in merged:
+            continue
+        merged[name] = {
+            'source': contract['source'],
+            'pattern': contract['pattern'],
+            'description': contract['description'],
+            'report_type': contract['report_type'],
+            'exchange': contract['exchange'],
+            'code': contract['code'],
+            'discovered': True,
+        }
+        codes.add(contract['code'])
+        added += 1
+    return merged, added
+
+
+def load_contracts(path: Optional[str] = None) -> Dict[str, Dict]:
+    """Previously discovered catalog entries ({} if none were saved)."""
+    path = path or DEFAULT_CONTRACTS_PATH
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('contracts', {})
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable contract catalog {path}: {e}")
+        return {}
+
+
+def save_contracts(catalog: Dict[str, Dict], path: Optional[str] = None) -> str:
+    """Write the discovered entries of a catalog, merged with those already saved; returns the path."""
+    path = path or DEFAULT_CONTRACTS_PATH
+    contracts = load_contracts(path)
+    contracts.update({name: info for name, info in catalog.items() if info.get('discovered')})
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'contracts': contracts}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
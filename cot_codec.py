@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+COT Integer Column Codec
+Compact encoding for the history store's integer columns. Weekly position
+series vary slowly, so each column is delta-encoded along the week axis,
+zigzag-mapped to unsigned and bit-packed in blocks of BLOCK_SIZE values at
+the width of the block's range (frame of reference). Encoding and decoding
+are vectorized over all blocks of the same width at once.
+"""
+
+from typing import Dict, Mapping
+import numpy as np
+
+BLOCK_SIZE = 128
+PACKED_SUFFIX = '@packed'
+_PARTS = ('shape', 'dtype', 'widths', 'mins', 'payload')
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return ((values >> np.uint64(1)) ^ (np.uint64(0) - (values & np.uint64(1)))).view(np.int64)
+
+
+def encode_int_array(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Delta + zigzag + block bit-packing of an integer (or datetime64) array of any shape.
+
+    Deltas run along axis 0 (the week axis of history columns), so every
+    other position of a multi-dimensional column is its own series.
+    """
+    dtype = values.dtype
+    series = np.moveaxis(values.view(np.int64) if dtype.kind == 'M' else values.astype(np.int64), 0, -1)
+    flat = np.ascontiguousarray(series).reshape(-1)
+    deltas = np.diff(flat, prepend=np.int64(0))
+    encoded = _zigzag(deltas)
+
+    blocks = -(-len(encoded) // BLOCK_SIZE)
+    padded = np.pad(encoded, (0, blocks * BLOCK_SIZE - len(encoded)), mode='edge') if len(encoded) else encoded
+    padded = padded.reshape(blocks, BLOCK_SIZE)
+    mins = padded.min(axis=1) if blocks else np.array([], dtype=np.uint64)
+    offsets = padded - mins[:, None]
+    spans = offsets.max(axis=1) if blocks else np.array([], dtype=np.uint64)
+    # Bits needed for each block's largest offset (0 for constant blocks)
+    widths = np.zeros(blocks, dtype=np.uint8)
+    nonzero = spans > 0
+    widths[nonzero] = np.floor(np.log2(spans[nonzero].astype(np.float64))).astype(np.uint8) + 1
+    # float log2 rounds spans near a power of two either way; settle on the exact width
+    widths = np.minimum(widths, 64)
+    short = nonzero & (widths < 64)
+    short[short] = (spans[short] >> widths[short].astype(np.uint64)) > 0
+    widths[short] += 1
+    wide = widths > 1
+    wide[wide] = (spans[wide] >> (widths[wide] - 1).astype(np.uint64)) == 0
+    widths[wide] -= 1
+
+    payload = np.zeros(int(widths.astype(np.int64).sum()) * (BLOCK_SIZE // 8), dtype=np.uint8)
+    starts = np.concatenate([[0], np.cumsum(widths.astype(np.int64) * (BLOCK_SIZE // 8))[:-1]]) if blocks else widths
+    for width in np.unique(widths[widths > 0]):
+        group = np.flatnonzero(widths == width)
+        bits = ((offsets[group][:, :, None] >> np.arange(width, dtype=np.uint64)) & np.uint64(1)).astype(np.uint8)
+        packed = np.packbits(bits.reshape(len(group), -1), axis=1, bitorder='little')
+        payload[starts[group][:, None] + np.arange(packed.shape[1])] = packed
+
+    return {
+        'shape': np.array(values.shape, dtype=np.int64),
+        'dtype': np.array(dtype.str),
+        'widths': widths,
+        'mins': mins,
+        'payload': payload,
+    }
+
+
+def decode_int_array(parts: Mapping[str, np.ndarray]) -> np.ndarray:
+    """Inverse of encode_int_array."""
+    shape = tuple(int(n) for n in parts['shape'])
+    dtype = np.dtype(str(parts['dtype']))
+    widths, mins, payload = parts['widths'], parts['mins'], parts['payload']
+    blocks = len(widths)
+
+    offsets = np.zeros((blocks, BLOCK_SIZE), dtype=np.uint64)
+    starts = np.concatenate([[0], np.cumsum(widths.astype(np.int64) * (BLOCK_SIZE // 8))[:-1]]) if blocks else widths
+    # Every byte offset of the payload read as a little-endian 64-bit word (an overlapping view, no copy)
+    padded = np.concatenate([payload, np.zeros(8, dtype=np.uint8)])
+    words = np.ndarray((len(payload) + 1,), dtype='<u8', buffer=padded, strides=(1,))
+    positions = np.arange(BLOCK_SIZE, dtype=np.int64)
+    for width in np.unique(widths[widths > 0]):
+        width = int(width)
+        group = np.flatnonzero(widths == width)
+        if width <= 56:
+            # A value starts at bit k*width and fits in the word read from its first byte
+            bit = positions * width
+            word = words[starts[group][:, None] + bit // 8]
+            offsets[group] = (word >> (bit % 8).astype(np.uint64)) & np.uint64((1 << width) - 1)
+        else:
+            packed = payload[starts[group][:, None] + np.arange(width * BLOCK_SIZE // 8)]
+            bits = np.unpackbits(packed, axis=1, bitorder='little').reshape(len(group), BLOCK_SIZE, width)
+            offsets[group] = bits.astype(np.uint64) @ (np.uint64(1) << np.arange(width, dtype=np.uint64))
+
+    count = int(np.prod(shape))
+    deltas = _unzigzag((offsets + mins[:, None]).reshape(-1)[:count])
+    flat = np.cumsum(deltas)
+    moved = shape[1:] + shape[:1]
+    series = np.moveaxis(flat.reshape(moved), -1, 0)
+    if dtype.kind == 'M':
+        return np.ascontiguousarray(series).view(dtype)
+    return np.ascontiguousarray(series).astype(dtype)
+
+
+def pack_arrays(arrays: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Encode every integer / datetime64 array (4+ bytes per value) into flat .npz-ready parts."""
+    result = {}
+    for name, values in arrays.items():
+        if values.dtype.kind in 'iuM' and values.dtype.itemsize >= 4 and values.ndim:
+            for part, data in encode_int_array(values).items():
+                result[f"{name}{PACKED_SUFFIX}_{part}"] = data
+        else:
+            result[name] = values
+    return result
+
+
+def unpack_arrays(arrays: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Inverse of pack_arrays; arrays that were stored as-is pass through."""
+    result = {}
+    packed = {}
+    for key in arrays.keys():
+        name, marker, part = key.rpartition(f"{PACKED_SUFFIX}_")
+        if marker and part in _PARTS:
+            packed.setdefault(name, {})[part] = arrays[key]
+        else:
+            result[key] = arrays[key]
+    for name, parts in packed.items():
+        result[name] = decode_int_array(parts)
+    return result
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Cross-Asset COT Engine
+Builds a synthetic USD positioning series from the currency futures,
+weighted like the DXY basket, and rolling correlation matrices of weekly
+net positioning changes across all assets in the history store.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from cot_history import COTHistoryStore
+
+# ICE US Dollar Index basket weights. Every currency future is quoted as
+# foreign currency in USD, so speculators long these contracts are short USD.
+USD_BASKET_WEIGHTS = {
+    'EURO FX': 0.576,
+    'JAPANESE YEN': 0.136,
+    'BRITISH POUND': 0.119,
+    'CANADIAN DOLLAR': 0.091,
+    'SWEDISH KRONA': 0.042,
+    'SWISS FRANC': 0.036,
+}
+
+
+def position_matrix(store: COTHistoryStore, field: str = 'non_commercial_net',
+                    assets: Optional[List[str]] = None) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Align one per-week value across assets on a common weekly date axis.
+
+    field is a position column or a key of COTRecordArray.metrics().
+    Returns (dates, assets, matrix) with matrix[week, asset] NaN where an
+    asset has no record for that week. The axis is every 7th day from the
+    first stored date, so a week missing for every asset is a NaN row
+    rather than disappearing.
+    """
+    records = store.records
+    if field in records.positions:
+        values = records.positions[field].astype(np.float64)
+    else:
+        metrics = records.metrics()
+        if field not in metrics:
+            raise Exception(f"Unknown COT field '{field}'")
+        values = metrics[field].astype(np.float64)
+
+    segments = store.segments()
+    assets = [a for a in (list(segments) if assets is None else assets) if a in segments]
+    week = np.timedelta64(7, 'D')
+    stored = store.dates[~np.isnat(store.dates)]
+    if len(stored):
+        dates = np.arange(stored.min(), stored.max() + week, week)
+    else:
+        dates = np.array([], dtype='datetime64[D]')
+    matrix = np.full((len(dates), len(assets)), np.nan)
+    for col, asset in enumerate(assets):
+        segment = segments[asset]
+        asset_dates = store.dates[segment]
+        present = ~np.isnat(asset_dates)
+        # A report dated off the weekly grid (e.g. a holiday shift) counts for the week it falls in
+        rows = (asset_dates[present] - dates[0]) // week
+        matrix[rows, col] = values[segment][present]
+    return dates, assets, matrix
+
+
+def window_correlation(block: np.ndarray, min_periods: int = 10) -> np.ndarray:
+    """Pairwise-complete correlation matrix of the columns of one window of rows.
+
+    Each pair uses only the weeks where both assets have a value. The sums are
+    computed directly from the window, so memory is O(assets^2); pairs with
+    fewer than min_periods shared observations are NaN.
+    """
+    valid = ~np.isnan(block)
+    m = valid.astype(np.float64)
+    x = np.where(valid, block, 0.0)
+    # [i, j] sums over the weeks where both i and j are present
+    n = m.T @ m
+    sx = x.T @ m
+    sxy = x.T @ x
+    sxx = (x * x).T @ m
+    # The y-side sums are the same sums with the asset axes swapped
+    sy = sx.T
+    syy = sxx.T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    # A constant series leaves only rounding error in its variance; it has no correlation
+    flat = (var_x <= sxx * 1e-12) | (var_y <= syy * 1e-12)
+    corr[(n < min_periods) | flat] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_correlation(matrix: np.ndarray, window: int = 52, min_periods: int = 10,
+                        ends: Optional[List[int]] = None) -> np.ndarray:
+    """Pairwise-complete rolling correlation matrices for the given window ends.
+
+    ends are row indices into matrix (every row by default). Each window is
+    computed on its own rows, so memory is one (assets, assets) matrix per
+    requested end and long histories lose no precision. Result has shape
+    (len(ends), assets, assets).
+    """
+    ends = range(len(matrix)) if ends is None else ends
+    result = np.empty((len(ends), matrix.shape[1], matrix.shape[1]))
+    for k, t in enumerate(ends):
+        result[k] = window_correlation(matrix[max(t - window + 1, 0):t + 1], min_periods)
+    return result
+
+
+class CrossAssetEngine:
+    """Synthetic USD positioning and cross-asset correlations over a COTHistoryStore."""
+
+    def __init__(self, store: COTHistoryStore, window: int = 52,
+                 weights: Optional[Dict[str, float]] = None):
+        self.store = store
+        self.window = window
+        self.weights = weights or USD_BASKET_WEIGHTS
+        self.refresh()
+
+    def refresh(self):
+        """Recompute every derived series from the store (run after each weekly ingest)."""
+        self.dates, self.assets, self.net = position_matrix(self.store, 'non_commercial_net')
+        # Week-over-week change in net positioning; NaN across gaps in an asset's history
+        self.net_changes = np.vstack([np.full((1, len(self.assets)), np.nan), np.diff(self.net, axis=0)])
+        # Correlation matrices by window end, computed when first requested
+        self._correlations = {}
+        self._build_usd_basket()
+
+    def _build_usd_basket(self):
+        basket = [a for a in self.weights if a in self.assets]
+        _, _, oi = position_matrix(self.store, 'total_open_interest', basket)
+        _, _, net = position_matrix(self.store, 'non_commercial_net', basket)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Net positioning as % of OI makes contracts of different sizes comparable
+            net_pct = np.where(oi > 0, net / oi * 100, np.nan)
+
+        # Re-weight over the currencies actually reported each week
+        weights = np.array([self.weights[a] for a in basket])
+        present = ~np.isnan(net_pct)
+        total_weight = present @ weights
+        with np.errstate(divide='ignore', invalid='ignore'):
+            contributions = -np.where(present, net_pct, 0.0) * weights / total_weight[:, None]
+        contributions[total_weight == 0] = np.nan
+
+        self.basket_assets = basket
+        self.usd_contributions = contributions
+        self.synthetic_usd = contributions.sum(axis=1)
+        self.synthetic_usd[total_weight == 0] = np.nan
+
+    def usd_basket(self, limit: Optional[int] = None) -> Dict:
+        """Synthetic USD speculative net (% of OI, positive = long USD) per week."""
+        rows = slice(-limit, None) if limit else slice(None)
+        actual = None
+        if 'USD INDEX' in self.assets:
+            _, _, oi = position_matrix(self.store, 'total_open_interest', ['USD INDEX'])
+            usd_net = self.net[:, self.assets.index('USD INDEX')]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                actual = np.where(oi[:, 0] > 0, usd_net / oi[:, 0] * 100, np.nan)
+
+        return {
+            'dates': self.dates[rows].astype(str).tolist(),
+            'synthetic_usd_net_pct': _to_list(self.synthetic_usd[rows]),
+            'usd_index_net_pct': _to_list(actual[rows]) if actual is not None else None,
+            'contributions': {
+                asset: _to_list(self.usd_contributions[rows, i]) for i, asset in enumerate(self.basket_assets)
+            },
+            'weights': {asset: self.weights[asset] for asset in self.basket_assets}
+        }
+
+    def correlations(self, t: int) -> np.ndarray:
+        """Correlation matrix of the window ending at week index t (cached)."""
+        if t not in self._correlations:
+            self._correlations[t] = rolling_correlation(self.net_changes, self.window, ends=[t])[0]
+        return self._correlations[t]
+
+    def correlation_matrix(self, date: Optional[str] = None) -> Dict:
+        """Correlation of weekly net positioning changes over the window ending at date."""
+        if not len(self.dates):
+            return {'date': None, 'assets': [], 'matrix': []}
+        t = len(self.dates) - 1
+        if date:
+            t = int(np.searchsorted(self.dates, np.datetime64(date, 'D'), side='right')) - 1
+            if t < 0:
+                raise Exception(f"No COT history on or before {date}")
+        return {
+            'date': str(self.dates[t]),
+            'window_weeks': self.window,
+            'assets': self.assets,
+            'matrix': [_to_list(row) for row in self.correlations(t)]
+        }
+
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """JSON-friendly list with NaN as None."""
+    return [None if np.isnan(v) else float(v) for v in values]
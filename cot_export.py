@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+COT Bulk Export
+Writes the full cross-asset history (positions, weekly metrics and the
+per-week positioning scores the screener ranks on) as an Arrow IPC stream
+or Parquet, in chunks of rows. Columns are computed once, vectorized over
+the whole store; each chunk is a slice of them, so numeric columns reach
+pyarrow without per-row conversion.
+
+Usage: python cot_export.py --format parquet --out exports/ --chunk-rows 50000
+"""
+
+import os
+import sys
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+from cot_history import COTHistoryStore
+from cot_paths import DEFAULT_DATA_DIR
+from cot_query import ARROW_STREAM_MIME, METRIC_FIELDS
+from cot_records import POSITION_FIELDS
+from cot_screener import positioning_scores, trailing_window_bounds
+
+EXPORT_FORMATS = ('arrow', 'parquet')
+EXPORT_MIME_TYPES = {'arrow': ARROW_STREAM_MIME, 'parquet': 'application/vnd.apache.parquet'}
+EXPORT_EXTENSIONS = {'arrow': 'arrows', 'parquet': 'parquet'}
+SCORE_FIELDS = ('cot_index', 'divergence', 'extremity')
+DEFAULT_CHUNK_ROWS = 65536
+DEFAULT_EXPORT_DIR = os.path.join(DEFAULT_DATA_DIR, 'export')
+
+
+def export_columns(store: COTHistoryStore, sources: Optional[Dict[str, str]] = None,
+                   lookback_weeks: int = 156) -> Dict[str, np.ndarray]:
+    """Every stored week as columns: identifiers, positions, metrics and scores.
+
+    sources maps asset name to its CFTC report; lookback_weeks is the COT
+    index window, as in COTScreener.
+    """
+    sources = sources or {}
+    records = store.records
+    metrics = records.metrics()
+    low, high = trailing_window_bounds(metrics['non_commercial_net'], store.segments(), lookback_weeks)
+    scores = positioning_scores(metrics['non_commercial_net'], metrics['commercial_net'],
+                                metrics['non_commercial_long_pct'], metrics['non_commercial_short_pct'],
+                                records.positions['total_open_interest'], low, high)
+
+    columns = {
+        'asset_name': records.asset_names,
+        'source': np.array([sources.get(str(name), '') for name in records.asset_names], dtype=object),
+        'report_date': store.dates,
+    }
+    columns.update({name: records.positions[name] for name in POSITION_FIELDS})
+    columns.update({name: metrics[name] for name in METRIC_FIELDS})
+    columns.update(scores)
+    return columns
+
+
+def _schema(pa, columns: Dict[str, np.ndarray]):
+    fields = []
+    for name, values in columns.items():
+        if name == 'report_date':
+            fields.append(pa.field(name, pa.date32()))
+        elif values.dtype == object:
+            fields.append(pa.field(name, pa.string()))
+        else:
+            fields.append(pa.field(name, pa.from_numpy_dtype(values.dtype)))
+    return pa.schema(fields)
+
+
+def export_batches(store: COTHistoryStore, sources: Optional[Dict[str, str]] = None,
+                   chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """(schema, iterator of RecordBatches of at most chunk_rows rows); NaN scores become nulls."""
+    import pyarrow as pa
+    columns = export_columns(store, sources)
+    schema = _schema(pa, columns)
+    chunk_rows = max(1, chunk_rows)
+
+    def batches():
+        for start in range(0, len(store), chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            arrays = [pa.array(columns[field.name][rows], type=field.type, from_pandas=True) for field in schema]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    return schema, batches()
+
+
+class _ChunkSink:
+    """Write-only file object that collects what pyarrow writes until drained."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _writer(pa, pq, export_format: str, sink, schema):
+    if export_format == 'arrow':
+        return pa.ipc.new_stream(sink, schema)
+    return pq.ParquetWriter(sink, schema, compression='zstd')
+
+
+def _write_batch(pa, export_format: str, writer, batch):
+    if export_format == 'arrow':
+        writer.write_batch(batch)
+    else:
+        # One Parquet row group per chunk
+        writer.write_table(pa.Table.from_batches([batch]))
+
+
+def export_stream(store: COTHistoryStore, sources: Optional[Dict[str, str]] = None,
+                  export_format: str = 'arrow', chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Export body as bytes chunks, one per chunk of rows (for a streamed HTTP response)."""
+    if export_format not in EXPORT_FORMATS:
+        raise Exception(f"Unknown export format '{export_format}'. Use one of {EXPORT_FORMATS}")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema, batches = export_batches(store, sources, chunk_rows)
+
+    def body():
+        sink = _ChunkSink()
+        writer = _writer(pa, pq, export_format, pa.PythonFile(sink, mode='w'), schema)
+        for batch in batches:
+            _write_batch(pa, export_format, writer, batch)
+            data = sink.drain()
+            if data:
+                yield data
+        writer.close()
+        yield sink.drain()
+
+    return body()
+
+
+def write_export(store: COTHistoryStore, sources: Optional[Dict[str, str]] = None,
+                 export_format: str = 'arrow', out_dir: Optional[str] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> str:
+    """Write the export to cot_history.<arrows|parquet> in out_dir; returns its path."""
+    if export_format not in EXPORT_FORMATS:
+        raise Exception(f"Unknown export format '{export_format}'. Use one of {EXPORT_FORMATS}")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    out_dir = out_dir or DEFAULT_EXPORT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"cot_history.{EXPORT_EXTENSIONS[export_format]}")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    schema, batches = export_batches(store, sources, chunk_rows)
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        writer = _writer(pa, pq, export_format, sink, schema)
+        for batch in batches:
+            _write_batch(pa, export_format, writer, batch)
+        writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    """Export command-line entry point."""
+    import argparse
+    from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
+
+    parser = argparse.ArgumentParser(description='Export the COT history and weekly scores as Arrow or Parquet')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='arrow', help='Arrow IPC stream or Parquet')
+    parser.add_argument('--out', default=DEFAULT_EXPORT_DIR, help='Output directory')
+    parser.add_argument('--history', default=None, help='History store (.npz) to export (default: the shared store)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='Rows per record batch / Parquet row group')
+    args = parser.parse_args()
+
+    try:
+        store = COTHistoryStore(args.history)
+        if not len(store):
+            raise Exception(f"History store {store.path} is empty; run an ingestion first")
+        sources = {name: info['source'] for name, info in MultiAssetCOTAnalyzer().available_assets.items()}
+        path = write_export(store, sources, args.format, args.out, args.chunk_rows)
+        print(f"✅ Exported {len(store)} weekly rows for {len(store.assets())} assets to {path}")
+        return path
+
+    except Exception as e:
+        print(f"❌ Error during export: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+COT History Store
+Keeps every ingested week of COT records for every asset in one
+COTRecordArray, sorted by asset then report date, and persists it as
+NumPy columns so analytics can run vectorized over the full history.
+Integer columns can be saved delta / bit-packed (cot_codec) for a smaller
+file, at the cost of a slower load.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from cot_codec import pack_arrays, unpack_arrays
+from cot_paths import DEFAULT_DATA_DIR
+from cot_record_array import COTRecordArray, record_arrays_to_npz, record_arrays_from_npz
+from cot_rolling import ROLLING_FIELDS, RollingMetricsState
+
+
+def report_date_to_datetime64(report_date: str) -> np.datetime64:
+    """Convert the analyzer's '26/Aug/2025' report date into a datetime64[D]."""
+    try:
+        return np.datetime64(datetime.strptime(report_date, '%d/%b/%Y').date(), 'D')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT', 'D')
+
+
+def datetime64_to_report_date(value: np.datetime64) -> str:
+    if np.isnat(value):
+        return 'Unknown'
+    return value.astype(datetime).strftime('%d/%b/%Y').lstrip('0')
+
+
+class COTHistoryStore:
+    """Weekly COT history for all assets, backed by a single .npz file.
+
+    Rolling metrics (COT index, z-score, percentile, moving average) are
+    maintained incrementally in `rolling` and saved alongside the history.
+    New weeks are buffered per ingest and merged into the sorted columns
+    when the history is next read; save() writes both files.
+    """
+
+    def __init__(self, path: Optional[str] = None, packed: bool = False):
+        """packed=True saves integer columns bit-packed (about half the size,
+        several times slower to load); either form loads."""
+        self.path = path or os.path.join(DEFAULT_DATA_DIR, 'history.npz')
+        self.packed = packed
+        self._records = COTRecordArray.empty()
+        self._dates = np.array([], dtype='datetime64[D]')
+        # Ingested (records, dates) later than every stored week of their assets, not merged yet
+        self._pending: List[Tuple[COTRecordArray, np.ndarray]] = []
+        self._segments: Dict[str, slice] = {}
+        self._latest: Dict[str, np.datetime64] = {}
+        self.rolling = RollingMetricsState(os.path.splitext(self.path)[0] + '.rolling.json')
+        if os.path.exists(self.path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._records) + sum(len(dates) for _, dates in self._pending)
+
+    @property
+    def records(self) -> COTRecordArray:
+        """Every stored row, sorted by asset then report date."""
+        self._merge()
+        return self._records
+
+    @records.setter
+    def records(self, records: COTRecordArray):
+        self._records = records
+        self._pending = []
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Report date (datetime64[D]) of each row of records."""
+        self._merge()
+        return self._dates
+
+    @dates.setter
+    def dates(self, dates: np.ndarray):
+        self._dates = dates
+        self._pending = []
+
+    def load(self):
+        with np.load(self.path, allow_pickle=False) as npz:
+            arrays = unpack_arrays({key: npz[key] for key in npz.files})
+        self.dates = arrays.pop('dates')
+        self.records = record_arrays_from_npz(arrays)
+        self._index()
+
+    def save(self):
+        """Write the history and the rolling state (once per ingested batch, not per row)."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        arrays = {'dates': self.dates, **record_arrays_to_npz(self.records)}
+        np.savez(tmp_path, **(pack_arrays(arrays) if self.packed else arrays))
+        os.replace(tmp_path, self.path)
+        self.rolling.save()
+
+    def ingest(self, records: COTRecordArray) -> int:
+        """Add new weekly records; rows already stored (or repeated) for the same asset/date are skipped.
+
+        Weeks after an asset's latest stored week are appended without
+        re-sorting the history; earlier weeks (backfills) are merged in
+        order. Nothing is written until save(). Returns the number of rows added.
+        """
+        dates = np.array([report_date_to_datetime64(d) for d in records.report_dates], dtype='datetime64[D]')
+        keep = ~np.isnat(dates)
+        # A week repeated within the batch is added once
+        seen = set()
+        for i, key in enumerate(zip(records.asset_names, dates)):
+            keep[i] &= key not in seen
+            seen.add(key)
+        latest = np.array([self._latest.get(str(a), np.datetime64('NaT', 'D')) for a in records.asset_names],
+                          dtype='datetime64[D]')
+        # Re-ingesting an asset's latest week is the common repeat; it needs no lookup
+        keep &= np.isnat(latest) | (dates != latest)
+        backfill = keep & ~np.isnat(latest) & (dates < latest)
+        if backfill.any():
+            keep &= np.array([not (b and self.contains(a, d))
+                              for a, d, b in zip(records.asset_names, dates, backfill)], dtype=bool)
+            backfill &= keep
+        if not keep.any():
+            return 0
+
+        added = records[keep]
+        added_dates = dates[keep]
+        if backfill.any():
+            merged = COTRecordArray.concat([self.records, added])
+            merged_dates = np.concatenate([self.dates, added_dates])
+            order = np.lexsort((merged_dates, merged.asset_names.astype(str)))
+            self.records = merged[order]
+            self.dates = merged_dates[order]
+            self._index()
+        else:
+            order = np.argsort(added_dates, kind='stable')
+            self._pending.append((added[order], added_dates[order]))
+            for name, date in zip(added.asset_names[order], added_dates[order]):
+                self._latest[str(name)] = date
+        self._update_rolling(added, added_dates)
+        return int(keep.sum())
+
+    def _merge(self):
+        """Fold the appended weeks into the sorted columns.
+
+        Appended rows are later than every stored row of their asset, so each
+        asset's rows are its stored segment followed by its appended rows in
+        arrival order: one gather, no sort over the history.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        records = COTRecordArray.concat([self._records] + [chunk for chunk, _ in pending])
+        dates = np.concatenate([self._dates] + [chunk_dates for _, chunk_dates in pending])
+
+        appended: Dict[str, List[int]] = {}
+        for row, name in enumerate(records.asset_names[len(self._records):], len(self._records)):
+            appended.setdefault(str(name), []).append(row)
+        parts = []
+        for asset in sorted(set(self._segments) | set(appended)):
+            segment = self._segments.get(asset)
+            if segment is not None:
+                parts.append(np.arange(segment.start, segment.stop))
+            parts.append(np.array(appended.get(asset, []), dtype=np.int64))
+        order = np.concatenate(parts)
+        self._records = records[order]
+        self._dates = dates[order]
+        self._index()
+
+    def _update_rolling(self, added: COTRecordArray, dates: np.ndarray):
+        """Push new weeks into the rolling state; replay an asset only on backfill."""
+        metrics = added.metrics()
+        iso_dates = dates.astype(str)
+        rebuild = set()
+        for i in np.argsort(dates, kind='stable'):
+            asset = str(added.asset_names[i])
+            last = self.rolling.last_date(asset)
+            if asset in rebuild or (last is not None and iso_dates[i] <= last):
+                rebuild.add(asset)
+                continue
+            self.rolling.update(asset, iso_dates[i], {field: float(metrics[field][i]) for field in ROLLING_FIELDS})
+
+        for asset in rebuild:
+            history = self.asset(asset).metrics()
+            self.rolling.rebuild(asset, self.asset_dates(asset).astype(str), {field: history[field] for field in ROLLING_FIELDS})
+
+    def rolling_metrics(self, asset_name: str, date: np.datetime64, values: Dict[str, float]) -> Dict[str, Optional[float]]:
+        """Rolling metrics of one week with the given ROLLING_FIELDS values, without storing it.
+
+        A week after the rolling state's latest is previewed from the state;
+        the latest week is read from it; an earlier week is replayed from the
+        stored weeks just before it.
+        """
+        iso_date = str(date)
+        last = self.rolling.last_date(asset_name)
+        if last is None or iso_date > last:
+            return self.rolling.preview(asset_name, iso_date, values)
+        if iso_date == last:
+            return self.rolling.latest(asset_name)
+        dates = self.asset_dates(asset_name)
+        stop = int(np.searchsorted(dates, date))
+        start = max(stop - max(self.rolling.index_window, self.rolling.average_window), 0)
+        history = self.asset(asset_name)[start:stop].metrics()
+        scratch = RollingMetricsState(None, self.rolling.index_window, self.rolling.average_window)
+        scratch.rebuild(asset_name, dates[start:stop].astype(str), {field: history[field] for field in ROLLING_FIELDS})
+        return scratch.preview(asset_name, iso_date, values)
+
+    def contains(self, asset_name: str, date: np.datetime64) -> bool:
+        self._merge()
+        segment = self._segments.get(asset_name)
+        if segment is None:
+            return False
+        dates = self.dates[segment]
+        i = np.searchsorted(dates, date)
+        return bool(i < len(dates) and dates[i] == date)
+
+    def assets(self) -> List[str]:
+        self._merge()
+        return list(self._segments)
+
+    def segments(self) -> Dict[str, slice]:
+        """Asset name -> slice of its contiguous, date-sorted rows."""
+        self._merge()
+        return dict(self._segments)
+
+    def asset(self, asset_name: str) -> COTRecordArray:
+        self._merge()
+        segment = self._segments.get(asset_name)
+        if segment is None:
+            raise Exception(f"No history stored for '{asset_name}'")
+        return self.records[segment]
+
+    def asset_dates(self, asset_name: str) -> np.ndarray:
+        self._merge()
+        segment = self._segments.get(asset_name)
+        return self.dates[segment] if segment is not None else np.array([], dtype='datetime64[D]')
+
+    def weekly_change(self, values: np.ndarray, reported: np.ndarray) -> np.ndarray:
+        """Week-over-week change of a per-row column from consecutive stored weeks of each asset.
+
+        Where the previous week is not stored (an asset's first week, or a
+        gap) the reported change is used instead.
+        """
+        change = np.array(reported, dtype=np.result_type(values, reported))
+        if len(values) > 1:
+            names = self.records.asset_names
+            consecutive = (names[1:] == names[:-1]) & (np.diff(self.dates) == np.timedelta64(7, 'D'))
+            rows = np.flatnonzero(consecutive) + 1
+            change[rows] = values[rows] - values[rows - 1]
+        return change
+
+    def latest_indices(self) -> np.ndarray:
+        """Row index of the most recent week for each asset."""
+        self._merge()
+        return np.array([s.stop - 1 for s in self._segments.values()], dtype=np.int64)
+
+    def latest(self) -> COTRecordArray:
+        return self.records[self.latest_indices()]
+
+    def _index(self):
+        names = self._records.asset_names
+        self._segments = {}
+        self._latest = {}
+        if not len(names):
+            return
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]])
+        stops = np.r_[starts[1:], len(names)]
+        for start, stop in zip(starts, stops):
+            self._segments[str(names[start])] = slice(int(start), int(stop))
+            self._latest[str(names[start])] = self._dates[stop - 1]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Fixed-Width Report Layouts
+The CFTC "long format" pages are fixed-width text with right-aligned
+numeric columns. A ColumnLayout is learned once per report from the header
+rows and then extracts every field of a row by slicing. A blank field (e.g.
+a missing spread) comes back as None in its own column instead of shifting
+the fields after it.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+_COLON = ord(':')
+# A number: digits with single ',' or '.' between them
+_NUMBER = re.compile(rb'\d(?:[,.]?\d)*')
+_FIELD_TABLE = bytes.maketrans(b',:', b'_ ')
+
+# Header row naming the position columns, e.g. ": Interest :   Long   :  Short   :Spreading: ..."
+HEADER_ROW = re.compile(rb'^[^\n]*:[^\n]*Long[^\n]*:[^\n]*Short[^\n]*$', re.MULTILINE)
+
+# A data row every contract has, used to check (or, failing that, derive) the header spans
+REFERENCE_ROWS = {
+    'legacy': re.compile(rb'^All +:[^\n]*', re.MULTILINE),
+    'tff': re.compile(rb'^Positions[ \r]*\n([^\n]*)', re.MULTILINE),
+}
+
+
+class ColumnLayout:
+    """Byte spans [start, end) of each right-aligned numeric column; the last column is open-ended."""
+
+    __slots__ = ('spans', 'source', '_slices')
+
+    def __init__(self, spans: Sequence[Tuple[int, Optional[int]]], source: str):
+        self.spans = list(spans)
+        self.source = source  # 'header' or 'data', for diagnostics
+        self._slices = [slice(lo, hi) for lo, hi in self.spans]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @classmethod
+    def from_header(cls, line: bytes, count: int) -> Optional['ColumnLayout']:
+        """Spans between the ':' separators of a header row, keeping the last count columns.
+
+        Values may end on the separator's own position, so each span includes it.
+        """
+        separators = [i for i, c in enumerate(line) if c == _COLON]
+        if len(separators) < count:
+            return None
+        starts = [s + 1 for s in separators[-count:]]
+        ends = [s + 1 for s in separators[-count + 1:]] + [None]
+        return cls(list(zip(starts, ends)), 'header')
+
+    @classmethod
+    def from_row(cls, starts: Sequence[int], ends: Sequence[int]) -> 'ColumnLayout':
+        """Spans from the right edges of a fully populated data row."""
+        lefts = [max(0, 2 * ends[0] - ends[1]) if len(ends) > 1 else 0] + list(ends[:-1])
+        rights = list(ends[:-1]) + [None]
+        return cls(list(zip(lefts, rights)), 'data')
+
+    def fits(self, starts: Sequence[int], ends: Sequence[int]) -> bool:
+        """Whether each number of a fully populated row falls inside its own column span."""
+        if len(starts) != len(self.spans):
+            return False
+        return all(lo <= start and (hi is None or end <= hi)
+                   for (lo, hi), start, end in zip(self.spans, starts, ends))
+
+    def row(self, line: bytes, cast=int) -> List:
+        """Every field of a data row by slicing; None where a field is blank or not a number."""
+        # Thousands separators become '_' (which int() and float() accept between digits)
+        # and column separators become padding, so each field converts straight from its slice
+        line = line.translate(_FIELD_TABLE)
+        try:
+            return [cast(line[span]) for span in self._slices]
+        except ValueError:
+            pass
+        values = []
+        for span in self._slices:
+            try:
+                values.append(cast(line[span]))
+            except ValueError:
+                values.append(None)
+        return values
+
+
+def number_spans(line: bytes, pos: int = 0) -> List[Tuple[int, int]]:
+    """(start, end) byte span of every unsigned number in a line from pos."""
+    return [number.span() for number in _NUMBER.finditer(line, pos)]
+
+
+def learn_layout(buffer, report_type: str, count: int) -> ColumnLayout:
+    """Learn a report's column layout once from its header row.
+
+    The header spans are checked against the first fully populated reference
+    row; if the header is offset from the data, that row's right edges are
+    used instead.
+    """
+    reference = None
+    for match in REFERENCE_ROWS[report_type].finditer(buffer):
+        line = match.group(match.lastindex or 0)
+        spans = number_spans(line, line.find(b':') + 1)
+        if len(spans) == count:
+            reference = ([start for start, _ in spans], [end for _, end in spans])
+            break
+
+    # The header sits above the first contract
+    header = HEADER_ROW.search(buffer, 0, match.start() if reference is not None else len(buffer))
+    layout = ColumnLayout.from_header(header.group(0), count) if header else None
+    if layout is not None and (reference is None or layout.fits(*reference)):
+        return layout
+    if reference is not None:
+        return ColumnLayout.from_row(*reference)
+    raise Exception(f"Could not learn the column layout of the {report_type} report")
+
+
+def column_values(values: List, trim: bool = False) -> List:
+    """A row of extracted fields with blanks as 0 (trailing blanks dropped if trim)."""
+    if trim:
+        while values and values[-1] is None:
+            values = values[:-1]
+    return [0 if value is None else value for value in values]
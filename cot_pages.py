@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Raw Report Pages
+Keeps CFTC report pages as raw bytes (memory-mapped when they come from
+the on-disk page cache) and hands out asset sections as memoryview slices,
+so parsing never decodes or copies the full page.
+"""
+
+import mmap
+import os
+import re
+from typing import Dict, Optional, Pattern, Tuple, Union
+
+# Compiled bytes versions of the analyzer's str section patterns
+_BYTE_PATTERNS: Dict[str, Pattern] = {}
+
+
+def byte_pattern(pattern: str, flags: int = re.DOTALL) -> Pattern:
+    """Compile a str regex for matching against raw page bytes (cached)."""
+    key = (pattern, flags)
+    compiled = _BYTE_PATTERNS.get(key)
+    if compiled is None:
+        compiled = _BYTE_PATTERNS[key] = re.compile(pattern.encode('utf-8'), flags)
+    return compiled
+
+
+class ReportPage:
+    """One report page as a read-only bytes-like buffer with a section index."""
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], sha256: Optional[str] = None):
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.sha256 = sha256
+        self.report_date: Optional[str] = None  # filled in once by the analyzer
+        self.layout = None                      # learned ColumnLayout, likewise
+        self.contracts = None                   # section headers found by cot_catalog, likewise
+        # Per-asset record, metrics and analysis, reused for as long as this page's content is current
+        self.results: Dict[str, Dict] = {}
+        self._sections: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    @classmethod
+    def open(cls, path: str, sha256: Optional[str] = None) -> 'ReportPage':
+        """Memory-map a cached page; the OS page cache is shared by every process reading it."""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(b'', sha256)
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), sha256)
+
+    @classmethod
+    def wrap(cls, content: Union['ReportPage', bytes, str]) -> 'ReportPage':
+        """Accept a page, raw bytes or already-decoded text."""
+        if isinstance(content, ReportPage):
+            return content
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return cls(content)
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def text(self) -> str:
+        """Decoded copy of the whole page (debugging and text-only consumers)."""
+        return bytes(self.view).decode('utf-8', errors='replace')
+
+    def section(self, pattern: str, pos: int = 0) -> Optional[memoryview]:
+        """Zero-copy slice of group 1 of a section pattern, or None if it is absent.
+
+        pos is where to start the first search, when the section's header is already known.
+        """
+        if pattern not in self._sections:
+            match = byte_pattern(pattern).search(self.buffer, pos)
+            self._sections[pattern] = match.span(1) if match else None
+        span = self._sections[pattern]
+        return self.view[span[0]:span[1]] if span else None
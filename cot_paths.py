@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+COT Data Paths
+Default locations of persisted artifacts, kept free of heavy imports so
+every module (and the backend) can share them cheaply.
+"""
+
+import os
+
+# Where persisted artifacts (history, archives, snapshots) live by default
+DEFAULT_DATA_DIR = os.environ.get(
+    'COT_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cot_data')
+)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+COT Price Alignment
+Daily prices from local CSV/Parquet files, kept as NumPy columns, and a
+lag-aware as-of join onto the COT history: positions are as of Tuesday
+but published on Friday, so outcomes are measured from the release-day
+close. Every (asset, date) lookup of the whole history is one
+searchsorted over a combined asset/day key.
+"""
+
+import csv
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from cot_history import COTHistoryStore
+from cot_paths import DEFAULT_DATA_DIR
+
+# Tuesday as-of date -> Friday release
+RELEASE_LAG_DAYS = 3
+# Horizons after the release for forward prices and returns
+FORWARD_WEEKS = (1, 4, 13)
+# A price older than this (e.g. past the end of the file) does not count as "as of" a date
+MAX_STALENESS_DAYS = 5
+
+DATE_COLUMNS = ('date', 'timestamp', 'time', 'day')
+PRICE_COLUMNS = ('close', 'adj close', 'adj_close', 'settle', 'settlement', 'price')
+ASSET_COLUMNS = ('asset_name', 'asset', 'symbol')
+
+# Days fit in 32 bits; the asset code goes above them in the join key
+_KEY_SHIFT = 32
+
+
+def asset_name_from_path(path: str) -> str:
+    """'EURO_FX.csv' -> 'EURO FX' for one-asset-per-file layouts."""
+    return os.path.splitext(os.path.basename(path))[0].replace('_', ' ').upper()
+
+
+def _pick(columns: List[str], candidates: Tuple[str, ...], path: str, required: bool = True) -> Optional[str]:
+    lowered = {c.strip().lower(): c for c in columns}
+    for name in candidates:
+        if name in lowered:
+            return lowered[name]
+    if required:
+        raise Exception(f"{path}: no column named any of {list(candidates)} (found {columns})")
+    return None
+
+
+def read_price_file(path: str) -> Dict[str, np.ndarray]:
+    """date / close (and asset_name when present) columns of a CSV or Parquet price file.
+
+    Dates must be ISO 'YYYY-MM-DD' (a time part is ignored).
+    """
+    if path.lower().endswith(('.parquet', '.pq')):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        raw = {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise Exception(f"{path}: empty price file")
+            rows = [row for row in reader if row]
+        raw = {name: np.array([row[i] for row in rows], dtype=object) for i, name in enumerate(header)}
+
+    names = list(raw)
+    date_column = _pick(names, DATE_COLUMNS, path)
+    price_column = _pick(names, PRICE_COLUMNS, path)
+    asset_column = _pick(names, ASSET_COLUMNS, path, required=False)
+
+    dates = raw[date_column]
+    if dates.dtype.kind != 'M':
+        try:
+            # Truncating to 'YYYY-MM-DD' drops any time part
+            dates = dates.astype(str).astype('U10').astype('datetime64[D]')
+        except ValueError as e:
+            raise Exception(f"{path}: dates must be ISO YYYY-MM-DD ({e})")
+    columns = {
+        'date': dates.astype('datetime64[D]'),
+        'close': np.array(raw[price_column], dtype=np.float64),
+    }
+    if asset_column is not None:
+        columns['asset_name'] = raw[asset_column].astype(str)
+    return columns
+
+
+class PriceStore:
+    """Daily closes for many assets, sorted by asset then date, backed by one .npz file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(DEFAULT_DATA_DIR, 'prices.npz')
+        self.assets: List[str] = []
+        self.codes = np.array([], dtype=np.int64)
+        self.dates = np.array([], dtype='datetime64[D]')
+        self.close = np.array([], dtype=np.float64)
+        self._segments: Dict[str, slice] = {}
+        if os.path.exists(self.path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def load(self):
+        with np.load(self.path, allow_pickle=False) as npz:
+            self.assets = npz['assets'].tolist()
+            self.codes = npz['codes']
+            self.dates = npz['dates']
+            self.close = npz['close']
+        self._index()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, assets=np.array(self.assets, dtype=str), codes=self.codes,
+                 dates=self.dates, close=self.close)
+        os.replace(tmp_path, self.path)
+
+    def ingest_file(self, path: str, asset_name: Optional[str] = None, save: bool = True) -> int:
+        """Add a price file; rows for an (asset, date) already stored are replaced.
+
+        The asset comes from the file's asset column, else asset_name, else
+        the file name (asset_name_from_path). Returns the rows read.
+        """
+        columns = read_price_file(path)
+        n = len(columns['date'])
+        names = columns.get('asset_name')
+        if names is None:
+            names = np.full(n, asset_name or asset_name_from_path(path))
+        keep = ~np.isnat(columns['date']) & ~np.isnan(columns['close'])
+
+        unique, inverse = np.unique(names[keep], return_inverse=True)
+        for name in unique.tolist():
+            if name not in self.assets:
+                self.assets.append(name)
+        codes = self._codes(unique)[inverse]
+
+        # Newer rows last, so keeping each key's last occurrence lets them win
+        all_codes = np.concatenate([self.codes, codes])
+        all_dates = np.concatenate([self.dates, columns['date'][keep]])
+        all_close = np.concatenate([self.close, columns['close'][keep]])
+        keys = _join_keys(all_codes, all_dates)
+        _, last = np.unique(keys[::-1], return_index=True)
+        order = len(keys) - 1 - last  # np.unique sorts, so rows come out by asset then date
+        self.codes, self.dates, self.close = all_codes[order], all_dates[order], all_close[order]
+        self._index()
+        if save:
+            self.save()
+        return int(keep.sum())
+
+    def ingest_dir(self, directory: str, save: bool = True) -> int:
+        """Ingest every .csv / .parquet file in a directory."""
+        total = 0
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(('.csv', '.parquet', '.pq')):
+                total += self.ingest_file(os.path.join(directory, name), save=False)
+        if save:
+            self.save()
+        return total
+
+    def _index(self):
+        self._segments = {}
+        if not len(self.codes):
+            return
+        starts = np.flatnonzero(np.r_[True, self.codes[1:] != self.codes[:-1]])
+        stops = np.r_[starts[1:], len(self.codes)]
+        for start, stop in zip(starts, stops):
+            self._segments[self.assets[self.codes[start]]] = slice(int(start), int(stop))
+
+    def segments(self) -> Dict[str, slice]:
+        return dict(self._segments)
+
+    def _codes(self, names: np.ndarray) -> np.ndarray:
+        """Asset code of each distinct name (-1 when the store has no prices for it)."""
+        code_of = {name: i for i, name in enumerate(self.assets)}
+        return np.array([code_of.get(name, -1) for name in names.tolist()], dtype=np.int64)
+
+    def as_of(self, asset_names: np.ndarray, dates: np.ndarray,
+              max_staleness_days: int = MAX_STALENESS_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+        """Last close on or before each (asset, date), and its date; NaN / NaT where none is fresh enough.
+
+        One searchsorted for every lookup, whatever the mix of assets.
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        unique, inverse = np.unique(np.asarray(asset_names).astype(str), return_inverse=True)
+        codes = self._codes(unique)[inverse]
+        prices = np.full(len(dates), np.nan)
+        matched = np.full(len(dates), np.datetime64('NaT'), dtype='datetime64[D]')
+        if not len(self):
+            return prices, matched
+
+        i = np.searchsorted(_join_keys(self.codes, self.dates), _join_keys(codes, dates), side='right') - 1
+        j = np.clip(i, 0, None)
+        valid = ((i >= 0) & (codes >= 0) & ~np.isnat(dates) & (self.codes[j] == codes)
+                 & (dates - self.dates[j] <= np.timedelta64(max_staleness_days, 'D')))
+        prices[valid] = self.close[j[valid]]
+        matched[valid] = self.dates[j[valid]]
+        return prices, matched
+
+
+def _join_keys(codes: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """Sortable int64 key per (asset code, day); NaT days sort first within their asset."""
+    days = dates.astype('datetime64[D]').astype(np.int64)
+    days = np.where(np.isnat(dates), -(1 << 31), days)
+    return (codes << _KEY_SHIFT) + days
+
+
+def align_prices(store: COTHistoryStore, prices: PriceStore,
+                 forward_weeks: Tuple[int, ...] = FORWARD_WEEKS,
+                 release_lag_days: int = RELEASE_LAG_DAYS) -> Dict[str, np.ndarray]:
+    """As-of prices for every stored COT week, aligned row for row with the history store.
+
+    Columns: price_as_of (Tuesday), release_date, price_release (close on
+    the Friday release), and for each horizon h the close h weeks after
+    the release (price_{h}w) and the return from the release close
+    (return_{h}w, %). Missing or stale prices are NaN. Holiday-delayed
+    releases are not modeled; the lag is fixed.
+    """
+    names = store.records.asset_names
+    as_of_dates = store.dates
+    release_dates = as_of_dates + np.timedelta64(release_lag_days, 'D')
+
+    columns = {'asset_name': names, 'report_date': as_of_dates, 'release_date': release_dates}
+    columns['price_as_of'], _ = prices.as_of(names, as_of_dates)
+    columns['price_release'], _ = prices.as_of(names, release_dates)
+    for weeks in forward_weeks:
+        forward, _ = prices.as_of(names, release_dates + np.timedelta64(7 * weeks, 'D'))
+        columns[f"price_{weeks}w"] = forward
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns[f"return_{weeks}w"] = (forward / columns['price_release'] - 1) * 100
+    return columns
+
+
+def main():
+    """Price ingestion command-line entry point."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Ingest local daily price files (CSV or Parquet) for COT outcome analysis')
+    parser.add_argument('paths', nargs='+', help='Price files, or directories of them')
+    parser.add_argument('--asset', help='Asset name for single-asset files without an asset column '
+                                        '(default: from the file name, EURO_FX.csv -> EURO FX)')
+    parser.add_argument('--store', default=None, help='Price store (.npz) to update (default: the shared store)')
+    args = parser.parse_args()
+
+    try:
+        prices = PriceStore(args.store)
+        rows = 0
+        for path in args.paths:
+            if os.path.isdir(path):
+                rows += prices.ingest_dir(path, save=False)
+            else:
+                rows += prices.ingest_file(path, args.asset, save=False)
+        prices.save()
+        print(f"💾 Ingested {rows} daily prices; {len(prices)} stored for {len(prices.assets)} assets in {prices.path}")
+    except Exception as e:
+        print(f"❌ Error ingesting prices: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+COT History Queries
+Range / projection / downsampling reads over the COTHistoryStore for the
+history API. An asset's rows are contiguous and date-sorted, so a query is
+two binary searches and a slice of the requested columns; results stay
+columnar all the way to the columnar JSON or Arrow IPC response.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+
+from cot_history import COTHistoryStore
+from cot_records import POSITION_FIELDS
+
+# Derived per-week fields, as computed by COTRecordArray.metrics()
+METRIC_FIELDS = (
+    'non_commercial_net', 'commercial_net',
+    'non_commercial_long_pct', 'non_commercial_short_pct',
+    'commercial_long_pct', 'commercial_short_pct',
+    'non_commercial_ratio', 'commercial_ratio',
+    'nc_long_change', 'nc_short_change', 'nc_net_change',
+)
+HISTORY_FIELDS = POSITION_FIELDS + METRIC_FIELDS
+
+# Resampling keeps the last week of each period; weekly changes are summed over it
+RESAMPLE_RULES = ('weekly', 'monthly', 'quarterly')
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+ARROW_STREAM_MIME = 'application/vnd.apache.arrow.stream'
+
+
+def _parse_date(value: Optional[str], name: str) -> Optional[np.datetime64]:
+    if not value:
+        return None
+    try:
+        return np.datetime64(value[:10], 'D')
+    except ValueError:
+        raise Exception(f"Invalid {name} date '{value}', expected YYYY-MM-DD")
+
+
+def _resample(dates: np.ndarray, columns: Dict[str, np.ndarray], rule: str):
+    """Last week of each month or quarter; *_change fields are summed over the period."""
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    keys = months // 3 if rule == 'quarterly' else months
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lasts = np.r_[starts[1:], len(keys)] - 1
+    resampled = {}
+    for name, values in columns.items():
+        if name.endswith('_change'):
+            resampled[name] = np.add.reduceat(values, starts)
+        else:
+            resampled[name] = values[lasts]
+    return dates[lasts], resampled
+
+
+def query_history(store: COTHistoryStore, asset_name: str, start: Optional[str] = None,
+                  end: Optional[str] = None, fields: Optional[List[str]] = None,
+                  resample: Optional[str] = None, cursor: Optional[str] = None,
+                  limit: Optional[int] = None) -> Dict:
+    """One page of an asset's history as columns.
+
+    start/end bound report dates inclusively ('YYYY-MM-DD'); fields picks
+    columns from HISTORY_FIELDS (default: the position fields); resample is
+    one of RESAMPLE_RULES. Pass the returned next_cursor back as cursor to
+    read the following page; it is None on the last page.
+    """
+    fields = list(fields or POSITION_FIELDS)
+    unknown = [f for f in fields if f not in HISTORY_FIELDS]
+    if unknown:
+        raise Exception(f"Unknown history fields {unknown}. Available fields: {list(HISTORY_FIELDS)}")
+    resample = resample or 'weekly'
+    if resample not in RESAMPLE_RULES:
+        raise Exception(f"Unknown resample rule '{resample}'. Use one of {RESAMPLE_RULES}")
+    limit = min(max(1, limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+
+    segment = store.segments().get(asset_name)
+    if segment is None:
+        raise Exception(f"No history stored for '{asset_name}'")
+    dates = store.dates[segment]
+    lo, hi = 0, len(dates)
+    start_date, end_date = _parse_date(start, 'from'), _parse_date(end, 'to')
+    if start_date is not None:
+        lo = int(np.searchsorted(dates, start_date, side='left'))
+    if end_date is not None:
+        hi = int(np.searchsorted(dates, end_date, side='right'))
+    hi = max(lo, hi)
+
+    # Slices of the store's columns are views; metrics are computed only for the range when asked for
+    rows = slice(segment.start + lo, segment.start + hi)
+    columns = {f: store.records.positions[f][rows] for f in fields if f in POSITION_FIELDS}
+    if any(f in METRIC_FIELDS for f in fields):
+        metrics = store.records[rows].metrics()
+        columns.update({f: metrics[f] for f in fields if f in METRIC_FIELDS})
+    dates = dates[lo:hi]
+    if resample != 'weekly' and len(dates):
+        dates, columns = _resample(dates, columns, resample)
+
+    # Pages are keyed by the last report date returned, so they stay stable as weeks are added
+    first = 0
+    after = _parse_date(cursor, 'cursor')
+    if after is not None:
+        first = int(np.searchsorted(dates, after, side='right'))
+    last = min(first + limit, len(dates))
+    next_cursor = str(dates[last - 1]) if last < len(dates) else None
+
+    return {
+        'asset_name': asset_name,
+        'resample': resample,
+        'fields': fields,
+        'dates': dates[first:last],
+        'columns': {f: columns[f][first:last] for f in fields},
+        'next_cursor': next_cursor
+    }
+
+
+def _json_column(values: np.ndarray) -> List:
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        # JSON has no NaN; missing ratios/percentages become null
+        return np.where(np.isnan(values), None, values.astype(object)).tolist()
+    return values.tolist()
+
+
+def history_to_json(result: Dict) -> Dict:
+    """Columnar JSON body: one list per field plus ISO report dates."""
+    columns = {'report_date': result['dates'].astype(str).tolist()}
+    columns.update({name: _json_column(values) for name, values in result['columns'].items()})
+    return {
+        'asset_name': result['asset_name'],
+        'resample': result['resample'],
+        'fields': result['fields'],
+        'count': len(result['dates']),
+        'next_cursor': result['next_cursor'],
+        'columns': columns
+    }
+
+
+def history_to_arrow(result: Dict) -> bytes:
+    """Arrow IPC stream of the page (report_date as date32, NaN as null); next_cursor is in the schema metadata."""
+    import pyarrow as pa
+    arrays = [pa.array(result['dates'], type=pa.date32())]
+    arrays.extend(pa.array(values, from_pandas=True) for values in result['columns'].values())
+    metadata = {'asset_name': result['asset_name'], 'resample': result['resample'],
+                'next_cursor': result['next_cursor'] or ''}
+    table = pa.Table.from_arrays(arrays, names=['report_date'] + list(result['columns']), metadata=metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+COT Record Arrays
+NumPy-backed struct-of-arrays collection of COT records for history-scale
+work, and its flat .npz form.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+import numpy as np
+
+from cot_records import (COTDetail, COTRecord, DETAIL_WIDTH, MAX_CHANGES, NON_COMMERCIAL_COLUMNS,
+                         POSITION_FIELDS, REPORT_COLUMNS, REPORT_ROWS, REPORT_TYPES)
+
+
+class COTRecordView(Mapping):
+    """Read-only dict-shaped view over one row of a COTRecordArray (no copy)."""
+
+    __slots__ = ('_array', '_index')
+
+    _KEYS = ('asset_name', 'report_date') + POSITION_FIELDS + ('changes',)
+
+    def __init__(self, array: 'COTRecordArray', index: int):
+        self._array = array
+        self._index = index
+
+    def __getitem__(self, key: str):
+        array, i = self._array, self._index
+        if key in array.positions:
+            return int(array.positions[key][i])
+        if key == 'asset_name':
+            return str(array.asset_names[i])
+        if key == 'report_date':
+            return str(array.report_dates[i])
+        if key == 'changes':
+            return array.changes[i, :array.change_counts[i]].tolist()
+        if key == 'detail':
+            return _load_detail(array.detail, i)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+class COTRecordArray:
+    """Struct-of-arrays collection of COT records backed by NumPy columns.
+
+    The full breakdown lives in ``detail``: a dict of arrays padded to
+    DETAIL_WIDTH columns, with ``report_type`` holding an index into
+    REPORT_TYPES (-1 where a record has no breakdown).
+    """
+
+    def __init__(self, asset_names: np.ndarray, report_dates: np.ndarray,
+                 positions: Dict[str, np.ndarray], changes: np.ndarray,
+                 change_counts: np.ndarray, detail: Dict[str, np.ndarray]):
+        self.asset_names = asset_names
+        self.report_dates = report_dates
+        self.positions = positions
+        self.changes = changes
+        self.change_counts = change_counts
+        self.detail = detail
+
+    @classmethod
+    def empty(cls) -> 'COTRecordArray':
+        return cls.from_records([])
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> 'COTRecordArray':
+        """Build the columnar form from COTRecords or API-shaped dicts."""
+        records = [r if isinstance(r, COTRecord) else COTRecord.from_dict(r) for r in records]
+        n = len(records)
+
+        positions = {}
+        for name in POSITION_FIELDS:
+            positions[name] = np.fromiter((getattr(r, name) for r in records), dtype=np.int64, count=n)
+
+        changes = np.zeros((n, MAX_CHANGES), dtype=np.int64)
+        change_counts = np.zeros(n, dtype=np.int8)
+        detail = _empty_detail(n)
+        for i, r in enumerate(records):
+            if r.changes:
+                changes[i, :len(r.changes)] = r.changes
+                change_counts[i] = len(r.changes)
+            if r.detail is not None:
+                _store_detail(detail, i, r.detail)
+
+        return cls(
+            np.array([r.asset_name for r in records], dtype=object),
+            np.array([r.report_date for r in records], dtype=object),
+            positions,
+            changes,
+            change_counts,
+            detail
+        )
+
+    @classmethod
+    def concat(cls, arrays: Sequence['COTRecordArray']) -> 'COTRecordArray':
+        arrays = [a for a in arrays if len(a)]
+        if not arrays:
+            return cls.empty()
+        return cls(
+            np.concatenate([a.asset_names for a in arrays]),
+            np.concatenate([a.report_dates for a in arrays]),
+            {name: np.concatenate([a.positions[name] for a in arrays]) for name in POSITION_FIELDS},
+            np.concatenate([a.changes for a in arrays]),
+            np.concatenate([a.change_counts for a in arrays]),
+            {name: np.concatenate([a.detail[name] for a in arrays]) for name in arrays[0].detail}
+        )
+
+    def __len__(self) -> int:
+        return len(self.asset_names)
+
+    def __getitem__(self, index):
+        """Integer index returns a COTRecord; slices and masks return a new array."""
+        if isinstance(index, (int, np.integer)):
+            return self.record(int(index))
+        return COTRecordArray(
+            self.asset_names[index],
+            self.report_dates[index],
+            {name: column[index] for name, column in self.positions.items()},
+            self.changes[index],
+            self.change_counts[index],
+            {name: column[index] for name, column in self.detail.items()}
+        )
+
+    def __iter__(self) -> Iterator[COTRecord]:
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a position column (a view, not a copy)."""
+        if name not in self.positions:
+            raise Exception(f"Unknown COT column '{name}'")
+        return self.positions[name]
+
+    def detail_column(self, column: str, row: str = 'all', kind: str = 'positions') -> np.ndarray:
+        """One breakdown column across all records, e.g. 'leveraged_funds_short'.
+
+        Records whose report type has no such column (or no breakdown) are NaN,
+        so per-category extremes can be taken with np.nanmax/np.nanmin.
+        """
+        result = np.full(len(self), np.nan)
+        found = False
+        for code, report_type in enumerate(REPORT_TYPES):
+            columns = REPORT_COLUMNS[report_type]
+            if column not in columns:
+                continue
+            found = True
+            index = columns.index(column)
+            if kind == 'changes':
+                values, present = self.detail['changes'][:, index], self.detail['has_changes']
+            else:
+                r = REPORT_ROWS.index(row)
+                values = self.detail[kind][:, r, index]
+                present = self.detail[f"{kind}_rows"][:, r]
+            mask = (self.detail['report_type'] == code) & present
+            result[mask] = values[mask]
+        if not found:
+            raise Exception(f"Unknown COT breakdown column '{column}'")
+        return result
+
+    def record(self, index: int) -> COTRecord:
+        count = self.change_counts[index]
+        return COTRecord(
+            str(self.asset_names[index]),
+            str(self.report_dates[index]),
+            *[int(self.positions[name][index]) for name in POSITION_FIELDS],
+            changes=self.changes[index, :count].tolist(),
+            detail=_load_detail(self.detail, index)
+        )
+
+    def view(self, index: int) -> COTRecordView:
+        """Dict-shaped view of one row, for code that expects the API shape."""
+        return COTRecordView(self, index)
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Column mapping in API field names; arrays are shared, not copied."""
+        columns = {'asset_name': self.asset_names, 'report_date': self.report_dates}
+        columns.update(self.positions)
+        columns['changes'] = self.changes
+        return columns
+
+    def to_dicts(self) -> List[Dict]:
+        """Materialize every row in the API dict/JSON shape."""
+        columns = {name: self.positions[name].tolist() for name in POSITION_FIELDS}
+        changes = self.changes.tolist()
+        counts = self.change_counts.tolist()
+        rows = []
+        for i in range(len(self)):
+            row = {'asset_name': str(self.asset_names[i]), 'report_date': str(self.report_dates[i])}
+            for name in POSITION_FIELDS:
+                row[name] = columns[name][i]
+            row['changes'] = changes[i][:counts[i]]
+            detail = _load_detail(self.detail, i)
+            if detail is not None:
+                row['breakdown'] = detail.to_dict()
+            rows.append(row)
+        return rows
+
+    def metrics(self) -> Dict[str, np.ndarray]:
+        """Vectorized equivalent of MultiAssetCOTAnalyzer.calculate_metrics.
+
+        Percentages and ratios are NaN where calculate_metrics would omit the key.
+        """
+        p = self.positions
+        total_oi = p['total_open_interest'].astype(np.float64)
+        nc_long = p['non_commercial_long'].astype(np.float64)
+        nc_short = p['non_commercial_short'].astype(np.float64)
+        comm_long = p['commercial_long'].astype(np.float64)
+        comm_short = p['commercial_short'].astype(np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            oi = np.where(total_oi > 0, total_oi, np.nan)
+            metrics = {
+                'non_commercial_net': p['non_commercial_long'] - p['non_commercial_short'],
+                'commercial_net': p['commercial_long'] - p['commercial_short'],
+                'non_commercial_long_pct': nc_long / oi * 100,
+                'non_commercial_short_pct': nc_short / oi * 100,
+                'commercial_long_pct': comm_long / oi * 100,
+                'commercial_short_pct': comm_short / oi * 100,
+                'non_commercial_ratio': nc_long / np.where(nc_short > 0, nc_short, np.nan),
+                'commercial_ratio': comm_long / np.where(comm_short > 0, comm_short, np.nan),
+            }
+
+        # As cot_records.non_commercial_changes: from the breakdown where there is one,
+        # otherwise the collapsed changes in legacy order
+        has_changes = self.change_counts >= 4
+        nc_long_change = np.where(has_changes, self.changes[:, 0], 0)
+        nc_short_change = np.where(has_changes, self.changes[:, 1], 0)
+        for code, report_type in enumerate(REPORT_TYPES):
+            rows = (self.detail['report_type'] == code) & self.detail['has_changes']
+            if not rows.any():
+                continue
+            long_columns, short_columns = (
+                [REPORT_COLUMNS[report_type].index(column) for column in side]
+                for side in NON_COMMERCIAL_COLUMNS[report_type])
+            nc_long_change[rows] = self.detail['changes'][rows][:, long_columns].sum(axis=1)
+            nc_short_change[rows] = self.detail['changes'][rows][:, short_columns].sum(axis=1)
+        metrics['nc_long_change'] = nc_long_change
+        metrics['nc_short_change'] = nc_short_change
+        metrics['nc_net_change'] = nc_long_change - nc_short_change
+        return metrics
+
+
+def _empty_detail(n: int) -> Dict[str, np.ndarray]:
+    rows = len(REPORT_ROWS)
+    return {
+        'report_type': np.full(n, -1, dtype=np.int8),
+        'positions': np.zeros((n, rows, DETAIL_WIDTH), dtype=np.int64),
+        'positions_rows': np.zeros((n, rows), dtype=bool),
+        'changes': np.zeros((n, DETAIL_WIDTH), dtype=np.int64),
+        'has_changes': np.zeros(n, dtype=bool),
+        'percent_of_oi': np.zeros((n, rows, DETAIL_WIDTH), dtype=np.float64),
+        'percent_of_oi_rows': np.zeros((n, rows), dtype=bool),
+        'traders': np.zeros((n, rows, DETAIL_WIDTH), dtype=np.int32),
+        'traders_rows': np.zeros((n, rows), dtype=bool),
+        'total_traders': np.zeros(n, dtype=np.int32),
+        'open_interest_change': np.zeros(n, dtype=np.int64),
+    }
+
+
+def _store_detail(arrays: Dict[str, np.ndarray], i: int, detail: COTDetail):
+    width = len(detail.columns)
+    arrays['report_type'][i] = REPORT_TYPES.index(detail.report_type)
+    for kind in ('positions', 'percent_of_oi', 'traders'):
+        for row, values in getattr(detail, kind).items():
+            r = REPORT_ROWS.index(row)
+            arrays[kind][i, r, :width] = values
+            arrays[f"{kind}_rows"][i, r] = True
+    if detail.changes:
+        arrays['changes'][i, :width] = detail.changes
+        arrays['has_changes'][i] = True
+    arrays['total_traders'][i] = detail.total_traders
+    arrays['open_interest_change'][i] = detail.open_interest_change
+
+
+def _load_detail(arrays: Dict[str, np.ndarray], i: int) -> Optional[COTDetail]:
+    code = arrays['report_type'][i]
+    if code < 0:
+        return None
+    report_type = REPORT_TYPES[code]
+    width = len(REPORT_COLUMNS[report_type])
+    rows = {}
+    for kind in ('positions', 'percent_of_oi', 'traders'):
+        rows[kind] = {
+            row: arrays[kind][i, r, :width].tolist()
+            for r, row in enumerate(REPORT_ROWS) if arrays[f"{kind}_rows"][i, r]
+        }
+    return COTDetail(
+        report_type,
+        positions=rows['positions'],
+        changes=arrays['changes'][i, :width].tolist() if arrays['has_changes'][i] else (),
+        percent_of_oi=rows['percent_of_oi'],
+        traders=rows['traders'],
+        total_traders=int(arrays['total_traders'][i]),
+        open_interest_change=int(arrays['open_interest_change'][i])
+    )
+
+
+def record_arrays_to_npz(array: COTRecordArray) -> Dict[str, np.ndarray]:
+    """Flatten a COTRecordArray into plain arrays for np.savez (no pickling)."""
+    arrays = {
+        'asset_name': array.asset_names.astype(str),
+        'report_date': array.report_dates.astype(str),
+        'changes': array.changes,
+        'change_counts': array.change_counts,
+    }
+    for name, column in array.positions.items():
+        arrays[f"pos_{name}"] = column
+    for name, column in array.detail.items():
+        arrays[f"detail_{name}"] = column
+    return arrays
+
+
+def record_arrays_from_npz(arrays: Mapping[str, np.ndarray]) -> COTRecordArray:
+    """Inverse of record_arrays_to_npz."""
+    return COTRecordArray(
+        arrays['asset_name'].astype(object),
+        arrays['report_date'].astype(object),
+        {name: arrays[f"pos_{name}"] for name in POSITION_FIELDS},
+        arrays['changes'],
+        arrays['change_counts'],
+        {key[len('detail_'):]: arrays[key] for key in arrays.keys() if key.startswith('detail_')}
+    )
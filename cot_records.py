@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+COT Record Types
+Compact typed representations of parsed CFTC Commitments of Traders data:
+a slotted record for a single asset/week, plus (in cot_record_array, loaded
+on first use so importing the records does not pull in NumPy) a
+struct-of-arrays collection for history-scale work.
+"""
+
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+# Integer position fields, in the order the API has always returned them
+POSITION_FIELDS = (
+    'total_open_interest',
+    'non_commercial_long',
+    'non_commercial_short',
+    'spreading',
+    'commercial_long',
+    'commercial_short',
+    'total_long',
+    'total_short',
+    'nonreportable_long',
+    'nonreportable_short',
+)
+
+# Parsers keep at most this many weekly change values per record
+MAX_CHANGES = 10
+
+# Full column layouts of the CFTC long-format reports. The legacy report
+# (ICE/CME pages) lines up with POSITION_FIELDS; the Traders in Financial
+# Futures (TFF) report splits reportables into four categories.
+REPORT_COLUMNS = {
+    'legacy': POSITION_FIELDS,
+    'tff': (
+        'dealer_long', 'dealer_short', 'dealer_spreading',
+        'asset_manager_long', 'asset_manager_short', 'asset_manager_spreading',
+        'leveraged_funds_long', 'leveraged_funds_short', 'leveraged_funds_spreading',
+        'other_reportables_long', 'other_reportables_short', 'other_reportables_spreading',
+        'nonreportable_long', 'nonreportable_short',
+    ),
+}
+
+# Trader categories per report type: category -> {side: column}
+REPORT_CATEGORIES = {
+    'legacy': {
+        'non_commercial': {'long': 'non_commercial_long', 'short': 'non_commercial_short', 'spreading': 'spreading'},
+        'commercial': {'long': 'commercial_long', 'short': 'commercial_short'},
+        'total': {'long': 'total_long', 'short': 'total_short'},
+        'nonreportable': {'long': 'nonreportable_long', 'short': 'nonreportable_short'},
+    },
+    'tff': {
+        category: {side: f"{category}_{side}" for side in ('long', 'short', 'spreading')
+                   if f"{category}_{side}" in REPORT_COLUMNS['tff']}
+        for category in ('dealer', 'asset_manager', 'leveraged_funds', 'other_reportables', 'nonreportable')
+    },
+}
+
+# Breakdown columns making up the collapsed non-commercial (long, short) of each report
+# type; for TFF the parser counts leveraged funds plus other reportables as speculators
+NON_COMMERCIAL_COLUMNS = {
+    'legacy': (('non_commercial_long',), ('non_commercial_short',)),
+    'tff': (('leveraged_funds_long', 'other_reportables_long'),
+            ('leveraged_funds_short', 'other_reportables_short')),
+}
+
+# Crop-year rows: legacy reports break All into Old and Other, TFF only has All
+REPORT_ROWS = ('all', 'old', 'other')
+
+REPORT_TYPES = tuple(REPORT_COLUMNS)
+DETAIL_WIDTH = max(len(columns) for columns in REPORT_COLUMNS.values())
+
+
+class COTDetail:
+    """Complete positional breakdown of one report section.
+
+    Every row is a tuple aligned with REPORT_COLUMNS[report_type]. Rows that
+    a report does not publish are absent; missing cells are zero. For legacy
+    reports the first column of a traders row is the total trader count.
+    """
+
+    __slots__ = ('report_type', 'positions', 'changes', 'percent_of_oi',
+                 'traders', 'total_traders', 'open_interest_change')
+
+    def __init__(self, report_type: str,
+                 positions: Optional[Dict[str, Sequence[int]]] = None,
+                 changes: Sequence[int] = (),
+                 percent_of_oi: Optional[Dict[str, Sequence[float]]] = None,
+                 traders: Optional[Dict[str, Sequence[int]]] = None,
+                 total_traders: int = 0,
+                 open_interest_change: int = 0):
+        if report_type not in REPORT_COLUMNS:
+            raise Exception(f"Unknown report type '{report_type}'")
+        width = len(REPORT_COLUMNS[report_type])
+        self.report_type = report_type
+        self.positions = {row: _fit(values, width) for row, values in (positions or {}).items()}
+        self.changes = _fit(changes, width) if changes else ()
+        self.percent_of_oi = {row: _fit(values, width, 0.0) for row, values in (percent_of_oi or {}).items()}
+        self.traders = {row: _fit(values, width) for row, values in (traders or {}).items()}
+        self.total_traders = total_traders
+        self.open_interest_change = open_interest_change
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return REPORT_COLUMNS[self.report_type]
+
+    @property
+    def categories(self) -> Tuple[str, ...]:
+        return tuple(REPORT_CATEGORIES[self.report_type])
+
+    def value(self, column: str, row: str = 'all', kind: str = 'positions'):
+        """Look up one cell, e.g. value('leveraged_funds_short')."""
+        index = self.columns.index(column)
+        if kind == 'changes':
+            return self.changes[index] if self.changes else 0
+        values = getattr(self, kind).get(row)
+        return values[index] if values else 0
+
+    def category(self, name: str, row: str = 'all') -> Dict:
+        """Long/short/spreading positions, changes, % of OI and traders for one category."""
+        sides = REPORT_CATEGORIES[self.report_type].get(name)
+        if sides is None:
+            raise Exception(f"Unknown {self.report_type} category '{name}'. Available: {list(self.categories)}")
+        result = {}
+        for side, column in sides.items():
+            result[side] = self.value(column, row)
+            result[f"{side}_change"] = self.value(column, kind='changes')
+            result[f"{side}_pct"] = self.value(column, row, 'percent_of_oi')
+            result[f"{side}_traders"] = self.value(column, row, 'traders')
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            'report_type': self.report_type,
+            'columns': list(self.columns),
+            'positions': {row: list(values) for row, values in self.positions.items()},
+            'changes': list(self.changes),
+            'percent_of_oi': {row: list(values) for row, values in self.percent_of_oi.items()},
+            'traders': {row: list(values) for row, values in self.traders.items()},
+            'total_traders': self.total_traders,
+            'open_interest_change': self.open_interest_change
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'COTDetail':
+        return cls(
+            data['report_type'],
+            positions=data.get('positions'),
+            changes=data.get('changes', ()),
+            percent_of_oi=data.get('percent_of_oi'),
+            traders=data.get('traders'),
+            total_traders=data.get('total_traders', 0),
+            open_interest_change=data.get('open_interest_change', 0)
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, COTDetail):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+
+def non_commercial_changes(changes: Sequence[int],
+                           detail: Optional[COTDetail] = None) -> Optional[Tuple[int, int]]:
+    """Weekly (long, short) change of the non-commercial positions, or None if not reported.
+
+    Taken from the breakdown when there is one: a TFF record's collapsed
+    changes are dealer / asset manager columns, not speculators. Without it,
+    changes are in legacy order (non-commercial long first).
+    """
+    if detail is not None and detail.changes:
+        long_columns, short_columns = NON_COMMERCIAL_COLUMNS[detail.report_type]
+        return (sum(detail.value(column, kind='changes') for column in long_columns),
+                sum(detail.value(column, kind='changes') for column in short_columns))
+    if len(changes) >= 4:
+        return changes[0], changes[1]
+    return None
+
+
+def _fit(values: Sequence, width: int, fill=0) -> tuple:
+    """Truncate or zero-pad a parsed row to the layout width."""
+    values = tuple(values[:width])
+    return values + (fill,) * (width - len(values))
+
+
+class COTRecord:
+    """One week of COT positions for a single asset."""
+
+    __slots__ = ('asset_name', 'report_date') + POSITION_FIELDS + ('changes', 'detail')
+
+    def __init__(self, asset_name: str, report_date: str,
+                 total_open_interest: int = 0,
+                 non_commercial_long: int = 0, non_commercial_short: int = 0,
+                 spreading: int = 0,
+                 commercial_long: int = 0, commercial_short: int = 0,
+                 total_long: int = 0, total_short: int = 0,
+                 nonreportable_long: int = 0, nonreportable_short: int = 0,
+                 changes: Sequence[int] = (),
+                 detail: Optional[COTDetail] = None):
+        self.asset_name = asset_name
+        self.report_date = report_date
+        self.total_open_interest = total_open_interest
+        self.non_commercial_long = non_commercial_long
+        self.non_commercial_short = non_commercial_short
+        self.spreading = spreading
+        self.commercial_long = commercial_long
+        self.commercial_short = commercial_short
+        self.total_long = total_long
+        self.total_short = total_short
+        self.nonreportable_long = nonreportable_long
+        self.nonreportable_short = nonreportable_short
+        self.changes = tuple(changes[:MAX_CHANGES])
+        self.detail = detail
+
+    # Mapping-style access so existing code written against the old dicts keeps working
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, COTRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"COTRecord({self.asset_name!r}, {self.report_date!r}, "
+                f"oi={self.total_open_interest}, nc={self.non_commercial_long}/{self.non_commercial_short}, "
+                f"comm={self.commercial_long}/{self.commercial_short})")
+
+    def to_dict(self) -> Dict:
+        """Return the record in the dict/JSON shape used by the API."""
+        result = {'asset_name': self.asset_name, 'report_date': self.report_date}
+        for name in POSITION_FIELDS:
+            result[name] = getattr(self, name)
+        result['changes'] = list(self.changes)
+        if self.detail is not None:
+            result['breakdown'] = self.detail.to_dict()
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'COTRecord':
+        """Build a record from the API dict shape."""
+        breakdown = data.get('breakdown')
+        return cls(
+            data.get('asset_name', ''),
+            data.get('report_date', 'Unknown'),
+            *[int(data.get(name, 0)) for name in POSITION_FIELDS],
+            changes=[int(x) for x in data.get('changes', [])],
+            detail=COTDetail.from_dict(breakdown) if breakdown else None
+        )
+
+
+# NumPy-backed names re-exported lazily from cot_record_array
+_ARRAY_EXPORTS = ('COTRecordView', 'COTRecordArray', 'record_arrays_to_npz', 'record_arrays_from_npz')
+
+
+def __getattr__(name: str):
+    if name in _ARRAY_EXPORTS:
+        import cot_record_array
+        return getattr(cot_record_array, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Incremental Rolling COT Metrics
+Keeps per-asset rolling windows over weekly net positioning so that a new
+CFTC week updates the COT index, z-score, percentile and moving average
+from the previous state instead of recomputing over the full history.
+"""
+
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+# Fields tracked per asset, and the short prefix used for derived metric names
+ROLLING_FIELDS = {
+    'non_commercial_net': 'nc_net',
+    'commercial_net': 'comm_net',
+}
+
+
+class RollingWindow:
+    """Fixed-size window with O(1) mean/variance/min/max and O(log n) percentile lookups.
+
+    Min and max use monotonic deques; mean and variance use running sums;
+    percentile ranks use a sorted copy of the window.
+    """
+
+    __slots__ = ('size', 'values', 'total', 'total_sq', 'count', '_min', '_max', '_sorted')
+
+    def __init__(self, size: int, values: Iterable[float] = ()):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.count = 0  # values ever pushed; sequence numbers for the deques
+        self._min = deque()
+        self._max = deque()
+        self._sorted = []
+        for value in values:
+            self.push(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def push(self, value: float):
+        value = float(value)
+        if len(self.values) == self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+            del self._sorted[bisect_left(self._sorted, old)]
+        expired = self.count - self.size
+        while self._min and self._min[0][0] <= expired:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= expired:
+            self._max.popleft()
+
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        insort(self._sorted, value)
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self.count, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self.count, value))
+        self.count += 1
+
+    @property
+    def minimum(self) -> float:
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def maximum(self) -> float:
+        return self._max[0][1] if self._max else math.nan
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else math.nan
+
+    @property
+    def std(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return math.nan
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def index(self, value: float) -> float:
+        """COT-index style position of value within the window's range (0-100)."""
+        low, high = self.minimum, self.maximum
+        if not high > low:
+            return math.nan
+        return (value - low) / (high - low) * 100
+
+    def zscore(self, value: float) -> float:
+        std = self.std
+        if not std > 0:
+            return math.nan
+        return (value - self.mean) / std
+
+    def percentile(self, value: float) -> float:
+        """Percent of window values at or below value."""
+        if not self._sorted:
+            return math.nan
+        return bisect_right(self._sorted, value) / len(self._sorted) * 100
+
+    def to_dict(self) -> Dict:
+        return {'size': self.size, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RollingWindow':
+        return cls(data['size'], data['values'])
+
+
+class AssetRollingState:
+    """Rolling windows for every tracked field of one asset."""
+
+    __slots__ = ('last_date', 'windows', 'averages', 'latest')
+
+    def __init__(self, index_window: int, average_window: int):
+        self.last_date: Optional[str] = None
+        self.windows = {field: RollingWindow(index_window) for field in ROLLING_FIELDS}
+        self.averages = {field: RollingWindow(average_window) for field in ROLLING_FIELDS}
+        self.latest: Dict[str, float] = {}
+
+    def update(self, report_date: str, values: Dict[str, float]) -> Dict[str, float]:
+        for field in ROLLING_FIELDS:
+            self.windows[field].push(values[field])
+            self.averages[field].push(values[field])
+        self.last_date = report_date
+        return self.derive()
+
+    def derive(self) -> Dict[str, float]:
+        """Derived metrics for the most recent week in the windows."""
+        derived = {}
+        for field, prefix in ROLLING_FIELDS.items():
+            window = self.windows[field]
+            value = window.values[-1] if len(window) else math.nan
+            derived[f"{prefix}_cot_index"] = window.index(value)
+            derived[f"{prefix}_zscore"] = window.zscore(value)
+            derived[f"{prefix}_percentile"] = window.percentile(value)
+            derived[f"{prefix}_ma"] = self.averages[field].mean
+        self.latest = derived
+        return derived
+
+
+class RollingMetricsState:
+    """Per-asset incremental rolling metrics, persisted as JSON next to the history store."""
+
+    def __init__(self, path: Optional[str] = None, index_window: int = 156, average_window: int = 13):
+        self.path = path
+        self.index_window = index_window
+        self.average_window = average_window
+        self.assets: Dict[str, AssetRollingState] = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def last_date(self, asset_name: str) -> Optional[str]:
+        state = self.assets.get(asset_name)
+        return state.last_date if state else None
+
+    def update(self, asset_name: str, report_date: str, values: Dict[str, float]) -> Dict[str, float]:
+        """Push one new week (dates must arrive in order; ISO 'YYYY-MM-DD')."""
+        state = self.assets.get(asset_name)
+        if state is None:
+            state = self.assets[asset_name] = AssetRollingState(self.index_window, self.average_window)
+        if state.last_date is not None and report_date <= state.last_date:
+            raise Exception(f"{asset_name}: week {report_date} is not after {state.last_date}; rebuild instead")
+        return state.update(report_date, values)
+
+    def rebuild(self, asset_name: str, dates: Iterable[str], values: Dict[str, Iterable[float]]):
+        """Replay an asset's full history, for backfills that arrive out of order."""
+        self.assets.pop(asset_name, None)
+        columns = {field: list(values[field]) for field in ROLLING_FIELDS}
+        for i, report_date in enumerate(dates):
+            self.update(asset_name, report_date, {field: columns[field][i] for field in ROLLING_FIELDS})
+
+    def preview(self, asset_name: str, report_date: str, values: Dict[str, float]) -> Dict[str, Optional[float]]:
+        """Derived metrics an update() with this week would give, leaving the state unchanged."""
+        state = self.assets.get(asset_name)
+        scratch = AssetRollingState(self.index_window, self.average_window)
+        if state is not None:
+            if state.last_date is not None and report_date <= state.last_date:
+                raise Exception(f"{asset_name}: week {report_date} is not after {state.last_date}")
+            scratch.windows = {field: RollingWindow(w.size, w.values) for field, w in state.windows.items()}
+            scratch.averages = {field: RollingWindow(w.size, w.values) for field, w in state.averages.items()}
+        return _nan_to_none(scratch.update(report_date, values))
+
+    def latest(self, asset_name: str) -> Dict[str, Optional[float]]:
+        """Most recent derived metrics for an asset (NaN reported as None)."""
+        state = self.assets.get(asset_name)
+        if state is None:
+            return {}
+        return _nan_to_none(state.latest)
+
+    def save(self):
+        if not self.path:
+            return
+        data = {
+            'index_window': self.index_window,
+            'average_window': self.average_window,
+            'assets': {
+                name: {
+                    'last_date': state.last_date,
+                    'windows': {field: w.to_dict() for field, w in state.windows.items()},
+                    'averages': {field: w.to_dict() for field, w in state.averages.items()},
+                }
+                for name, state in self.assets.items()
+            }
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        self.index_window = data['index_window']
+        self.average_window = data['average_window']
+        self.assets = {}
+        for name, saved in data['assets'].items():
+            state = AssetRollingState(self.index_window, self.average_window)
+            state.last_date = saved['last_date']
+            state.windows = {field: RollingWindow.from_dict(w) for field, w in saved['windows'].items()}
+            state.averages = {field: RollingWindow.from_dict(w) for field, w in saved['averages'].items()}
+            state.derive()
+            self.assets[name] = state
+
+
+def _nan_to_none(metrics: Dict[str, float]) -> Dict[str, Optional[float]]:
+    return {key: None if math.isnan(value) else value for key, value in metrics.items()}
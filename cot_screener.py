@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Multi-Asset COT Screener
+Ranks every stored asset by how extreme its positioning is, using a
+precomputed table of the latest metrics so each query is a vectorized
+filter + sort rather than a fresh analysis per asset.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+
+from cot_history import COTHistoryStore
+
+# Columns available for sorting and min_/max_ filters
+SCREENER_COLUMNS = (
+    'extremity',
+    'non_commercial_long_pct',
+    'non_commercial_short_pct',
+    'cot_index',
+    'nc_net_change',
+    'non_commercial_net',
+    'commercial_net',
+    'divergence',
+    'total_open_interest',
+)
+
+# Same thresholds analyze_directional_bias uses for HIGH / MODERATE extremes
+EXTREME_THRESHOLD = 60.0
+MODERATE_THRESHOLD = 55.0
+
+
+def rolling_window_bounds(values: np.ndarray, segments: Dict[str, slice], window: int):
+    """Min and max of the last `window` values of each segment, in one reduceat pass."""
+    bounds = []
+    for segment in segments.values():
+        bounds.extend((max(segment.start, segment.stop - window), segment.stop))
+    if not bounds:
+        return np.array([]), np.array([])
+    # reduceat needs indices < len(values); a sentinel lets the last window end at the array end
+    padded = np.append(values, values[-1])
+    idx = np.array(bounds, dtype=np.int64)
+    return np.minimum.reduceat(padded, idx)[::2], np.maximum.reduceat(padded, idx)[::2]
+
+
+def trailing_window_bounds(values: np.ndarray, segments: Dict[str, slice], window: int):
+    """Min and max of every row's trailing `window` values within its segment (for full-history scores)."""
+    low = np.empty(len(values), dtype=np.float64)
+    high = np.empty(len(values), dtype=np.float64)
+    for segment in segments.values():
+        column = values[segment].astype(np.float64)
+        if not len(column):
+            continue
+        # Padding with the first value leaves every early window's min/max unchanged
+        padded = np.concatenate([np.full(window - 1, column[0]), column])
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+        low[segment] = windows.min(axis=1)
+        high[segment] = windows.max(axis=1)
+    return low, high
+
+
+def positioning_scores(nc_net: np.ndarray, comm_net: np.ndarray, long_pct: np.ndarray,
+                       short_pct: np.ndarray, open_interest: np.ndarray,
+                       low: np.ndarray, high: np.ndarray) -> Dict[str, np.ndarray]:
+    """COT index, divergence and extremity for aligned rows; low/high bound nc_net over the lookback."""
+    oi = open_interest.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # COT index: where this week's speculative net sits within its lookback range (0-100)
+        cot_index = np.where(high > low, (nc_net - low) / (high - low) * 100, np.nan)
+
+        # Divergence: commercials and speculators on opposite sides, sized as % of OI
+        opposite = np.sign(nc_net) * np.sign(comm_net) < 0
+        divergence = np.where(
+            opposite & (oi > 0),
+            (np.abs(nc_net) + np.abs(comm_net)) / oi * 100,
+            0.0
+        )
+
+    # Extremity: the larger of the speculative crowding % and the COT index distance from 50
+    extremity = np.fmax(np.fmax(long_pct, short_pct), np.abs(cot_index - 50) * 2)
+    return {'cot_index': cot_index, 'divergence': divergence, 'extremity': extremity}
+
+
+class COTScreener:
+    """Cross-sectional positioning screener over a COTHistoryStore."""
+
+    def __init__(self, store: COTHistoryStore, lookback_weeks: int = 156,
+                 sources: Optional[Dict[str, str]] = None):
+        self.store = store
+        self.lookback_weeks = lookback_weeks
+        self.sources = sources or {}
+        self.table: Dict[str, np.ndarray] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the screening table from the store's latest week per asset."""
+        store = self.store
+        latest = store.latest_indices()
+        if not len(latest):
+            self.table = {name: np.array([]) for name in ('asset_name', 'report_date', 'source') + SCREENER_COLUMNS}
+            return
+
+        metrics = store.records.metrics()
+        nc_net = metrics['non_commercial_net']
+        comm_net = metrics['commercial_net']
+
+        low, high = rolling_window_bounds(nc_net, store.segments(), self.lookback_weeks)
+        current = nc_net[latest]
+        long_pct = metrics['non_commercial_long_pct'][latest]
+        short_pct = metrics['non_commercial_short_pct'][latest]
+        scores = positioning_scores(current, comm_net[latest], long_pct, short_pct,
+                                    store.records.positions['total_open_interest'][latest], low, high)
+
+        names = store.records.asset_names[latest]
+        self.table = {
+            'asset_name': names,
+            'report_date': store.records.report_dates[latest],
+            'source': np.array([self.sources.get(str(n), '') for n in names], dtype=object),
+            'extremity': scores['extremity'],
+            'non_commercial_long_pct': long_pct,
+            'non_commercial_short_pct': short_pct,
+            'cot_index': scores['cot_index'],
+            'nc_net_change': store.weekly_change(nc_net, metrics['nc_net_change'])[latest],
+            'non_commercial_net': current,
+            'commercial_net': comm_net[latest],
+            'divergence': scores['divergence'],
+            'total_open_interest': store.records.positions['total_open_interest'][latest],
+        }
+
+    def screen(self, sort_by: str = 'extremity', descending: bool = True,
+               limit: Optional[int] = None, source: Optional[str] = None,
+               extreme_only: bool = False, divergent_only: bool = False,
+               **bounds) -> List[Dict]:
+        """Filter and rank the precomputed table.
+
+        Extra keyword arguments are column bounds such as min_cot_index=80
+        or max_non_commercial_long_pct=40.
+        """
+        if sort_by not in SCREENER_COLUMNS:
+            raise Exception(f"Cannot sort by '{sort_by}'. Available: {list(SCREENER_COLUMNS)}")
+
+        table = self.table
+        mask = np.ones(len(table['asset_name']), dtype=bool)
+        if source:
+            mask &= table['source'] == source
+        if extreme_only:
+            mask &= np.fmax(table['non_commercial_long_pct'], table['non_commercial_short_pct']) > EXTREME_THRESHOLD
+        if divergent_only:
+            mask &= table['divergence'] > 0
+        for key, value in bounds.items():
+            if value is None:
+                continue
+            op, _, column = key.partition('_')
+            if op not in ('min', 'max') or column not in SCREENER_COLUMNS:
+                raise Exception(f"Unknown screener filter '{key}'")
+            values = table[column]
+            mask &= (values >= value) if op == 'min' else (values <= value)
+
+        rows = np.flatnonzero(mask)
+        keys = table[sort_by][rows].astype(np.float64)
+        # NaNs always sort last regardless of direction
+        keys = np.where(np.isnan(keys), -np.inf if descending else np.inf, keys)
+        order = np.argsort(-keys if descending else keys, kind='stable')
+        rows = rows[order][:limit]
+
+        return [self._row(i) for i in rows]
+
+    def _row(self, i: int) -> Dict:
+        table = self.table
+        long_pct = float(table['non_commercial_long_pct'][i])
+        short_pct = float(table['non_commercial_short_pct'][i])
+        crowd = max(long_pct, short_pct)
+        row = {
+            'asset_name': str(table['asset_name'][i]),
+            'report_date': str(table['report_date'][i]),
+            'source': str(table['source'][i]),
+            'extreme_level': 'HIGH' if crowd > EXTREME_THRESHOLD else 'MODERATE' if crowd > MODERATE_THRESHOLD else 'LOW',
+            'crowded_side': 'SHORT' if short_pct > long_pct else 'LONG',
+        }
+        for column in SCREENER_COLUMNS:
+            value = table[column][i].item()
+            row[column] = None if isinstance(value, float) and np.isnan(value) else value
+        return row
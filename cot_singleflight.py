@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one execution: the first caller
+runs the function and every caller that arrives while it is in flight
+waits for and receives the same result (or exception). Nothing is cached
+once the call completes.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0  # calls that actually ran
+        self.coalesced = 0   # calls that shared another call's result
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Return fn(*args, **kwargs), sharing it with concurrent callers of the same key.
+
+        Shared results are the same object for every caller, so treat them as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
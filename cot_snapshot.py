@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+COT Results Snapshot
+One JSON-lines file written after each weekly ingestion with the parsed
+data, metrics and analysis of every asset. The last line is an index of
+each asset's byte range, so readers memory-map the file and decode only
+the assets they serve.
+"""
+
+import json
+import mmap
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from cot_paths import DEFAULT_DATA_DIR
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join(DEFAULT_DATA_DIR, 'snapshot.jsonl')
+
+
+def write_snapshot(results: Dict[str, Dict], catalog: Dict[str, Dict], path: Optional[str] = None,
+                   sources: Optional[Dict[str, str]] = None) -> str:
+    """Write per-asset run_analysis() results plus the index line; returns the path.
+
+    catalog maps asset name to its description and source, as in
+    MultiAssetCOTAnalyzer.available_assets; sources records the content
+    hash of each input the results were computed from.
+    """
+    path = path or DEFAULT_SNAPSHOT_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    assets = []
+    offset = 0
+    with open(tmp_path, 'wb') as f:
+        for name in sorted(results):
+            line = json.dumps(results[name], separators=(',', ':')).encode('utf-8') + b'\n'
+            f.write(line)
+            info = catalog.get(name, {})
+            assets.append({
+                'name': name,
+                'description': info.get('description', ''),
+                'source': info.get('source', ''),
+                'report_date': results[name]['data'].get('report_date'),
+                'offset': offset,
+                'length': len(line) - 1
+            })
+            offset += len(line)
+        index = {
+            'version': SNAPSHOT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'sources': sources or {},
+            'assets': assets
+        }
+        f.write(json.dumps({'snapshot': index}, separators=(',', ':')).encode('utf-8') + b'\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+class COTSnapshot:
+    """Memory-mapped reader for the results snapshot; reopens when the file is replaced."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_SNAPSHOT_PATH
+        self._map: Optional[mmap.mmap] = None
+        self._stat = None
+        self._index: Dict[str, Dict] = {}
+        self.created_at: Optional[str] = None
+        self.sources: Dict[str, str] = {}  # input content hashes recorded by write_snapshot
+        # Serializes reloads against readers when one instance is shared by server threads
+        self._lock = threading.RLock()
+
+    def available(self) -> bool:
+        """True when a snapshot exists; picks up a newly written file."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                self.close()
+                return False
+            if self._stat is None or (stat.st_mtime_ns, stat.st_size) != self._stat:
+                self._open((stat.st_mtime_ns, stat.st_size))
+            return True
+
+    def _open(self, stat):
+        self.close()
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = len(self._map) - 1
+        index = json.loads(self._map[self._map.rfind(b'\n', 0, end) + 1:end])['snapshot']
+        if index.get('version') != SNAPSHOT_VERSION:
+            self.close()
+            raise Exception(f"Unsupported snapshot version {index.get('version')} in {self.path}")
+        self._index = {entry['name']: entry for entry in index['assets']}
+        self.created_at = index['created_at']
+        self.sources = index.get('sources', {})
+        self._stat = stat
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+            self._map = None
+            self._stat = None
+            self._index = {}
+            self.sources = {}
+
+    def assets(self) -> List[Dict]:
+        """Catalog entries (name, description, source, report_date) of every stored asset."""
+        if not self.available():
+            return []
+        return [{key: entry[key] for key in ('name', 'description', 'source', 'report_date')}
+                for entry in sorted(self._index.values(), key=lambda e: e['name'])]
+
+    def __contains__(self, asset_name: str) -> bool:
+        return self.available() and asset_name in self._index
+
+    def get(self, asset_name: str) -> Optional[Dict]:
+        """The stored run_analysis() result for one asset, or None."""
+        with self._lock:
+            if asset_name not in self:
+                return None
+            entry = self._index[asset_name]
+            return json.loads(self._map[entry['offset']:entry['offset'] + entry['length']])
+
+    def get_many(self, asset_names: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Results for several assets (all when asset_names is None); unknown names are skipped."""
+        with self._lock:
+            if not self.available():
+                return {}
+            names = list(self._index) if asset_names is None else [a for a in asset_names if a in self._index]
+            return {name: self.get(name) for name in names}
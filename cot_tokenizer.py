@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+COT Number Tokenizer
+Every number of a report line, with thousands separators and signs
+handled, for code outside the section parsers (scripts, notebooks,
+benchmarks). A thin wrapper over the fixed-width layout parser: the line's
+own number positions become a one-off ColumnLayout whose row() converts
+each field straight from its slice.
+"""
+
+from typing import List, Union
+
+from cot_layout import ColumnLayout, number_spans
+
+_MINUS = ord('-')
+
+
+def tokenize_numbers(line: Union[bytes, memoryview], cast=int) -> List:
+    """Every number in one line, in order; cast=float for decimals such as '41.8'.
+
+    A '-' directly in front of a number makes it negative. With cast=int a
+    decimal comes back as None, as a blank field does from ColumnLayout.row().
+    """
+    line = bytes(line)
+    spans = [(start - 1 if start and line[start - 1] == _MINUS else start, end)
+             for start, end in number_spans(line)]
+    return ColumnLayout(spans, 'data').row(line, cast)
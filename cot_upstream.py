@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Upstream Resilience
+Per-upstream circuit breaker plus a token-bucket rate limiter whose state
+lives in a small locked file, so every worker process on the host shares
+one budget per site. Calls refused by either raise UpstreamUnavailable at
+once, and callers fall back to cached (archived) pages instead of waiting
+out a full timeout.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from cot_paths import DEFAULT_DATA_DIR
+
+# Request budgets and breaker settings per upstream site
+UPSTREAM_SETTINGS = {
+    'cftc': {'rate': 2.0, 'burst': 6, 'failure_threshold': 3, 'reset_timeout': 60.0},
+    'forexfactory': {'rate': 0.1, 'burst': 3, 'failure_threshold': 2, 'reset_timeout': 300.0},
+}
+
+# Responses meaning the site is refusing us; the breaker opens immediately
+BLOCKED_STATUSES = (403, 429, 503)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without contacting the upstream (circuit open or rate limit exhausted)."""
+
+
+@contextmanager
+def _locked_file(path: str):
+    """Exclusive lock on a small state file shared by all processes (flock, or msvcrt on Windows)."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, 'r+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.flush()  # the next holder must see this state
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens/second up to burst, shared through a locked file."""
+
+    def __init__(self, path: str, rate: float, burst: int):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; returns 0.0 on success, else seconds until they would be."""
+        with _locked_file(self.path) as f:
+            now = time.time()
+            raw = f.read()
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            available = min(self.burst, state.get('tokens', self.burst) + (now - state.get('updated', now)) * self.rate)
+            wait = 0.0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate if self.rate > 0 else float('inf')
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps({'tokens': available, 'updated': now}).encode('utf-8'))
+        return wait
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        """Take one token, waiting up to timeout seconds for the bucket to refill."""
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures; after reset_timeout one trial call is let through."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_until == 0.0:
+                return 'closed'
+            return 'open' if time.monotonic() < self.opened_until or self._trial else 'half-open'
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the single half-open trial)."""
+        with self._lock:
+            if self.opened_until == 0.0:
+                return True
+            if time.monotonic() < self.opened_until or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def release(self):
+        """Give back a claimed trial when the call was not made."""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_until = 0.0
+            self._trial = False
+
+    def record_failure(self, cooldown: Optional[float] = None):
+        """Count a failure; cooldown (e.g. a Retry-After) opens the breaker immediately for that long."""
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if cooldown is not None or self.failures >= self.failure_threshold:
+                self.opened_until = time.monotonic() + (cooldown if cooldown is not None else self.reset_timeout)
+
+
+class Upstream:
+    """One upstream site: its breaker (per process) and rate limiter (per host)."""
+
+    def __init__(self, name: str, rate: float, burst: int, failure_threshold: int = 3,
+                 reset_timeout: float = 60.0, state_dir: Optional[str] = None):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        state_dir = state_dir or os.path.join(DEFAULT_DATA_DIR, 'ratelimit')
+        self.limiter = TokenBucket(os.path.join(state_dir, f"{name}.json"), rate, burst)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """fn(*args, **kwargs) unless the breaker is open or the rate budget is spent.
+
+        Any exception from fn counts as a failure; HTTP responses in
+        BLOCKED_STATUSES open the breaker straight away (for Retry-After
+        seconds when the site sends one).
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(f"{self.name} circuit is open after repeated failures")
+        if not self.limiter.acquire():
+            self.breaker.release()
+            raise UpstreamUnavailable(f"{self.name} rate limit reached")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.breaker.record_failure(_blocked_cooldown(e, self.breaker.reset_timeout))
+            raise
+        self.breaker.record_success()
+        return result
+
+
+def _blocked_cooldown(error: Exception, default: float) -> Optional[float]:
+    response = getattr(error, 'response', None)
+    if response is None or response.status_code not in BLOCKED_STATUSES:
+        return None
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except ValueError:
+        return default
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str) -> Upstream:
+    """The process-wide Upstream for a site in UPSTREAM_SETTINGS."""
+    with _upstreams_lock:
+        if name not in _upstreams:
+            _upstreams[name] = Upstream(name, **UPSTREAM_SETTINGS[name])
+        return _upstreams[name]
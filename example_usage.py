@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 """
-Example usage of the USD Index COT Analyzer
+Example usage of the Multi-Asset COT Analyzer
 Demonstrates different ways to use the analyzer programmatically
 """
 
-from usd_index_cot_analyzer import USDIndexCOTAnalyzer
-import json
+from multi_asset_cot_analyzer import MultiAssetCOTAnalyzer
+from cot_batch import run_batch, write_results
+from cot_history import COTHistoryStore
+from cot_snapshot import COTSnapshot
 
 def basic_analysis():
     """Basic analysis example"""
@@ -14,11 +16,11 @@ def basic_analysis():
     print("=" * 50)
     
     # Create analyzer and run analysis
-    analyzer = USDIndexCOTAnalyzer()
-    results = analyzer.run_analysis()
+    analyzer = MultiAssetCOTAnalyzer()
+    results = analyzer.run_analysis('USD INDEX')
     
-    # Print the formatted report
-    analyzer.print_report()
+    # Print the executive summary
+    print(results['analysis']['combined_analysis']['executive_summary'])
     
     return results
 
@@ -28,8 +30,8 @@ def detailed_data_access():
     print("DETAILED DATA ACCESS EXAMPLE")
     print("=" * 50)
     
-    analyzer = USDIndexCOTAnalyzer()
-    results = analyzer.run_analysis()
+    analyzer = MultiAssetCOTAnalyzer()
+    results = analyzer.run_analysis('USD INDEX')
     
     # Access individual components
     data = results['data']
@@ -63,8 +65,8 @@ def custom_analysis_logic():
     print("CUSTOM ANALYSIS LOGIC EXAMPLE")
     print("=" * 50)
     
-    analyzer = USDIndexCOTAnalyzer()
-    results = analyzer.run_analysis()
+    analyzer = MultiAssetCOTAnalyzer()
+    results = analyzer.run_analysis('USD INDEX')
     
     data = results['data']
     metrics = results['metrics']
@@ -110,45 +112,47 @@ def custom_analysis_logic():
     
     return results
 
-def export_data_example():
-    """Example of exporting data to different formats"""
+def snapshot_example():
+    """Example of building and reading the per-asset results snapshot"""
     print("\n" + "=" * 50)
-    print("DATA EXPORT EXAMPLE")
+    print("RESULTS SNAPSHOT EXAMPLE")
     print("=" * 50)
     
-    analyzer = USDIndexCOTAnalyzer()
-    results = analyzer.run_analysis()
-    
-    # Export to JSON
-    with open('cot_analysis_results.json', 'w') as f:
-        # Convert numpy types to native Python types for JSON serialization
-        json_results = {}
-        for key, value in results.items():
-            if isinstance(value, dict):
-                json_results[key] = {k: int(v) if isinstance(v, (int, float)) else v 
-                                   for k, v in value.items()}
-            else:
-                json_results[key] = value
-        
-        json.dump(json_results, f, indent=2)
-    
-    print("✅ Results exported to 'cot_analysis_results.json'")
-    
-    # Create a simple CSV-like summary
-    with open('cot_summary.txt', 'w') as f:
-        f.write("USD Index COT Analysis Summary\n")
-        f.write("=" * 40 + "\n")
-        f.write(f"Date: {results['data']['report_date']}\n")
-        f.write(f"Overall Bias: {results['analysis']['overall_bias']}\n")
-        f.write(f"Confidence: {results['analysis']['confidence']}\n")
-        f.write(f"Open Interest: {results['data']['total_open_interest']}\n")
-        f.write(f"NC Net Position: {results['metrics']['non_commercial_net']}\n")
-        f.write(f"Commercial Net: {results['metrics']['commercial_net']}\n")
-        f.write("\nSignals:\n")
-        for i, signal in enumerate(results['analysis']['signals'], 1):
-            f.write(f"{i}. {signal}\n")
-    
-    print("✅ Summary exported to 'cot_summary.txt'")
+    # Ingest this week's reports for every asset; this also writes the snapshot
+    analyzer = MultiAssetCOTAnalyzer()
+    analyzer.ingest_latest(COTHistoryStore())
+    
+    # Any process can now read results without fetching or parsing again
+    snapshot = COTSnapshot()
+    print(f"✅ Snapshot of {len(snapshot.assets())} assets written to '{snapshot.path}'")
+    
+    results = snapshot.get('USD INDEX')
+    if results:
+        print(f"\nUSD Index: {results['analysis']['overall_bias']} "
+              f"({results['analysis']['confidence']} confidence, {results['data']['report_date']})")
+        print(f"NC Net Position: {results['metrics']['non_commercial_net']:,}")
+        print(f"Commercial Net: {results['metrics']['commercial_net']:,}")
+    
+    return results
+
+def batch_example():
+    """Example of analyzing several assets at once and exporting the results"""
+    print("\n" + "=" * 50)
+    print("BATCH ANALYSIS EXAMPLE")
+    print("=" * 50)
+    
+    # Each report is fetched once; parsing and analysis run in two worker processes
+    analyzer = MultiAssetCOTAnalyzer()
+    results, errors = run_batch(analyzer, ['USD INDEX', 'EURO FX', 'JAPANESE YEN'], workers=2)
+    
+    for name, result in results.items():
+        print(f"{name:<16}{result['analysis']['overall_bias']:<28}{result['analysis']['confidence']}")
+    for name, error in errors.items():
+        print(f"⚠️ {name}: {error}")
+    
+    # One CSV row per asset for spreadsheets and downstream jobs
+    path = write_results(results, analyzer.available_assets, 'csv')
+    print(f"✅ Results exported to '{path}'")
     
     return results
 
@@ -164,8 +168,11 @@ def main():
         # Demonstrate custom analysis
         custom_analysis_logic()
         
-        # Export data examples
-        export_data_example()
+        # Analyze several assets in one batch
+        batch_example()
+        
+        # Build and read the results snapshot
+        snapshot_example()
         
         print("\n" + "=" * 50)
         print("✅ ALL EXAMPLES COMPLETED SUCCESSFULLY!")
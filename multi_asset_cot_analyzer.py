@@ -3,27 +3,79 @@
 Multi-Asset COT Report Analyzer
 Collects and analyzes CFTC Commitments of Traders data for multiple assets
 from both USD Index and CME reports to provide directional bias insights.
+
+Heavy dependencies (requests, bs4, NumPy via the history modules) are
+imported where they are first needed, so importing this module stays cheap
+for the backend workers and the CLI.
 """
 
-import requests
+import hashlib
+import json
 import re
-import pandas as pd
-from datetime import datetime, timedelta
-import numpy as np
-from typing import Dict, List, Tuple, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Dict, List, Tuple, Optional, Union
 import warnings
-from bs4 import BeautifulSoup
-import json
+from cot_records import COTRecord, COTDetail, REPORT_COLUMNS, REPORT_ROWS, non_commercial_changes
+from cot_archive import RawPageArchive
+from cot_catalog import find_contracts, load_contracts, merge_contracts, save_contracts
+from cot_pages import ReportPage, byte_pattern
+from cot_layout import ColumnLayout, column_values, learn_layout
+from cot_snapshot import COTSnapshot, write_snapshot
+from cot_pipeline import run_graph
+from cot_upstream import UpstreamUnavailable, get_upstream
 warnings.filterwarnings('ignore')
 
+def _http_get(session, url: str, headers: Dict, timeout: float):
+    """GET that raises on HTTP errors, so the upstream breaker counts them as failures."""
+    response = session.get(url, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+# One HTTP connection pool and one stage thread pool per process, shared by
+# every analyzer instance (e.g. the backend's live and replay analyzers)
+_shared_lock = threading.Lock()
+_shared_session = None
+_shared_executor: Optional[ThreadPoolExecutor] = None
+
+def shared_session():
+    """requests.Session whose connection pool is shared by all fetches (created on first use)."""
+    global _shared_session
+    if _shared_session is None:
+        import requests
+        with _shared_lock:
+            if _shared_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount('https://', adapter)
+                _shared_session = session
+    return _shared_session
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Thread pool the pipeline stages run on (created on first use)."""
+    global _shared_executor
+    if _shared_executor is None:
+        with _shared_lock:
+            if _shared_executor is None:
+                _shared_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='cot-stage')
+    return _shared_executor
+
 class ForexFactoryCalendar:
     """Scrapes economic calendar from Forex Factory"""
 
-    def __init__(self):
+    def __init__(self, archive: Optional[RawPageArchive] = None, replay_date: Optional[str] = None,
+                 session=None):
         self.base_url = "https://www.forexfactory.com"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        # Pages are archived as they are fetched; with replay_date set they are read back instead
+        self.archive = archive
+        self.replay_date = replay_date
+        # Shared requests.Session (connection pool) of the owning analyzer, if any
+        self.session = session
 
     def get_upcoming_events(self, days_ahead: int = 7) -> List[Dict]:
         """Get upcoming economic events for the next N days"""
@@ -45,11 +97,29 @@ class ForexFactoryCalendar:
                 'Sec-Fetch-Site': 'none'
             }
 
-            response = requests.get(calendar_url, headers=headers, timeout=15)
-            response.raise_for_status()
+            if self.replay_date:
+                print(f"📼 Replaying calendar archived on or before {self.replay_date}")
+                content = self.archive.read('calendar', self.replay_date)
+            else:
+                if self.session is None:
+                    import requests
+                    self.session = requests.Session()
+                try:
+                    response = get_upstream('forexfactory').call(_http_get, self.session, calendar_url, headers, 15)
+                except Exception as e:
+                    # Blocked, rate limited or failing: use the last archived calendar if there is one
+                    if self.archive is None or not self.archive.entries('calendar'):
+                        raise
+                    print(f"⚠️ Forex Factory unavailable ({e}); using the last archived calendar")
+                    content = self.archive.read('calendar', datetime.now(timezone.utc))
+                else:
+                    print(f"📄 Response status: {response.status_code}")
+                    content = response.content
+                    if self.archive is not None:
+                        self.archive.put('calendar', calendar_url, content)
 
-            print(f"📄 Response status: {response.status_code}")
-            soup = BeautifulSoup(response.content, 'html.parser')
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(content, 'html.parser')
             events = []
 
             # Debug: Check what we got
@@ -144,7 +214,8 @@ class ForexFactoryCalendar:
 
     def _get_fallback_events(self) -> List[Dict]:
         """Fallback events when scraping fails - realistic upcoming USD events"""
-        today = datetime.now()
+        # In replay mode the calendar is built relative to the replayed date
+        today = datetime.strptime(self.replay_date[:10], '%Y-%m-%d') if self.replay_date else datetime.now()
 
         # Calculate next Friday (typical NFP release)
         days_until_friday = (4 - today.weekday()) % 7
@@ -204,15 +275,35 @@ class ForexFactoryCalendar:
         ]
 
 class MultiAssetCOTAnalyzer:
-    def __init__(self):
+    """COT analysis service.
+
+    Instances hold only configuration, the asset registry and shared
+    resources (archive, calendar) and use the process-wide HTTP connection
+    pool and stage thread pool; every call returns its results, so one
+    long-lived instance can serve many threads.
+    """
+
+    def __init__(self, history_store=None, archive: Optional[RawPageArchive] = None,
+                 replay_date: Optional[str] = None):
+        """
+        history_store: optional COTHistoryStore for rolling metrics
+        archive: raw page archive every fetched page is saved to (default archive if omitted)
+        replay_date: 'YYYY-MM-DD' to read pages from the archive instead of the network
+        """
+        self.history_store = history_store
+        self.archive = archive if archive is not None else RawPageArchive()
+        self.replay_date = replay_date
         self.urls = {
             'usd_index': "https://www.cftc.gov/dea/futures/deanybtlf.htm",
             'cme': "https://www.cftc.gov/dea/futures/deacmelf.htm",
             'financial': "https://www.cftc.gov/dea/futures/financial_lf.htm"
         }
-        self.data = {}
-        self.analysis_results = {}
-        self.calendar = ForexFactoryCalendar()
+        # Created on first use and shared by every call
+        self._calendar: Optional[ForexFactoryCalendar] = None
+        # Last page opened per source; refetching identical content returns it with its parse state
+        self._pages: Dict[str, ReportPage] = {}
+        self._analogs = None  # AnalogIndex over the history store, rebuilt when the store grows
+        self._lock = threading.RLock()
         
         # Define available assets with their patterns and sources
         self.available_assets = {
@@ -385,7 +476,43 @@ class MultiAssetCOTAnalyzer:
                 'description': 'Euro Short Term Rate futures'
             }
         }
+        # Plus every contract discovered in earlier reports (see discover_contracts)
+        for name, info in load_contracts().items():
+            self.available_assets.setdefault(name, info)
         
+    @property
+    def session(self):
+        """The process-wide HTTP session (shared_session)."""
+        return shared_session()
+
+    @property
+    def calendar(self) -> ForexFactoryCalendar:
+        if self._calendar is None:
+            with self._lock:
+                if self._calendar is None:
+                    self._calendar = ForexFactoryCalendar(self.archive, self.replay_date,
+                                                          None if self.replay_date else self.session)
+        return self._calendar
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The process-wide stage thread pool (shared_executor)."""
+        return shared_executor()
+
+    def _open_page(self, source: str, digest: str) -> ReportPage:
+        """Archived page by content hash, reusing the previous page of the source when unchanged.
+
+        A reused page keeps its section index, layout and per-asset results,
+        so polling a report that has not been republished costs only the fetch.
+        """
+        with self._lock:
+            page = self._pages.get(source)
+            if page is not None and page.sha256 == digest:
+                print(f"♻️ {source} report unchanged ({digest[:12]}); reusing parsed results")
+                return page
+            page = self._pages[source] = self.archive.open(digest)
+            return page
+
     def get_available_assets(self) -> List[Dict]:
         """Return list of available assets for analysis."""
         assets = []
@@ -397,9 +524,16 @@ class MultiAssetCOTAnalyzer:
             })
         return sorted(assets, key=lambda x: x['name'])
 
-    def extract_current_cot_date(self, html_content: str) -> str:
+    def extract_current_cot_date(self, html_content: Union[ReportPage, bytes, str]) -> str:
         """Extract the current COT data date (should be the most recent Tuesday)."""
-        from datetime import datetime, timedelta
+        page = ReportPage.wrap(html_content)
+        if page.report_date is None:
+            page.report_date = self._find_cot_date(page.buffer)
+        return page.report_date
+
+    def _find_cot_date(self, content: bytes) -> str:
+        """Search raw page bytes for the report's Tuesday date."""
+        from datetime import datetime
 
         # Look for the main report date - this should be the current week's Tuesday
         main_date_patterns = [
@@ -409,9 +543,9 @@ class MultiAssetCOTAnalyzer:
         ]
 
         for pattern in main_date_patterns:
-            match = re.search(pattern, html_content, re.IGNORECASE | re.DOTALL)
+            match = byte_pattern(pattern, re.IGNORECASE | re.DOTALL).search(content)
             if match:
-                groups = match.groups()
+                groups = [g.decode('ascii') for g in match.groups()]
                 if len(groups) >= 3:
                     month, day, year = groups[-3:]  # Take last 3 groups
                     try:
@@ -423,8 +557,9 @@ class MultiAssetCOTAnalyzer:
                         continue
 
         # If no Tuesday found, get the most recent date that could be a Tuesday
-        all_dates = re.findall(r'(\w+) (\d+), (\d+)', html_content)
-        for month_str, day_str, year_str in reversed(all_dates):  # Start from most recent
+        all_dates = byte_pattern(r'(\w+) (\d+), (\d+)', 0).findall(content)
+        for date_parts in reversed(all_dates):  # Start from most recent
+            month_str, day_str, year_str = [part.decode('ascii') for part in date_parts]
             try:
                 date_obj = datetime.strptime(f"{month_str} {day_str}, {year_str}", "%B %d, %Y")
                 if date_obj.weekday() == 1:  # Tuesday
@@ -434,29 +569,47 @@ class MultiAssetCOTAnalyzer:
 
         return "Unknown"
         
-    def fetch_cot_data(self, source: str) -> str:
-        """Fetch the latest COT report from specified CFTC website."""
+    def fetch_cot_data(self, source: str) -> ReportPage:
+        """Fetch the latest COT report from specified CFTC website (or the archive in replay mode).
+
+        The page is returned as raw bytes memory-mapped from the archive's page cache.
+        When cftc.gov fails, is rate limited or its circuit is open, the last
+        archived copy is returned instead.
+        """
+        if self.replay_date:
+            print(f"📼 Replaying {source} report archived on or before {self.replay_date}")
+            return self._open_page(source, self.archive.lookup(source, self.replay_date)['sha256'])
+
+        import requests
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             url = self.urls[source]
             print(f"🌐 Fetching from: {url}")
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
+            response = get_upstream('cftc').call(_http_get, self.session, url, headers, 30)
+            page = self._open_page(source, self.archive.put(source, url, response.content))
 
             # Debug: Check if we can find any dates in the content
-            content = response.text
-            date_matches = re.findall(r'(\w+) (\d+), (\d+)', content)
+            date_matches = byte_pattern(r'(\w+) (\d+), (\d+)', 0).findall(page.buffer, 0, 65536)
             if date_matches:
-                print(f"📅 Dates found in report: {date_matches[:3]}...")  # Show first 3 dates
-
-            return content
-        except requests.RequestException as e:
-            raise Exception(f"Failed to fetch COT data from {source}: {e}")
+                date_matches = [tuple(part.decode('ascii') for part in m) for m in date_matches[:3]]
+                print(f"📅 Dates found in report: {date_matches}...")  # Show first 3 dates
+
+            return page
+        except (requests.RequestException, UpstreamUnavailable) as e:
+            # Fail fast to the last archived report rather than erroring (or waiting on a struggling site)
+            if not self.archive.entries(source):
+                raise Exception(f"Failed to fetch COT data from {source}: {e}")
+            print(f"⚠️ {source} unavailable ({e}); using the last archived report")
+            return self._open_page(source, self.archive.lookup(source, datetime.now(timezone.utc))['sha256'])
     
-    def parse_asset_data(self, html_content: str, asset_name: str) -> Dict:
-        """Extract specific asset data from the COT report."""
+    def parse_asset_data(self, html_content: Union[ReportPage, bytes, str], asset_name: str) -> COTRecord:
+        """Extract specific asset data from the COT report.
+
+        Records are kept on the page, so an unchanged page is parsed once per
+        asset; treat the returned record as read-only.
+        """
         if asset_name not in self.available_assets:
             raise Exception(f"Asset '{asset_name}' not supported. Available assets: {list(self.available_assets.keys())}")
 
@@ -464,35 +617,49 @@ class MultiAssetCOTAnalyzer:
         pattern = asset_info['pattern']
         source = asset_info['source']
 
-        # Find asset section
-        asset_match = re.search(pattern, html_content, re.DOTALL)
+        page = ReportPage.wrap(html_content)
+        cached = page.results.get(asset_name)
+        if cached is not None:
+            return cached['data']
 
-        if not asset_match:
-            raise Exception(f"{asset_name} data not found in COT report")
+        # Find asset section (a zero-copy view into the page bytes)
+        asset_section = page.section(pattern)
 
-        asset_section = asset_match.group(1)
+        if asset_section is None:
+            raise Exception(f"{asset_name} data not found in COT report")
 
         # Extract report date - use the improved method to get current COT date
-        report_date = self.extract_current_cot_date(html_content)
+        report_date = self.extract_current_cot_date(page)
 
         # Debug: Print what date we extracted
         print(f"🔍 Date extraction for {asset_name}: {report_date}")
 
-        # Parse based on source type
-        if source == 'financial':
-            return self._parse_financial_data(asset_section, asset_name, report_date, html_content)
+        # Parse based on the report format (discovered contracts record theirs)
+        report_type = asset_info.get('report_type') or ('tff' if source == 'financial' else 'legacy')
+        if report_type == 'tff':
+            record = self._parse_financial_data(asset_section, asset_name, report_date, page)
         else:
-            return self._parse_standard_data(asset_section, asset_name, report_date)
+            record = self._parse_standard_data(asset_section, asset_name, report_date, page)
+        page.results[asset_name] = {'data': record}
+        return record
+
+    def _report_layout(self, page: ReportPage, report_type: str) -> ColumnLayout:
+        """Column layout of a report page, learned from its header once per page."""
+        if page.layout is None:
+            page.layout = learn_layout(page.buffer, report_type, len(REPORT_COLUMNS[report_type]))
+        return page.layout
 
-    def _parse_financial_data(self, asset_section: str, asset_name: str, report_date: str, html_content: str = "") -> Dict:
+    def _parse_financial_data(self, asset_section: memoryview, asset_name: str, report_date: str, page: ReportPage) -> COTRecord:
         """Parse financial futures data format (different structure)."""
-        data_lines = [line.strip() for line in asset_section.split('\n') if line.strip()]
+        lines = bytes(asset_section).split(b'\n')
+        # Non-blank lines keyed by their line number in the section
+        data_lines = {i: line.strip() for i, line in enumerate(lines) if line.strip()}
 
         # Extract Open Interest and better date parsing for financial data
         total_oi = 0
 
         # Try to get a better date from the financial data
-        if report_date == "Unknown" and html_content:
+        if report_date == "Unknown":
             # Financial reports have the date in the header
             financial_date_patterns = [
                 r'Positions as of (\w+) (\d+), (\d+)',
@@ -501,136 +668,50 @@ class MultiAssetCOTAnalyzer:
             ]
 
             for pattern in financial_date_patterns:
-                date_match = re.search(pattern, html_content, re.IGNORECASE)
+                date_match = byte_pattern(pattern, re.IGNORECASE).search(page.buffer)
                 if date_match:
-                    month, day, year = date_match.groups()
+                    month, day, year = [g.decode('ascii') for g in date_match.groups()]
                     report_date = f"{day}/{month[:3]}/{year}"
                     break
 
-        for line in data_lines:
-            if 'Open Interest is' in line:
-                oi_match = re.search(r'Open Interest is\s+(\d+(?:,\d+)*)', line)
+        for line in data_lines.values():
+            if b'Open Interest is' in line:
+                oi_match = re.search(rb'Open Interest is\s+(\d+(?:,\d+)*)', line)
                 if oi_match:
-                    total_oi = int(oi_match.group(1).replace(',', ''))
-                break
-
-        # Find the positions line - look for line with multiple numbers
-        positions_line = None
-
-        # Look for the line that starts with numbers (position data)
-        # Financial format typically has a line with many comma-separated numbers
-        for line in data_lines:
-            # Skip header lines and look for data lines
-            if (line and
-                not line.startswith('CFTC Code') and
-                not line.startswith('Positions') and
-                not line.startswith('Changes') and
-                not line.startswith('Percent') and
-                not line.startswith('Number') and
-                not 'Total Traders' in line and
-                len(re.findall(r'\d+(?:,\d+)*', line)) >= 8):  # Line with many numbers
-                positions_line = line
+                    total_oi = int(oi_match.group(1).replace(b',', b''))
                 break
 
-        if not positions_line:
-            # Try a more lenient approach - look for any line with lots of numbers
-            for line in data_lines:
-                numbers_in_line = re.findall(r'\d+(?:,\d+)*', line)
-                if len(numbers_in_line) >= 6:  # At least 6 numbers
-                    positions_line = line
-                    break
-
-        if not positions_line:
-            # Last resort: try to find the first line after "Positions" that has numbers
-            positions_found = False
-            for line in data_lines:
-                if 'Positions' in line:
-                    positions_found = True
-                    continue
-                if positions_found and re.search(r'\d+', line):
-                    positions_line = line
-                    break
-
-        if not positions_line:
+        # Each block is a header line followed by one row of fixed-width columns:
+        # Dealer, Asset Manager, Leveraged Funds and Other Reportables Long/Short/Spreading,
+        # then Nonreportable Long/Short
+        row_lines = {
+            'positions': self._line_after(data_lines, b'Positions'),
+            'changes': self._line_after(data_lines, b'Changes from:'),
+            'percent_of_oi': self._line_after(data_lines, b'Percent of Open Interest'),
+            'traders': self._line_after(data_lines, b'Number of Traders'),
+        }
+        if row_lines['positions'] is None:
             # Debug: print the section to understand the format
             print(f"DEBUG: Could not parse {asset_name}. Section content:")
-            for i, line in enumerate(data_lines[:15]):  # Print first 15 lines
-                print(f"Line {i}: '{line}'")
+            for i, line in enumerate(list(data_lines.values())[:15]):  # Print first 15 lines
+                print(f"Line {i}: '{line.decode('utf-8', errors='replace')}'")
             raise Exception(f"Could not find position data in {asset_name} section")
 
-        # Parse the position numbers - financial format has different columns
-        clean_line = positions_line.replace(',', '')
-        numbers = re.findall(r'\d+', clean_line)
-        numbers = [int(n) for n in numbers]
-
-        # Financial format: Dealer Long/Short/Spread, Asset Mgr Long/Short/Spread, Leveraged Long/Short/Spread, Other Long/Short/Spread, Nonreportable Long/Short
-        # We'll map these to our standard format
+        layout = self._report_layout(page, 'tff')
+        values = {block: layout.row(lines[i], float if block == 'percent_of_oi' else int)
+                  for block, i in row_lines.items() if i is not None}
 
-        # Initialize default values
-        non_commercial_long = 0
-        non_commercial_short = 0
-        commercial_long = 0
-        commercial_short = 0
-        nonreportable_long = 0
-        nonreportable_short = 0
+        numbers = column_values(values['positions'])
+        (dealer_long, dealer_short, _, asset_mgr_long, asset_mgr_short, _,
+         leveraged_long, leveraged_short, _, other_long, other_short, _,
+         nonreportable_long, nonreportable_short) = numbers
 
-        if len(numbers) >= 10:
-            # Try to map based on the financial format structure
-            # Financial format typically has: Dealer, Asset Mgr, Leveraged, Other, Nonreportable
-            # Each with Long, Short, Spreading columns
-
-            try:
-                # Assume standard financial format with 3 columns per category
-                if len(numbers) >= 14:
-                    # Full format: 5 categories × 3 columns (Long/Short/Spread) - 1 (no spread for nonreportable) = 14
-                    dealer_long = numbers[0]
-                    dealer_short = numbers[1]
-                    asset_mgr_long = numbers[3]
-                    asset_mgr_short = numbers[4]
-                    leveraged_long = numbers[6]
-                    leveraged_short = numbers[7]
-                    other_long = numbers[9]
-                    other_short = numbers[10]
-                    nonreportable_long = numbers[12]
-                    nonreportable_short = numbers[13]
-                else:
-                    # Simplified mapping for shorter arrays
-                    leveraged_long = numbers[0] if len(numbers) > 0 else 0
-                    leveraged_short = numbers[1] if len(numbers) > 1 else 0
-                    dealer_long = numbers[2] if len(numbers) > 2 else 0
-                    dealer_short = numbers[3] if len(numbers) > 3 else 0
-                    asset_mgr_long = numbers[4] if len(numbers) > 4 else 0
-                    asset_mgr_short = numbers[5] if len(numbers) > 5 else 0
-                    other_long = numbers[6] if len(numbers) > 6 else 0
-                    other_short = numbers[7] if len(numbers) > 7 else 0
-                    nonreportable_long = numbers[8] if len(numbers) > 8 else 0
-                    nonreportable_short = numbers[9] if len(numbers) > 9 else 0
-
-                # Map to standard format - Leveraged Funds are the speculators (Non-Commercial)
-                # Dealers + Asset Managers are more like Commercial hedgers
-                non_commercial_long = leveraged_long + other_long  # Leveraged funds + other reportables
-                non_commercial_short = leveraged_short + other_short
-                commercial_long = dealer_long + asset_mgr_long  # Dealers + Asset managers
-                commercial_short = dealer_short + asset_mgr_short
-
-            except (IndexError, ValueError) as e:
-                print(f"Warning: Error parsing {asset_name} financial data: {e}")
-                # Use simple fallback
-                non_commercial_long = numbers[0] if len(numbers) > 0 else 0
-                non_commercial_short = numbers[1] if len(numbers) > 1 else 0
-                commercial_long = numbers[2] if len(numbers) > 2 else 0
-                commercial_short = numbers[3] if len(numbers) > 3 else 0
-                nonreportable_long = numbers[4] if len(numbers) > 4 else 0
-                nonreportable_short = numbers[5] if len(numbers) > 5 else 0
-
-        else:
-            # Very short array - use basic mapping
-            non_commercial_long = numbers[0] if len(numbers) > 0 else 0
-            non_commercial_short = numbers[1] if len(numbers) > 1 else 0
-            commercial_long = numbers[2] if len(numbers) > 2 else 0
-            commercial_short = numbers[3] if len(numbers) > 3 else 0
-            nonreportable_long = numbers[4] if len(numbers) > 4 else 0
-            nonreportable_short = numbers[5] if len(numbers) > 5 else 0
+        # Map to standard format - Leveraged Funds are the speculators (Non-Commercial)
+        # Dealers + Asset Managers are more like Commercial hedgers
+        non_commercial_long = leveraged_long + other_long  # Leveraged funds + other reportables
+        non_commercial_short = leveraged_short + other_short
+        commercial_long = dealer_long + asset_mgr_long  # Dealers + Asset managers
+        commercial_short = dealer_short + asset_mgr_short
 
         # Use provided OI if available, otherwise estimate
         if total_oi == 0:
@@ -639,16 +720,22 @@ class MultiAssetCOTAnalyzer:
                 total_oi = total_oi // 2  # Divide by 2 since we're double counting (long + short)
 
         # Extract changes if available
-        changes = []
-        for line in data_lines:
-            if 'Changes from:' in line:
-                line_idx = data_lines.index(line)
-                if line_idx + 1 < len(data_lines):
-                    changes_line = data_lines[line_idx + 1]
-                    clean_changes = changes_line.replace(',', '')
-                    change_numbers = re.findall(r'-?\d+', clean_changes)
-                    changes = [int(x) for x in change_numbers[:10]] if change_numbers else []
-                break
+        change_numbers = column_values(values['changes']) if 'changes' in values else []
+        changes = change_numbers[:10]
+
+        # Keep the full TFF breakdown (all five categories with spreading,
+        # percent of OI and trader counts) alongside the collapsed view
+        total_traders_match = re.search(rb'Total Traders:\s*(\d+(?:,\d+)*)', asset_section)
+        oi_change_match = re.search(rb'Total Change is:\s*(-?\d+(?:,\d+)*)', asset_section)
+        detail = COTDetail(
+            'tff',
+            positions={'all': numbers},
+            changes=change_numbers,
+            percent_of_oi={'all': column_values(values['percent_of_oi'])} if 'percent_of_oi' in values else None,
+            traders={'all': column_values(values['traders'], trim=True)} if 'traders' in values else None,
+            total_traders=int(total_traders_match.group(1).replace(b',', b'')) if total_traders_match else 0,
+            open_interest_change=int(oi_change_match.group(1).replace(b',', b'')) if oi_change_match else 0
+        )
 
         # Debug: Print what we extracted
         print(f"🔍 Financial data extracted for {asset_name}:")
@@ -657,81 +744,97 @@ class MultiAssetCOTAnalyzer:
         print(f"   Non-Commercial Long: {non_commercial_long:,}, Short: {non_commercial_short:,}")
         print(f"   Commercial Long: {commercial_long:,}, Short: {commercial_short:,}")
 
-        return {
-            'asset_name': asset_name,
-            'report_date': report_date,
-            'total_open_interest': total_oi,
-            'non_commercial_long': non_commercial_long,
-            'non_commercial_short': non_commercial_short,
-            'spreading': 0,  # Not directly available in financial format
-            'commercial_long': commercial_long,
-            'commercial_short': commercial_short,
-            'total_long': non_commercial_long + commercial_long + nonreportable_long,
-            'total_short': non_commercial_short + commercial_short + nonreportable_short,
-            'nonreportable_long': nonreportable_long,
-            'nonreportable_short': nonreportable_short,
-            'changes': changes
-        }
-
-    def _parse_standard_data(self, asset_section: str, asset_name: str, report_date: str) -> Dict:
-        """Parse standard COT data format."""
-        data_lines = asset_section.split('\n')
-
-        # Find the main data line (All positions) - more flexible matching
-        all_line = None
-        for line in data_lines:
-            stripped = line.strip()
-            if stripped.startswith('All') and ':' in stripped:
-                all_line = line
-                break
-
-        if not all_line:
-            # Try alternative patterns
-            for line in data_lines:
-                if 'All' in line and any(char.isdigit() for char in line):
-                    all_line = line
-                    break
+        return COTRecord(
+            asset_name,
+            report_date,
+            total_open_interest=total_oi,
+            non_commercial_long=non_commercial_long,
+            non_commercial_short=non_commercial_short,
+            spreading=0,  # Not directly available in financial format
+            commercial_long=commercial_long,
+            commercial_short=commercial_short,
+            total_long=non_commercial_long + commercial_long + nonreportable_long,
+            total_short=non_commercial_short + commercial_short + nonreportable_short,
+            nonreportable_long=nonreportable_long,
+            nonreportable_short=nonreportable_short,
+            changes=changes,
+            detail=detail
+        )
 
-        if not all_line:
+    def _parse_standard_data(self, asset_section: memoryview, asset_name: str, report_date: str, page: ReportPage) -> COTRecord:
+        """Parse standard COT data format.
+
+        Every block (positions, changes, percent of OI, number of traders) uses
+        the same fixed-width columns: Open Interest, Non-Commercial Long/Short/
+        Spreading, Commercial Long/Short, Total Long/Short, Nonreportable Long/Short.
+        """
+        data_lines = bytes(asset_section).split(b'\n')
+
+        # Line numbers of the All/Old/Other rows of each block, and of the unlabelled changes row
+        rows = {'positions': {}, 'percent_of_oi': {}, 'traders': {}}
+        changes_line = None
+        block = 'positions'
+        for i, line in enumerate(data_lines):
+            if b'Changes in Commitments from:' in line:
+                if i + 1 < len(data_lines):
+                    changes_line = i + 1
+                continue
+            if b'Largest Traders' in line:
+                block = None  # concentration ratios, not a category breakdown
+            elif b'Percent of Open Interest' in line:
+                block = 'percent_of_oi'
+            elif b'Number of Traders' in line:
+                block = 'traders'
+
+            label = line.split(b':', 1)[0].strip().lower().decode('ascii', errors='replace')
+            if block and label in REPORT_ROWS and label not in rows[block]:
+                rows[block][label] = i
+
+        if 'all' not in rows['positions']:
             raise Exception(f"Could not find position data in {asset_name} section")
 
-        # Parse the position numbers - more robust extraction
-        clean_line = all_line.replace(',', '')
-        numbers = re.findall(r'\d+', clean_line)
-        numbers = [int(n) for n in numbers]
-
-        # Extract changes line
-        changes = []
-        for line in data_lines:
-            if 'Changes in Commitments from:' in line:
-                line_idx = data_lines.index(line)
-                if line_idx + 1 < len(data_lines):
-                    next_line = data_lines[line_idx + 1]
-                    if ':' in next_line and any(c in next_line for c in ['-', '+']):
-                        clean_changes = next_line.replace(',', '')
-                        change_numbers = re.findall(r'-?\d+', clean_changes)
-                        if len(change_numbers) > 1:
-                            changes = [int(x) for x in change_numbers[1:]]
-                        break
-
-        return {
-            'asset_name': asset_name,
-            'report_date': report_date,
-            'total_open_interest': numbers[0] if numbers else 0,
-            'non_commercial_long': numbers[1] if len(numbers) > 1 else 0,
-            'non_commercial_short': numbers[2] if len(numbers) > 2 else 0,
-            'spreading': numbers[3] if len(numbers) > 3 else 0,
-            'commercial_long': numbers[4] if len(numbers) > 4 else 0,
-            'commercial_short': numbers[5] if len(numbers) > 5 else 0,
-            'total_long': numbers[6] if len(numbers) > 6 else 0,
-            'total_short': numbers[7] if len(numbers) > 7 else 0,
-            'nonreportable_long': numbers[8] if len(numbers) > 8 else 0,
-            'nonreportable_short': numbers[9] if len(numbers) > 9 else 0,
-            'changes': changes[:10] if len(changes) >= 10 else changes
+        layout = self._report_layout(page, 'legacy')
+        detail_rows = {
+            block: {
+                # Trader counts are not reported for the nonreportable columns
+                label: column_values(layout.row(data_lines[i], float if block == 'percent_of_oi' else int),
+                                     trim=block == 'traders')
+                for label, i in labels.items()
+            }
+            for block, labels in rows.items()
         }
+        change_numbers = column_values(layout.row(data_lines[changes_line])) if changes_line is not None else []
+
+        # The first changes column is the change in open interest
+        changes = change_numbers[1:]
+        traders = detail_rows['traders']
+        detail = COTDetail(
+            'legacy',
+            positions=detail_rows['positions'],
+            changes=change_numbers,
+            percent_of_oi=detail_rows['percent_of_oi'],
+            traders=traders,
+            total_traders=traders['all'][0] if traders.get('all') else 0,
+            open_interest_change=change_numbers[0] if change_numbers else 0
+        )
+
+        return COTRecord(asset_name, report_date, *detail_rows['positions']['all'], changes=changes, detail=detail)
+
+    def _line_after(self, data_lines: Dict[int, bytes], marker: bytes) -> Optional[int]:
+        """Line number of the non-blank line following the first line that contains marker."""
+        found = False
+        for i, line in data_lines.items():
+            if found:
+                return i
+            found = marker in line
+        return None
     
-    def calculate_metrics(self, data: Dict) -> Dict:
-        """Calculate key COT metrics for analysis."""
+    def calculate_metrics(self, data: COTRecord) -> Dict:
+        """Calculate key COT metrics for analysis.
+
+        Accepts a COTRecord or an API-shaped dict; see COTRecordArray.metrics()
+        for the vectorized form over many records.
+        """
         metrics = {}
         
         # Net positions
@@ -754,15 +857,73 @@ class MultiAssetCOTAnalyzer:
             metrics['commercial_ratio'] = data['commercial_long'] / data['commercial_short']
         
         # Weekly changes (if available)
-        if data['changes'] and len(data['changes']) >= 4:
-            metrics['nc_long_change'] = data['changes'][1] if len(data['changes']) > 1 else 0
-            metrics['nc_short_change'] = data['changes'][2] if len(data['changes']) > 2 else 0
+        detail = data.get('detail')
+        if detail is None and data.get('breakdown'):
+            detail = COTDetail.from_dict(data['breakdown'])
+        nc_changes = non_commercial_changes(data['changes'] or (), detail)
+        if nc_changes is not None:
+            metrics['nc_long_change'], metrics['nc_short_change'] = nc_changes
             metrics['nc_net_change'] = metrics['nc_long_change'] - metrics['nc_short_change']
         
         return metrics
 
-    def analyze_directional_bias(self, data: Dict, metrics: Dict) -> Dict:
-        """Analyze the data using sophisticated contrarian COT logic."""
+    def calculate_rolling_metrics(self, data: COTRecord) -> Dict:
+        """Rolling COT index / z-score / percentile / moving average for this week.
+
+        Only available when the analyzer has a history store. The week is
+        evaluated against the store's rolling state without being stored;
+        ingest_latest() is what appends weeks to the history.
+        """
+        if self.history_store is None:
+            return {}
+        from cot_history import report_date_to_datetime64
+        from cot_record_array import COTRecordArray
+        from cot_rolling import ROLLING_FIELDS
+        date = report_date_to_datetime64(data['report_date'])
+        metrics = COTRecordArray.from_records([data]).metrics()
+        values = {field: float(metrics[field][0]) for field in ROLLING_FIELDS}
+        # The store is shared by every call on this instance
+        with self._lock:
+            if str(date) == 'NaT':
+                return self.history_store.rolling.latest(data['asset_name'])
+            return self.history_store.rolling_metrics(data['asset_name'], date, values)
+
+    def historical_analogs(self, data: Dict, store=None, k: int = 3) -> Optional[Dict]:
+        """Closest past setups of this week's positioning (cot_analogs), or None without history.
+
+        store defaults to the analyzer's history store; the analog index is
+        shared by every call and rebuilt only when the store changes.
+        """
+        store = store if store is not None else self.history_store
+        if store is None or data['asset_name'] not in store.segments():
+            return None
+        from cot_analogs import AnalogIndex
+        with self._lock:
+            if self._analogs is None or self._analogs.store is not store or len(self._analogs.matrix) != len(store):
+                self._analogs = AnalogIndex(store)
+            index = self._analogs
+        # The query is this week's record itself, which run_analysis does not store
+        return index.find_analogs(data['asset_name'], k, same_asset=True, record=data)
+
+    def _add_historical_analogs(self, analysis: Dict, data: Dict, store=None):
+        """Attach analogs and their written summary to an analysis when history is available."""
+        analogs = self.historical_analogs(data, store)
+        if not analogs or not analogs['analogs']:
+            return
+        from cot_analogs import summarize_analogs
+        analysis['historical_analogs'] = analogs['analogs']
+        lines = '\n'.join(f"• {line}" for line in summarize_analogs(analogs))
+        analysis['combined_analysis']['historical_analogs'] = f"""📚 HISTORICAL ANALOGS
+
+Closest past {data['asset_name']} setups by positioning:
+{lines}"""
+
+    def analyze_directional_bias(self, data: Dict, metrics: Dict,
+                                 upcoming_events: Optional[List[Dict]] = None) -> Dict:
+        """Analyze the data using sophisticated contrarian COT logic.
+
+        upcoming_events: calendar events already fetched (fetched here if omitted)
+        """
         analysis = {
             'overall_bias': 'NEUTRAL',
             'confidence': 'LOW',
@@ -936,7 +1097,8 @@ class MultiAssetCOTAnalyzer:
             analysis['overall_bias'],
             nc_short_pct,
             nc_long_pct,
-            analysis['positioning_extremes']['extreme_level']
+            analysis['positioning_extremes']['extreme_level'],
+            upcoming_events
         )
 
         # STEP 7: GENERATE BIAS EXPLANATION (Simple Description)
@@ -992,11 +1154,13 @@ class MultiAssetCOTAnalyzer:
         return analysis
 
     def analyze_upcoming_catalysts(self, asset_name: str, bias: str, nc_short_pct: float,
-                                 nc_long_pct: float, extreme_level: str) -> Dict:
+                                 nc_long_pct: float, extreme_level: str,
+                                 upcoming_events: Optional[List[Dict]] = None) -> Dict:
         """Analyze upcoming economic events and their impact on positioning"""
 
         # Get upcoming events
-        upcoming_events = self.calendar.get_upcoming_events(days_ahead=7)
+        if upcoming_events is None:
+            upcoming_events = self.calendar.get_upcoming_events(days_ahead=7)
 
         catalyst_analysis = {
             'upcoming_events': upcoming_events,
@@ -1517,38 +1681,229 @@ OPPORTUNITY vs RISK: Standard risk/reward profile"""
 
         return risk
 
+    def fetch_all_sources(self, sources: Optional[List[str]] = None) -> Dict[str, ReportPage]:
+        """Fetch each CFTC report page once, all concurrently."""
+        stages = {source: (partial(self.fetch_cot_data, source), ()) for source in (sources or self.urls)}
+        return run_graph(stages, self.executor)
+
+    def discover_contracts(self, pages: Dict[str, ReportPage]) -> int:
+        """Add every contract found in the pages' section headers to available_assets.
+
+        Contracts already in the catalog are kept as they are. New ones are
+        saved so other processes load them too; returns how many were added.
+        """
+        contracts = [contract for source, page in pages.items() for contract in find_contracts(page, source)]
+        with self._lock:
+            catalog, added = merge_contracts(self.available_assets, contracts)
+            # Replaced, not mutated, so concurrent readers keep a consistent catalog
+            self.available_assets = catalog
+        if added:
+            save_contracts(catalog)
+            print(f"🔎 Discovered {added} new contracts ({len(catalog)} assets available)")
+        return added
+
+    def parse_all_assets(self, pages: Dict[str, ReportPage]) -> 'COTRecordArray':
+        """Parse every available asset (including newly discovered contracts) from already-fetched report pages."""
+        self.discover_contracts(pages)
+        records = []
+        for asset_name, info in self.available_assets.items():
+            html_content = pages.get(info['source'])
+            if html_content is None:
+                continue
+            try:
+                records.append(self.parse_asset_data(html_content, asset_name))
+            except Exception as e:
+                print(f"⚠️ Skipping {asset_name}: {e}")
+        from cot_record_array import COTRecordArray
+        return COTRecordArray.from_records(records)
+
+    def analyze_all_assets(self, records: 'COTRecordArray', store=None,
+                           upcoming_events: Optional[List[Dict]] = None) -> Dict[str, Dict]:
+        """run_analysis()-shaped results for every parsed record, fetching the calendar once if not given."""
+        if upcoming_events is None:
+            upcoming_events = self.calendar.get_upcoming_events(days_ahead=7)
+        results = {}
+        for record in records:
+            metrics = self.calculate_metrics(record)
+            if store is not None:
+                metrics.update(store.rolling.latest(record.asset_name))
+            analysis = self.analyze_directional_bias(record, metrics, upcoming_events)
+            if store is not None:
+                self._add_historical_analogs(analysis, record, store)
+            results[record.asset_name] = {
+                'data': record.to_dict(),
+                'metrics': metrics,
+                'analysis': analysis
+            }
+        return results
+
+    def ingest_latest(self, store, snapshot_path: Optional[str] = None) -> int:
+        """Fetch the current reports, append this week's records to a COTHistoryStore
+        and write the results snapshot for every asset.
+
+        Each report is compared by content hash with the one the current
+        snapshot was built from: unchanged reports are not re-parsed and their
+        assets keep their snapshot results (re-analyzed only if the calendar
+        changed), unless the report has an asset the snapshot lacks. When
+        nothing changed the snapshot is left as it is.
+        """
+        # Every report and the calendar are fetched concurrently
+        stages = {source: (partial(self.fetch_cot_data, source), ()) for source in self.urls}
+        stages['calendar'] = (partial(self.calendar.get_upcoming_events, days_ahead=7), ())
+        fetched = run_graph(stages, self.executor)
+        upcoming_events = fetched.pop('calendar')
+
+        digests = {source: page.sha256 for source, page in fetched.items()}
+        digests['calendar'] = hashlib.sha256(
+            json.dumps(upcoming_events, sort_keys=True).encode('utf-8')).hexdigest()
+        # Contracts are discovered on every page, so a contract new to this
+        # process is picked up even when its report is unchanged
+        self.discover_contracts(fetched)
+        snapshot = COTSnapshot(snapshot_path)
+        previous = snapshot.sources if snapshot.available() else {}
+        cached = snapshot.get_many()
+        changed = [source for source in fetched if previous.get(source) != digests[source]]
+        # An unchanged report is re-parsed too if it has a section for an asset the snapshot lacks
+        missing = {info['source'] for name, info in self.available_assets.items()
+                   if name not in cached and info['source'] in fetched and info['source'] not in changed
+                   and fetched[info['source']].section(info['pattern']) is not None}
+        changed += [source for source in fetched if source in missing]
+        if not changed and previous.get('calendar') == digests['calendar']:
+            snapshot.close()
+            print("♻️ Reports and calendar unchanged since the last ingest; snapshot kept")
+            return 0
+
+        records = self.parse_all_assets({source: fetched[source] for source in changed})
+        added = store.ingest(records)
+        if added:
+            store.save()
+        print(f"💾 Stored {added} new weekly records ({len(records)} assets parsed from {len(changed)} changed reports)")
+
+        results = {}
+        for name, result in cached.items():
+            source = self.available_assets.get(name, {}).get('source')
+            if source in fetched and source not in changed:
+                if previous.get('calendar') != digests['calendar']:
+                    result['analysis'] = self.analyze_directional_bias(result['data'], result['metrics'], upcoming_events)
+                    self._add_historical_analogs(result['analysis'], result['data'], store)
+                results[name] = result
+        results.update(self.analyze_all_assets(records, store, upcoming_events))
+        snapshot.close()
+        path = write_snapshot(results, self.available_assets, snapshot_path, digests)
+        print(f"📦 Results snapshot written to {path}")
+        return added
+
     def run_analysis(self, asset_name: str = 'USD INDEX') -> Dict:
-        """Run the complete COT analysis for specified asset."""
+        """Run the complete COT analysis for specified asset.
+
+        The stages form a small graph: the CFTC report and the calendar are
+        fetched concurrently, and the bias analysis waits for both. When the
+        report's content hash is unchanged, the previous record, metrics and
+        analysis (for the same calendar) are returned as they are.
+        """
         print(f"🔄 Fetching latest {asset_name} COT data...")
 
+        if asset_name not in self.available_assets:
+            # It may have been discovered by another process (e.g. the weekly ingest) since this one started
+            saved = load_contracts()
+            with self._lock:
+                self.available_assets = {**saved, **self.available_assets}
         if asset_name not in self.available_assets:
             raise Exception(f"Asset '{asset_name}' not supported")
 
         source = self.available_assets[asset_name]['source']
-        html_content = self.fetch_cot_data(source)
 
-        print(f"📊 Parsing {asset_name} data...")
-        self.data = self.parse_asset_data(html_content, asset_name)
+        def parse(html_content):
+            print(f"📊 Parsing {asset_name} data...")
+            data = self.parse_asset_data(html_content, asset_name)
+
+            # Debug: Print the extracted date
+            print(f"📅 Extracted report date: {data.get('report_date', 'Unknown')}")
+            return data
+
+        def calculate(page, data):
+            # An unchanged page keeps the metrics and analysis of its last run, as
+            # long as the history store (rolling metrics, analogs) has not changed
+            cached = page.results[asset_name]
+            store = self.history_store
+            history = (id(store), len(store)) if store is not None else None
+            if 'metrics' not in cached or cached.get('history') != history:
+                print("🧮 Calculating metrics...")
+                metrics = self.calculate_metrics(data)
+                metrics.update(self.calculate_rolling_metrics(data))
+                cached['metrics'] = metrics
+                cached['history'] = history
+                cached.pop('analysis', None)
+            return cached['metrics']
+
+        def analyze(page, data, metrics, upcoming_events):
+            cached = page.results[asset_name]
+            if cached.get('upcoming_events') != upcoming_events or 'analysis' not in cached:
+                print("🎯 Analyzing directional bias...")
+                analysis = self.analyze_directional_bias(data, metrics, upcoming_events)
+                self._add_historical_analogs(analysis, data)
+                cached['analysis'] = analysis
+                cached['upcoming_events'] = upcoming_events
+            return cached['analysis']
+
+        results = run_graph({
+            'page': (partial(self.fetch_cot_data, source), ()),
+            'calendar': (partial(self.calendar.get_upcoming_events, days_ahead=7), ()),
+            'data': (parse, ('page',)),
+            'metrics': (calculate, ('page', 'data')),
+            'analysis': (analyze, ('page', 'data', 'metrics', 'calendar')),
+        }, self.executor)
 
-        # Debug: Print the extracted date
-        print(f"📅 Extracted report date: {self.data.get('report_date', 'Unknown')}")
+        return {
+            'data': results['data'].to_dict(),
+            'metrics': results['metrics'],
+            'analysis': results['analysis']
+        }
 
-        print("🧮 Calculating metrics...")
-        metrics = self.calculate_metrics(self.data)
+def run_screener(sort_by: str = 'extremity', limit: int = 10, replay_date: Optional[str] = None) -> List[Dict]:
+    """Ingest the current week and print the most extreme assets."""
+    from cot_history import COTHistoryStore
+    from cot_screener import COTScreener
 
-        print("🎯 Analyzing directional bias...")
-        self.analysis_results = self.analyze_directional_bias(self.data, metrics)
+    analyzer = MultiAssetCOTAnalyzer(replay_date=replay_date)
+    store = COTHistoryStore()
+    analyzer.ingest_latest(store)
 
-        return {
-            'data': self.data,
-            'metrics': metrics,
-            'analysis': self.analysis_results
-        }
+    sources = {name: info['source'] for name, info in analyzer.available_assets.items()}
+    rows = COTScreener(store, sources=sources).screen(sort_by=sort_by, limit=limit)
+
+    print(f"\n🔥 Most extreme positioning (sorted by {sort_by}):")
+    print(f"{'Asset':<28}{'Long %':>8}{'Short %':>9}{'COT Idx':>9}{'Net Chg':>10}  Level")
+    for row in rows:
+        cot_index = f"{row['cot_index']:.0f}" if row['cot_index'] is not None else '-'
+        print(f"{row['asset_name']:<28}{row['non_commercial_long_pct'] or 0:>8.1f}"
+              f"{row['non_commercial_short_pct'] or 0:>9.1f}{cot_index:>9}"
+              f"{row['nc_net_change']:>10,}  {row['extreme_level']}")
+    return rows
 
 def main():
     """Main execution function."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Multi-Asset COT Report Analyzer')
+    parser.add_argument('--asset', default='USD INDEX', help='Asset to analyze')
+    parser.add_argument('--screen', action='store_true', help='Rank all assets by positioning extremity')
+    parser.add_argument('--sort', default='extremity', help='Screener sort column')
+    parser.add_argument('--limit', type=int, default=10, help='Number of screener rows to show')
+    parser.add_argument('--replay', metavar='YYYY-MM-DD', help='Run offline from pages archived on or before this date')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Ingest the current week and write the results snapshot for every asset')
+    args = parser.parse_args()
+
     try:
-        analyzer = MultiAssetCOTAnalyzer()
+        if args.screen:
+            return run_screener(args.sort, args.limit, args.replay)
+
+        if args.snapshot:
+            from cot_history import COTHistoryStore
+            return MultiAssetCOTAnalyzer(replay_date=args.replay).ingest_latest(COTHistoryStore())
+
+        analyzer = MultiAssetCOTAnalyzer(replay_date=args.replay)
 
         # Show available assets
         assets = analyzer.get_available_assets()
@@ -1557,7 +1912,7 @@ def main():
             print(f"  - {asset['name']}: {asset['description']}")
 
         # Default analysis for USD INDEX
-        results = analyzer.run_analysis('USD INDEX')
+        results = analyzer.run_analysis(args.asset)
 
         # Print basic results
         print(f"\n🎯 Analysis Results for {results['data']['asset_name']}:")
@@ -1,9 +1,9 @@
 #!/bin/bash
 
-# USD Index COT Analysis Runner
-# Simple script to run the COT analysis with virtual environment
+# COT Analysis Runner
+# Simple script to run the COT analysis for every asset with virtual environment
 
-echo "🚀 Starting USD Index COT Analysis..."
+echo "🚀 Starting COT Analysis..."
 echo "======================================"
 
 # Check if virtual environment exists
@@ -21,13 +21,16 @@ fi
 
 # Run the analysis
 echo ""
-echo "🔄 Running COT analysis..."
-python usd_index_cot_analyzer.py
+echo "🔄 Running COT analysis for all assets..."
+python cot_batch.py --assets all --format json --out cot_data/results
+
+echo ""
+echo "📦 Writing results snapshot for all assets..."
+python multi_asset_cot_analyzer.py --snapshot
 
 echo ""
 echo "✅ Analysis complete!"
-echo "📁 Check the generated files:"
-echo "   - cot_analysis_results.json (detailed data)"
-echo "   - cot_summary.txt (summary)"
+echo "📁 Batch results: cot_data/results/cot_results.json"
+echo "📁 Results snapshot: cot_data/snapshot.jsonl"
 
 deactivate
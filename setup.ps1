@@ -48,7 +48,7 @@ if (Test-Path "requirements.txt") {
     pip install -r requirements.txt
 } else {
     Write-Host "⚠️  requirements.txt not found. Installing basic dependencies..." -ForegroundColor Yellow
-    pip install flask flask-cors requests pandas numpy
+    pip install flask flask-cors requests numpy
 }
 
 # Return to root directory
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { NextUIProvider } from '@nextui-org/react';
 import {
   Card,
@@ -36,6 +36,13 @@ function App() {
   const [backendStatus, setBackendStatus] = useState('unknown');
   const [availableAssets, setAvailableAssets] = useState([]);
   const [selectedAsset, setSelectedAsset] = useState('USD INDEX');
+  const [latestReport, setLatestReport] = useState(null);
+
+  // Read by the event stream listener, which is registered once
+  const selectedAssetRef = useRef(selectedAsset);
+  const analysisRef = useRef(analysis);
+  selectedAssetRef.current = selectedAsset;
+  analysisRef.current = analysis;
 
   // Check backend health and load assets on component mount
   React.useEffect(() => {
@@ -69,22 +76,57 @@ function App() {
     initializeApp();
   }, []);
 
+  const fetchAnalysis = async (asset) => {
+    // Use absolute URL to avoid proxy issues
+    const response = await axios.post('http://localhost:5000/api/analyze', {
+      asset
+    }, {
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      timeout: 30000, // 30 second timeout
+    });
+    return response.data;
+  };
+
+  // New weekly reports are pushed by the backend (server-sent events) once per
+  // ingestion; the shown analysis is refreshed from the precomputed snapshot
+  React.useEffect(() => {
+    if (backendStatus !== 'healthy') {
+      return undefined;
+    }
+
+    const source = new EventSource('http://localhost:5000/api/events');
+    source.addEventListener('report', async (event) => {
+      const update = JSON.parse(event.data);
+      setLatestReport(update);
+
+      const asset = selectedAssetRef.current;
+      const changed = update.assets.some(a => a.asset_name === asset);
+      if (changed && analysisRef.current) {
+        try {
+          const data = await fetchAnalysis(asset);
+          if (selectedAssetRef.current === asset) {
+            setAnalysis(data);
+          }
+        } catch (err) {
+          console.warn('Failed to refresh analysis after new report:', err.message);
+        }
+      }
+    });
+
+    return () => source.close();
+  }, [backendStatus]);
+
+  const selectedDelta = latestReport?.assets.find(a => a.asset_name === selectedAsset);
+
   const runAnalysis = async () => {
     setLoading(true);
     setError(null);
     setAnalysis(null);
 
     try {
-      // Use absolute URL to avoid proxy issues
-      const response = await axios.post('http://localhost:5000/api/analyze', {
-        asset: selectedAsset
-      }, {
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        timeout: 30000, // 30 second timeout
-      });
-      setAnalysis(response.data);
+      setAnalysis(await fetchAnalysis(selectedAsset));
     } catch (err) {
       console.error('Analysis error:', err);
       if (err.code === 'ECONNREFUSED' || err.message.includes('Network Error')) {
@@ -254,6 +296,26 @@ function App() {
             </CardBody>
           </Card>
 
+          {/* New Report Notice */}
+          {latestReport && (
+            <Alert
+              color="primary"
+              variant="flat"
+              startContent={<Calendar size={20} />}
+              isClosable
+              onClose={() => setLatestReport(null)}
+            >
+              New COT report ({latestReport.report_dates.join(', ')}): {latestReport.assets.length} assets updated.
+              {selectedDelta && (
+                <span className="block mt-1">
+                  {selectedDelta.asset_name}: {selectedDelta.previous_bias
+                    ? `${selectedDelta.previous_bias} → ${selectedDelta.overall_bias}`
+                    : selectedDelta.overall_bias} ({selectedDelta.confidence} confidence)
+                </span>
+              )}
+            </Alert>
+          )}
+
           {/* Error Display */}
           {error && (
             <Alert
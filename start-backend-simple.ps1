@@ -34,7 +34,7 @@ if (Test-Path "requirements.txt") {
     pip install -r requirements.txt
 } else {
     Write-Host "📦 Installing basic dependencies..." -ForegroundColor Yellow
-    pip install flask flask-cors requests pandas numpy
+    pip install flask flask-cors requests numpy
 }
 
 # Start the Flask server
@@ -18,7 +18,7 @@ call venv\Scripts\activate.bat
 
 REM Check if required Python packages are installed
 echo 📦 Checking dependencies...
-python -c "import flask, flask_cors, requests, pandas, numpy" >nul 2>&1
+python -c "import flask, flask_cors, requests, numpy" >nul 2>&1
 if errorlevel 1 (
     echo ❌ Missing dependencies. Installing...
     pip install -r requirements.txt
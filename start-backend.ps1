@@ -31,7 +31,7 @@ Write-Host "🔧 Activating virtual environment..." -ForegroundColor Yellow
 # Check if required Python packages are installed
 Write-Host "📦 Checking dependencies..." -ForegroundColor Yellow
 try {
-    python -c "import flask, flask_cors, requests, pandas, numpy" 2>$null
+    python -c "import flask, flask_cors, requests, numpy" 2>$null
     if ($LASTEXITCODE -ne 0) {
         throw "Dependencies missing"
     }
@@ -18,7 +18,7 @@ source venv/bin/activate
 
 # Check if required Python packages are installed
 echo "📦 Checking dependencies..."
-python -c "import flask, flask_cors, requests, pandas, numpy" 2>/dev/null
+python -c "import flask, flask_cors, requests, numpy" 2>/dev/null
 if [ $? -ne 0 ]; then
     echo "❌ Missing dependencies. Installing..."
     pip install -r requirements.txt
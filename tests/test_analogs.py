@@ -0,0 +1,100 @@
+"""Analog features and forward lookups across gaps in an asset's history."""
+
+import numpy as np
+import pytest
+
+from cot_analogs import FORWARD_WEEKS, AnalogIndex
+from cot_history import COTHistoryStore, report_date_to_datetime64
+from cot_records import COTRecordArray
+
+WEEK = np.timedelta64(7, 'D')
+
+
+def record(asset, date, n):
+    return {'asset_name': asset, 'report_date': date.astype(object).strftime('%d/%b/%Y'),
+            'total_open_interest': 400000 + 1000 * (n % 7), 'non_commercial_long': 150000 + int(n),
+            'non_commercial_short': 120000, 'commercial_long': 90000, 'commercial_short': 110000 + int(n) // 2,
+            'changes': [int(n) % 50, -3, 4, 1]}
+
+
+def build(tmp_path, series, lookback_weeks=26):
+    store = COTHistoryStore(str(tmp_path / 'history.npz'))
+    store.ingest(COTRecordArray.from_records(
+        record(asset, d, n) for asset, (dates, net) in series.items() for d, n in zip(dates, net)))
+    return store, AnalogIndex(store, lookback_weeks=lookback_weeks)
+
+
+def walk(seed, weeks):
+    return np.cumsum(np.random.default_rng(seed).integers(-4000, 4000, weeks))
+
+
+def test_forward_by_date_across_gaps(tmp_path):
+    weeks = np.datetime64('2020-01-07') + np.arange(40) * WEEK
+    kept = np.r_[0:10, 12:40]  # weeks 10 and 11 missing
+    net = walk(1, 40)
+    store, index = build(tmp_path, {'GOLD': (weeks[kept], net[kept]), 'CORN': (weeks, walk(2, 40))})
+    segment = store.segments()['GOLD']
+    row = {d: segment.start + i for i, d in enumerate(store.asset_dates('GOLD'))}
+
+    # Four weeks ahead of week 7 falls in the gap; thirteen weeks ahead is week 20, row 18 of the segment
+    forward = index._forward(row[weeks[7]])
+    assert forward['nc_net_change_4w'] is None and forward['cot_index_4w'] is None
+    assert forward['nc_net_change_13w'] == net[20] - net[7]
+    assert forward['cot_index_13w'] == pytest.approx(index.cot_index[row[weeks[20]]])
+
+    forward = index._forward(row[weeks[2]])
+    assert forward['nc_net_change_4w'] == net[6] - net[2]
+    assert forward['nc_net_change_13w'] == net[15] - net[2]
+
+    # Past the asset's last week there is nothing, even though CORN's rows follow
+    assert set(index._forward(segment.stop - 1).values()) == {None}
+    assert sorted(index._forward(0)) == sorted(f"{name}_{w}w" for w in FORWARD_WEEKS for name in ('nc_net_change', 'cot_index'))
+
+
+def test_forward_nat_dates(tmp_path):
+    weeks = np.datetime64('2020-01-07') + np.arange(20) * WEEK
+    net = walk(3, 20)
+    store, _ = build(tmp_path, {'GOLD': (weeks, net)})
+    # Undated rows sort last in an asset's segment
+    dates = store.dates.copy()
+    dates[-2:] = np.datetime64('NaT')
+    store.dates = dates
+    store._index()
+    index = AnalogIndex(store, lookback_weeks=26)
+    assert index._forward(13)['nc_net_change_4w'] == net[17] - net[13]
+    assert index._forward(14)['nc_net_change_4w'] is None
+    assert index._forward(15)['nc_net_change_4w'] is None
+    assert set(index._forward(18).values()) == {None}
+
+
+def test_record_features_match_stored_rows(tmp_path):
+    weeks = np.datetime64('2019-01-01') + np.arange(60) * WEEK
+    kept = np.r_[0:30, 31:60]
+    store, index = build(tmp_path, {'GOLD': (weeks[kept], walk(4, 60)[kept]), 'CORN': (weeks, walk(5, 60))})
+    for i in range(len(store)):
+        expected = index.features[i]
+        actual = index.record_features(store.records[i])
+        assert np.allclose(actual, expected, equal_nan=True), (i, actual, expected)
+
+
+def test_find_analogs_for_unstored_week(tmp_path):
+    weeks = np.datetime64('2010-01-05') + np.arange(120) * WEEK
+    net = walk(6, 121)
+    store, index = build(tmp_path, {'GOLD': (weeks, net[:120])})
+    latest = record('GOLD', weeks[-1] + WEEK, net[120])
+
+    result = index.find_analogs('GOLD', k=3, same_asset=True, record=latest)
+    assert result['report_date'] == latest['report_date']
+    assert np.allclose([result['features'][name] for name in result['features']], index.record_features(latest))
+    assert result['k'] == 3
+    distances = [a['distance'] for a in result['analogs']]
+    assert distances == sorted(distances)
+    cutoff = weeks[-1] + WEEK - 13 * WEEK
+    assert all(report_date_to_datetime64(a['report_date']) <= cutoff for a in result['analogs'])
+
+    # Once the week is stored, searching by date describes it the same way
+    store.ingest(COTRecordArray.from_records([latest]))
+    index.refresh()
+    stored = index.find_analogs('GOLD', k=3, same_asset=True)
+    assert stored['report_date'] == latest['report_date']
+    assert stored['features'] == pytest.approx(result['features'])
@@ -0,0 +1,114 @@
+"""cot_codec: delta / zigzag / bit-packing round trips at every block width."""
+
+import numpy as np
+import pytest
+
+from cot_codec import BLOCK_SIZE, decode_int_array, encode_int_array, pack_arrays, unpack_arrays
+
+
+def round_trip(values):
+    decoded = decode_int_array(encode_int_array(values))
+    assert decoded.dtype == values.dtype
+    assert decoded.shape == values.shape
+    return decoded
+
+
+def reference_widths(values):
+    """Bits of each block's largest zigzagged-delta offset, in plain Python integers."""
+    flat = [int(v) for v in values]
+    # Deltas wrap around like int64 arithmetic
+    deltas = [(b - a + (1 << 63)) % (1 << 64) - (1 << 63) for a, b in zip([0] + flat, flat)]
+    zigzag = [2 * d if d >= 0 else -2 * d - 1 for d in deltas]
+    blocks = [zigzag[i:i + BLOCK_SIZE] for i in range(0, len(zigzag), BLOCK_SIZE)]
+    return [(max(block) - min(block)).bit_length() for block in blocks]
+
+
+@pytest.mark.parametrize('width', [1, 7, 8, 31, 54, 55, 56, 57, 60, 62])
+def test_block_widths(width):
+    rng = np.random.default_rng(width)
+    deltas = rng.integers(0, 1 << width, 3 * BLOCK_SIZE + 5, dtype=np.uint64)
+    deltas[::BLOCK_SIZE] = (1 << width) - 1
+    values = np.cumsum(deltas.astype(np.int64))
+    encoded = encode_int_array(values)
+    assert encoded['widths'].tolist() == reference_widths(values)
+    assert np.array_equal(decode_int_array(encoded), values)
+
+
+def test_full_int64_range():
+    values = np.array([np.iinfo(np.int64).max, np.iinfo(np.int64).min, 0, -1, 1] * 60, dtype=np.int64)
+    encoded = encode_int_array(values)
+    assert encoded['widths'].tolist() == reference_widths(values) == [64, 64, 64]
+    assert np.array_equal(round_trip(values), values)
+
+
+def test_negative_random_walk():
+    rng = np.random.default_rng(1)
+    values = np.cumsum(rng.integers(-5000, 5000, 1000)) - 200000
+    assert np.array_equal(round_trip(values), values)
+
+
+@pytest.mark.parametrize('dtype', [np.int8, np.int32, np.uint32, np.int64])
+def test_dtypes(dtype):
+    values = np.arange(300).astype(dtype)
+    assert np.array_equal(round_trip(values), values)
+
+
+def test_constant_and_empty():
+    constant = np.full(500, 42, dtype=np.int64)
+    encoded = encode_int_array(constant)
+    assert not encoded['widths'][1:].any()
+    assert np.array_equal(decode_int_array(encoded), constant)
+    empty = np.array([], dtype=np.int64)
+    assert len(round_trip(empty)) == 0
+    assert round_trip(np.zeros((0, 3, 4), dtype=np.int32)).shape == (0, 3, 4)
+
+
+def test_datetime64_with_nat():
+    dates = np.datetime64('1995-01-03') + np.arange(400) * np.timedelta64(7, 'D')
+    dates[[0, 17, 399]] = np.datetime64('NaT')
+    decoded = round_trip(dates)
+    assert np.array_equal(np.isnat(decoded), np.isnat(dates))
+    assert np.array_equal(decoded[~np.isnat(dates)], dates[~np.isnat(dates)])
+
+
+def test_multidimensional():
+    rng = np.random.default_rng(2)
+    values = np.cumsum(rng.integers(-100, 100, (300, 3, 14)), axis=0)
+    assert np.array_equal(round_trip(values), values)
+
+
+def test_pack_arrays_round_trip():
+    arrays = {
+        'dates': np.datetime64('2020-01-07') + np.arange(200) * np.timedelta64(7, 'D'),
+        'pos_total_open_interest': np.arange(200, dtype=np.int64) * 1000,
+        'traders': np.ones((200, 3, 14), dtype=np.int32),
+        'change_counts': np.full(200, 4, dtype=np.int8),
+        'percent_of_oi': np.linspace(0, 100, 200),
+        'asset_name': np.array(['GOLD'] * 200),
+    }
+    packed = pack_arrays(arrays)
+    assert 'pos_total_open_interest' not in packed
+    assert 'change_counts' in packed and 'percent_of_oi' in packed
+    unpacked = unpack_arrays(packed)
+    assert set(unpacked) == set(arrays)
+    for name, values in arrays.items():
+        assert unpacked[name].dtype == values.dtype
+        assert np.array_equal(unpacked[name], values)
+
+
+def test_packed_store_round_trip(tmp_path):
+    from cot_history import COTHistoryStore
+    from cot_record_array import COTRecordArray
+
+    records = COTRecordArray.from_records(
+        {'asset_name': asset, 'report_date': f"{day}/Jan/2024", 'total_open_interest': 1000 * day,
+         'non_commercial_long': -day, 'changes': [day, -day, 0, 1]}
+        for asset in ('CORN', 'GOLD') for day in (2, 9, 16, 23, 30))
+    plain = COTHistoryStore(str(tmp_path / 'plain.npz'))
+    packed = COTHistoryStore(str(tmp_path / 'packed.npz'), packed=True)
+    for store in (plain, packed):
+        store.ingest(records)
+        store.save()
+    loaded = COTHistoryStore(packed.path)
+    assert list(loaded.records) == list(COTHistoryStore(plain.path).records)
+    assert np.array_equal(loaded.dates, plain.dates)
@@ -0,0 +1,92 @@
+"""Cross-asset alignment and pairwise-complete window correlations against pandas."""
+
+import numpy as np
+import pytest
+
+from cot_correlation import CrossAssetEngine, position_matrix, rolling_correlation, window_correlation
+from cot_history import COTHistoryStore
+from cot_records import COTRecordArray
+
+pd = pytest.importorskip('pandas')
+
+WEEK = np.timedelta64(7, 'D')
+
+
+def store_with(tmp_path, series):
+    """series: asset -> (dates, non-commercial net) ingested as one batch."""
+    store = COTHistoryStore(str(tmp_path / 'history.npz'))
+    store.ingest(COTRecordArray.from_records(
+        {'asset_name': asset, 'report_date': d.astype(object).strftime('%d/%b/%Y'),
+         'total_open_interest': 100000, 'non_commercial_long': 50000 + int(n), 'non_commercial_short': 50000}
+        for asset, (dates, net) in series.items() for d, n in zip(dates, net)))
+    return store
+
+
+def random_block(seed, rows=80, assets=6, missing=0.2):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(rows, 1))
+    block = base + rng.normal(scale=0.8, size=(rows, assets)) * rng.uniform(0.1, 1e4, assets)
+    block[rng.random((rows, assets)) < missing] = np.nan
+    block[:30, -1] = np.nan  # one asset starts late
+    return block
+
+
+@pytest.mark.parametrize('min_periods', [2, 10, 60])
+def test_window_matches_pandas(min_periods):
+    block = random_block(min_periods)
+    expected = pd.DataFrame(block).corr(min_periods=min_periods).to_numpy()
+    actual = window_correlation(block, min_periods)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.allclose(actual, expected, equal_nan=True, atol=1e-9)
+
+
+def test_constant_column_is_nan():
+    block = random_block(1, missing=0)
+    block[:, 2] = 5.0
+    actual = window_correlation(block)
+    assert np.isnan(actual[2]).all() and np.isnan(actual[:, 2]).all()
+
+
+def test_rolling_ends_match_windows():
+    matrix = random_block(2, rows=120)
+    ends = [0, 10, 51, 52, 119]
+    rolled = rolling_correlation(matrix, window=52, min_periods=5, ends=ends)
+    assert rolled.shape == (len(ends), 6, 6)
+    for k, t in enumerate(ends):
+        expected = pd.DataFrame(matrix[max(t - 51, 0):t + 1]).corr(min_periods=5).to_numpy()
+        assert np.allclose(rolled[k], expected, equal_nan=True, atol=1e-9)
+
+
+def test_position_matrix_weekly_axis(tmp_path):
+    start = np.datetime64('2024-01-02')
+    weeks = start + np.arange(10) * WEEK
+    store = store_with(tmp_path, {
+        'GOLD': (weeks[[0, 1, 2, 5, 6, 9]], [1, 2, 3, 6, 7, 10]),
+        'CORN': (np.r_[weeks[[1, 2]], weeks[6] + np.timedelta64(2, 'D')], [20, 30, 70]),
+    })
+    dates, assets, matrix = position_matrix(store)
+    # Weeks 3, 4, 7 and 8 have no report at all but keep their rows
+    assert np.array_equal(dates, weeks)
+    assert assets == ['CORN', 'GOLD']
+    gold = matrix[:, assets.index('GOLD')]
+    corn = matrix[:, assets.index('CORN')]
+    assert np.array_equal(gold, [1, 2, 3, np.nan, np.nan, 6, 7, np.nan, np.nan, 10], equal_nan=True)
+    # A report two days late counts for its week
+    assert np.array_equal(corn, [np.nan, 20, 30, np.nan, np.nan, np.nan, 70, np.nan, np.nan, np.nan], equal_nan=True)
+
+    _, subset, oi = position_matrix(store, 'total_open_interest', ['GOLD', 'MISSING'])
+    assert subset == ['GOLD'] and oi.shape == (10, 1)
+    assert position_matrix(store, assets=[])[2].shape == (10, 0)
+    with pytest.raises(Exception):
+        position_matrix(store, 'no_such_field')
+
+
+def test_engine_changes_span_gaps_as_nan(tmp_path):
+    weeks = np.datetime64('2024-01-02') + np.arange(6) * WEEK
+    store = store_with(tmp_path, {'GOLD': (weeks[[0, 1, 3, 4, 5]], [10, 15, 40, 38, 50])})
+    engine = CrossAssetEngine(store, window=4)
+    assert np.array_equal(engine.net_changes[:, 0], [np.nan, 5, np.nan, np.nan, -2, 12], equal_nan=True)
+    result = engine.correlation_matrix(str(weeks[4] + np.timedelta64(3, 'D')))
+    assert result['date'] == str(weeks[4]) and result['assets'] == ['GOLD']
+    with pytest.raises(Exception):
+        engine.correlation_matrix('2000-01-01')
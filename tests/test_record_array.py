@@ -0,0 +1,80 @@
+"""COTRecordArray round trips: records, API dicts, .npz arrays and the history store."""
+
+import numpy as np
+
+from cot_history import COTHistoryStore
+from cot_records import (COTDetail, COTRecord, COTRecordArray, POSITION_FIELDS, REPORT_COLUMNS,
+                         record_arrays_from_npz, record_arrays_to_npz)
+
+
+def sample_records():
+    tff = COTDetail(
+        'tff',
+        positions={'all': list(range(100, 100 + len(REPORT_COLUMNS['tff'])))},
+        changes=[-5, 7, 0, 3],
+        percent_of_oi={'all': [12.5, 3.1]},
+        traders={'all': [4, 9, 11]},
+        total_traders=52,
+        open_interest_change=-1200,
+    )
+    legacy = COTDetail(
+        'legacy',
+        positions={row: [n * 10 + i for i in range(10)] for n, row in enumerate(('all', 'old', 'other'))},
+        changes=list(range(-3, 7)),
+        traders={'all': [300, 40, 55, 12]},
+    )
+    return [
+        COTRecord('EURO FX', '26/Aug/2025', *range(1000, 1010), changes=[5, -3, 2, 0], detail=tff),
+        COTRecord('GOLD', '2/Sep/2025', *range(2000, 2010), changes=list(range(12)), detail=legacy),
+        COTRecord('WHEAT', 'Unknown', total_open_interest=7),
+    ]
+
+
+def test_records_round_trip():
+    records = sample_records()
+    array = COTRecordArray.from_records(records)
+    assert len(array) == 3
+    assert list(array) == records
+    assert array.to_dicts() == [r.to_dict() for r in records]
+
+
+def test_dicts_round_trip():
+    dicts = [r.to_dict() for r in sample_records()]
+    assert COTRecordArray.from_records(dicts).to_dicts() == dicts
+
+
+def test_view_matches_record():
+    array = COTRecordArray.from_records(sample_records())
+    for i, record in enumerate(sample_records()):
+        view = array.view(i)
+        for name in ('asset_name', 'report_date') + POSITION_FIELDS:
+            assert view[name] == record[name]
+
+
+def test_slice_and_concat():
+    records = sample_records()
+    array = COTRecordArray.from_records(records)
+    assert list(COTRecordArray.concat([array[:1], array[1:]])) == records
+    assert list(array[np.array([False, True, True])]) == records[1:]
+    assert len(COTRecordArray.concat([])) == 0
+
+
+def test_npz_round_trip(tmp_path):
+    array = COTRecordArray.from_records(sample_records())
+    path = tmp_path / 'records.npz'
+    np.savez(path, **record_arrays_to_npz(array))
+    with np.load(path, allow_pickle=False) as npz:
+        loaded = record_arrays_from_npz({key: npz[key] for key in npz.files})
+    assert list(loaded) == list(array)
+
+
+def test_history_store_round_trip(tmp_path):
+    path = str(tmp_path / 'history.npz')
+    store = COTHistoryStore(path)
+    assert store.ingest(COTRecordArray.from_records(sample_records())) == 2  # the undated week is skipped
+    store.save()
+
+    loaded = COTHistoryStore(path)
+    assert loaded.assets() == ['EURO FX', 'GOLD']
+    assert list(loaded.records) == list(store.records)
+    assert np.array_equal(loaded.dates, store.dates)
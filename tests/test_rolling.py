@@ -0,0 +1,133 @@
+"""Incremental rolling metrics against a full pandas recomputation."""
+
+import math
+
+import numpy as np
+import pytest
+
+from cot_history import COTHistoryStore
+from cot_records import COTRecordArray
+from cot_rolling import RollingMetricsState, RollingWindow
+
+pd = pytest.importorskip('pandas')
+
+
+def assert_close(actual, expected):
+    if expected is None or (isinstance(expected, float) and math.isnan(expected)):
+        assert actual is None or math.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def reference(values, size):
+    """COT index, z-score, percentile, mean of the last value of every trailing window."""
+    series = pd.Series(values, dtype=float)
+    rolling = series.rolling(size, min_periods=1)
+    low, high, mean, std = rolling.min(), rolling.max(), rolling.mean(), rolling.std()
+    index = ((series - low) / (high - low) * 100).where(high > low)
+    zscore = ((series - mean) / std).where(std > 0)
+    percentile = rolling.rank(method='max', pct=True) * 100
+    return pd.DataFrame({'min': low, 'max': high, 'mean': mean, 'std': std,
+                         'index': index, 'zscore': zscore, 'percentile': percentile})
+
+
+@pytest.mark.parametrize('size', [1, 2, 13, 156])
+def test_window_matches_pandas(size):
+    rng = np.random.default_rng(size)
+    values = np.cumsum(rng.integers(-20000, 20000, 400))
+    values[50:60] = values[49]  # ties and a flat stretch
+    expected = reference(values, size)
+    window = RollingWindow(size)
+    for t, value in enumerate(values):
+        window.push(value)
+        row = expected.iloc[t]
+        assert len(window) == min(t + 1, size)
+        assert window.minimum == row['min']
+        assert window.maximum == row['max']
+        assert_close(window.mean, row['mean'])
+        assert_close(window.std, row['std'])
+        assert_close(window.index(value), row['index'])
+        assert_close(window.zscore(value), row['zscore'])
+        assert_close(window.percentile(value), row['percentile'])
+
+
+def test_window_serialization():
+    window = RollingWindow(5, range(12))
+    restored = RollingWindow.from_dict(window.to_dict())
+    assert list(restored.values) == list(window.values) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert (restored.minimum, restored.maximum, restored.mean) == (7.0, 11.0, 9.0)
+
+
+def test_state_matches_pandas(tmp_path):
+    rng = np.random.default_rng(3)
+    nc_net = np.cumsum(rng.integers(-5000, 5000, 300))
+    comm_net = -nc_net + rng.integers(-1000, 1000, 300)
+    dates = [str(d) for d in np.datetime64('2015-01-06') + np.arange(300) * np.timedelta64(7, 'D')]
+    path = str(tmp_path / 'rolling.json')
+    state = RollingMetricsState(path, index_window=156, average_window=13)
+    for t, date in enumerate(dates):
+        metrics = state.update('GOLD', date, {'non_commercial_net': nc_net[t], 'commercial_net': comm_net[t]})
+    state.save()
+
+    for prefix, values in (('nc_net', nc_net), ('comm_net', comm_net)):
+        expected = reference(values, 156).iloc[-1]
+        assert_close(metrics[f"{prefix}_cot_index"], expected['index'])
+        assert_close(metrics[f"{prefix}_zscore"], expected['zscore'])
+        assert_close(metrics[f"{prefix}_percentile"], expected['percentile'])
+        assert_close(metrics[f"{prefix}_ma"], reference(values, 13).iloc[-1]['mean'])
+    assert RollingMetricsState(path).latest('GOLD') == state.latest('GOLD')
+
+
+def test_preview_equals_update():
+    state = RollingMetricsState(None, index_window=4, average_window=2)
+    state.rebuild('GOLD', ['2024-01-02', '2024-01-09'], {'non_commercial_net': [10, 20], 'commercial_net': [-5, -7]})
+    week = {'non_commercial_net': 15, 'commercial_net': -6}
+    preview = state.preview('GOLD', '2024-01-16', week)
+    assert state.last_date('GOLD') == '2024-01-09'
+    assert preview == state.update('GOLD', '2024-01-16', week)
+    with pytest.raises(Exception):
+        state.preview('GOLD', '2024-01-16', week)
+    with pytest.raises(Exception):
+        state.update('GOLD', '2024-01-09', week)
+
+
+def weekly_records(asset, dates, nc_net):
+    return COTRecordArray.from_records(
+        {'asset_name': asset, 'report_date': d.astype(object).strftime('%d/%b/%Y'),
+         'total_open_interest': 500000, 'non_commercial_long': 200000 + int(n), 'non_commercial_short': 200000,
+         'commercial_long': 100000, 'commercial_short': 100000 + int(n)}
+        for d, n in zip(dates, nc_net))
+
+
+def test_store_backfill_rebuilds_rolling(tmp_path):
+    rng = np.random.default_rng(4)
+    dates = np.datetime64('2018-01-02') + np.arange(200) * np.timedelta64(7, 'D')
+    nc_net = np.cumsum(rng.integers(-3000, 3000, 200))
+    order = np.r_[np.arange(100, 200), np.arange(0, 100)]  # recent weeks first, then the backfill
+
+    store = COTHistoryStore(str(tmp_path / 'history.npz'))
+    for chunk in np.array_split(order, 8):
+        store.ingest(weekly_records('GOLD', dates[chunk], nc_net[chunk]))
+    assert np.array_equal(store.asset_dates('GOLD'), dates)
+    assert store.ingest(weekly_records('GOLD', dates[-3:], nc_net[-3:])) == 0
+
+    expected = reference(nc_net, store.rolling.index_window).iloc[-1]
+    latest = store.rolling.latest('GOLD')
+    assert_close(latest['nc_net_cot_index'], expected['index'])
+    assert_close(latest['nc_net_zscore'], expected['zscore'])
+
+
+def test_store_rolling_metrics_of_past_week(tmp_path):
+    rng = np.random.default_rng(5)
+    dates = np.datetime64('2018-01-02') + np.arange(200) * np.timedelta64(7, 'D')
+    nc_net = np.cumsum(rng.integers(-3000, 3000, 200))
+    store = COTHistoryStore(str(tmp_path / 'history.npz'))
+    store.ingest(weekly_records('GOLD', dates, nc_net))
+
+    t = 120
+    week = {'non_commercial_net': float(nc_net[t]), 'commercial_net': -float(nc_net[t])}
+    metrics = store.rolling_metrics('GOLD', dates[t], week)
+    expected = reference(nc_net[:t + 1], store.rolling.index_window).iloc[-1]
+    assert_close(metrics['nc_net_cot_index'], expected['index'])
+    assert_close(metrics['nc_net_percentile'], expected['percentile'])
+    assert_close(metrics['nc_net_ma'], reference(nc_net[:t + 1], 13).iloc[-1]['mean'])